@@ -1,8 +1,18 @@
-"""This module contains the dataclasses and enumerators used in the application."""
+"""This module contains the dataclasses and enumerators used in the application.
 
-from dataclasses import dataclass
+The dataclasses are slotted, so they have no per-instance __dict__. Models which are only built once per
+quiz or user are also frozen. Questions and answers are not, as they are built for every row and frozen
+dataclasses take several times longer to construct.
+"""
+
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from typing import Any
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import CoreSchema, core_schema
 
 # Define enumerators for the user roles and quiz status.
 
@@ -23,60 +33,137 @@ class QuizStatus(Enum):
     QUIZ_STATUS_ARCHIVED = "archived"
 
 
+class Timestamp(str):
+    """An ISO 8601 timestamp, kept as the text stored in the database and only parsed when needed.
+
+    Responses include the text as it is, so timestamps which are never compared are never parsed.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_datetime(cls, value: datetime) -> "Timestamp":
+        return cls(value.isoformat())
+
+    def to_datetime(self) -> datetime:
+        return datetime.fromisoformat(self)
+
+    def isoformat(self) -> str:
+        return str(self)
+
+    @classmethod
+    def validate(cls, value: Any) -> "Timestamp":
+        """Accept a datetime or a valid ISO 8601 string."""
+
+        if isinstance(value, datetime):
+            return cls.from_datetime(value)
+
+        if isinstance(value, str):
+            timestamp = value if isinstance(value, cls) else cls(value)
+            timestamp.to_datetime()
+            return timestamp
+
+        raise ValueError("timestamp must be a datetime or an ISO 8601 string")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate, serialization=core_schema.to_string_ser_schema()
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        return {"type": "string", "format": "date-time"}
+
+
 # Setup classes based on the database schema.
 # QuizQuestionAnswer -> QuizQuestion -> Quiz
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class User:
     id: int
     name: str
     username: str
-    created_at: datetime
+    created_at: Timestamp
     role: UserRole
 
 
-@dataclass
+# Input models may carry the ID of an existing row, so saving a quiz only changes the rows which differ.
+
+
+@dataclass(slots=True)
 class QuizQuestionAnswerIn:
     name: str
     order: int
     is_correct: bool
+    id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QuizQuestionAnswer(QuizQuestionAnswerIn):
-    id: int
+    id: int = field()
     question_id: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class QuizQuestionAnswerUpdate:
+    name: str | None = None
+    is_correct: bool | None = None
+
+
+@dataclass(slots=True)
 class QuestionIn:
     name: str
     order: int
     answers: list[QuizQuestionAnswerIn]
+    id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Question(QuestionIn):
-    id: int
+    id: int = field()
     quiz_id: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class QuestionUpdate:
+    name: str
+
+
+@dataclass(slots=True, frozen=True)
 class QuizIn:
     name: str
     status: QuizStatus
     questions: list[QuestionIn] | None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Quiz(QuizIn):
     id: int
     updated_by: User | None
-    created_at: datetime
-    updated_at: datetime
+    created_at: Timestamp
+    updated_at: Timestamp
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class QuizWithQuestionCount(Quiz):
     question_count: int
+
+
+# Results of importing quizzes in bulk, with errors keyed by the number of the failed record.
+
+
+@dataclass(slots=True, frozen=True)
+class QuizImportError:
+    record: int
+    message: str
+
+
+@dataclass(slots=True)
+class QuizImportResult:
+    imported: int
+    failed: int
+    errors: list[QuizImportError]
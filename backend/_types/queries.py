@@ -1,31 +1,32 @@
 """This module contains the dataclasses for the database queries."""
 
 from dataclasses import dataclass
-from datetime import datetime
 
+from _types.app import Timestamp
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class DatabaseUser:
     id: int
     name: str
     username: str
     password: str
     salt: str
-    created_at: datetime
+    created_at: Timestamp
     role: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DatabaseQuiz:
     id: int
     name: str
     status: str
-    created_at: datetime
-    updated_at: datetime
+    created_at: Timestamp
+    updated_at: Timestamp
     updated_by: int
 
 
-@dataclass
+@dataclass(slots=True)
 class DatabaseQuizQuestion:
     id: int
     quiz_id: int
@@ -33,10 +34,16 @@ class DatabaseQuizQuestion:
     order: int
 
 
-@dataclass
+@dataclass(slots=True)
 class DatabaseQuizQuestionAnswer:
     id: int
     question_id: int
     name: str
     order: int
     is_correct: bool
+
+
+@dataclass(slots=True, frozen=True)
+class QuizSaveResult:
+    quiz_id: int
+    rows_touched: int
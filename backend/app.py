@@ -1,30 +1,58 @@
 """The main application file for the backend. This file contains the API routes and the main application logic."""
 
+import asyncio
+import io
 import logging
 import os
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from functools import wraps
 from http import HTTPStatus
 from secrets import token_urlsafe
 from typing import Any, Callable, Optional
 
+import async_queries
+import importer
+import instrumentation
 import queries
+import request_timing
+import serialization
+import static_assets
 import utilities
-from _types.app import Quiz, QuizIn, QuizStatus, QuizWithQuestionCount, User, UserRole
+from _types.app import (
+    Question,
+    QuestionIn,
+    QuestionUpdate,
+    Quiz,
+    QuizImportResult,
+    QuizIn,
+    QuizQuestionAnswer,
+    QuizQuestionAnswerIn,
+    QuizQuestionAnswerUpdate,
+    QuizStatus,
+    QuizWithQuestionCount,
+    User,
+    UserRole,
+)
 from dotenv import load_dotenv
+from pydantic import TypeAdapter
 from quart import (
     Quart,
+    Response,
     abort,
     current_app,
+    g,
     redirect,
     request,
     session,
-    send_from_directory,
 )
-from quart_schema import QuartSchema, validate_request, validate_response
+from quart_schema import QuartSchema, validate_request
+from werkzeug.datastructures import Headers
+from werkzeug.http import http_date, quote_etag
 
 app = Quart(__name__)
 QuartSchema(app)
+request_timing.install(app)
 
 # Load SECRET_KEY from environment variables or generate a random value.
 
@@ -43,17 +71,33 @@ app.static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "di
 # Setup the routes for the API.
 
 
+# The built frontend, served from memory.
+static_files = static_assets.StaticAssets(app.static_folder)
+
+
+@app.before_serving
+async def load_static_files() -> None:
+    """Read the built frontend into memory before the first request."""
+
+    await asyncio.to_thread(static_files.load)
+
+
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 async def serve_spa(path: str):
     """Serve the single page application."""
 
-    if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
-        # Serve the requested file from the static folder
-        return await send_from_directory(app.static_folder, path)
+    # Serve the requested file from the static folder
+    response = await static_files.response(path) if path != "" else None
 
     # Serve the index.html file for all other routes
-    return await send_from_directory(app.static_folder, "index.html")
+    if response is None:
+        response = await static_files.response("index.html")
+
+    if response is None:
+        return abort(HTTPStatus.NOT_FOUND)
+
+    return response
 
 
 def valid_login_required(func) -> Callable:
@@ -61,20 +105,55 @@ def valid_login_required(func) -> Callable:
 
     @wraps(func)
     async def wrapper(*args: Any, **kwargs: Any) -> Any:
-        if "user_id" not in session:
-            return abort(HTTPStatus.UNAUTHORIZED)
+        with request_timing.measure("auth"):
+            if "user_id" not in session:
+                return abort(HTTPStatus.UNAUTHORIZED)
 
-        user: User = queries.get_user(session["user_id"])
-        if user is None:
-            return abort(HTTPStatus.UNAUTHORIZED)
+            user: User = await async_queries.get_cached_user(session["user_id"])
+            if user is None:
+                return abort(HTTPStatus.UNAUTHORIZED)
 
-        session["user"] = user
+        # The user is kept on the request rather than the session, so the session cookie is not rewritten.
+        g.user = user
 
         return await current_app.ensure_async(func)(*args, **kwargs)
 
     return wrapper
 
 
+def get_validators(etag: str, last_modified: Optional[datetime] = None) -> Headers:
+    """Get the headers which let clients cache a response and revalidate it on later requests."""
+
+    # Headers are passed as a Headers object, as quart_schema converts the keys of a dictionary to kebab case.
+    headers = Headers(
+        {
+            "ETag": quote_etag(etag),
+            "Cache-Control": "private, no-cache",
+            "Vary": "Cookie",
+        }
+    )
+
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified.astimezone(timezone.utc))
+
+    return headers
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Check if the request's If-None-Match or If-Modified-Since header shows the client has the current response."""
+
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+
+    if last_modified is not None and request.if_modified_since is not None:
+        return (
+            last_modified.astimezone(timezone.utc).replace(microsecond=0)
+            <= request.if_modified_since
+        )
+
+    return False
+
+
 @dataclass
 class LoginForm:
     """Form for logging in."""
@@ -87,19 +166,18 @@ class LoginForm:
 # POST /api/auth/login
 @app.post("/api/auth/login")
 @validate_request(LoginForm)
-@validate_response(User)
+@serialization.json_response(User)
 async def post_login(data: LoginForm) -> Optional[User]:
     """Log the user in."""
 
-    database_user = queries.get_database_user_by_username(data.username)
+    database_user = await async_queries.get_database_user_by_username(data.username)
     if database_user is None:
         logging.error("User '%s' not found", data.username)
-        abort(HTTPStatus.UNAUTHORIZED, "Invalid username or password")
 
-    if not utilities.compare_passwords(
-        data.password, database_user.password, database_user.salt
-    ):
-        logging.error("Invalid password for user '%s'", database_user.username)
+    # Unknown users are still checked against a dummy hash, so they take as long to reject as wrong passwords.
+    if await async_queries.verify_password(database_user, data.password) is None:
+        if database_user is not None:
+            logging.error("Invalid password for user '%s'", database_user.username)
         abort(HTTPStatus.UNAUTHORIZED, "Invalid username or password")
 
     # Create a User object from the DatabaseUser
@@ -108,12 +186,11 @@ async def post_login(data: LoginForm) -> Optional[User]:
         name=database_user.name,
         username=database_user.username,
         created_at=database_user.created_at,
-        role=database_user.role,
+        role=UserRole(database_user.role),
     )
 
     session.permanent = data.remember
     session["user_id"] = user.id
-    session["user"] = user
 
     return user
 
@@ -130,11 +207,11 @@ async def logout() -> None:
 # GET /api/users/@me
 @app.get("/api/users/@me")
 @valid_login_required
-@validate_response(User)
+@serialization.json_response(User)
 async def get_logged_in_user() -> Optional[User]:
     """Get the currently logged in user."""
 
-    return session["user"]
+    return g.user
 
 
 @dataclass
@@ -143,19 +220,25 @@ class Quizzes:
 
     quizzes: list[QuizWithQuestionCount]
     count: int
+    next_cursor: Optional[str] = None
 
 
 # GET /api/quizzes
 @app.get("/api/quizzes")
 @valid_login_required
-@validate_response(Quizzes)
+@serialization.json_response(Quizzes)
 async def get_quizzes() -> Optional[Quizzes]:
-    """Returns a list of quizzes. If the user is an editor, include draft quizzes."""
+    """Returns a list of quizzes. If the user is an editor, include draft quizzes.
+
+    Pages can be fetched by offset, or by passing the next_cursor of the previous page as the cursor.
+    """
 
     query = ""
     limit = 10
     offset = 0
     status = None
+    sort = request.args.get("sort", None) or None
+    page_cursor = request.args.get("cursor", None) or None
 
     try:
         query = request.args.get("query", query).strip()
@@ -177,7 +260,7 @@ async def get_quizzes() -> Optional[Quizzes]:
     status_filter: list[QuizStatus] = []
     if status is None:
         # If a status is not provided (such as selecting ALL), default to published for regular users and published and draft for editors.
-        if UserRole(session["user"].role) == UserRole.USER_ROLE_EDITOR:
+        if g.user.role == UserRole.USER_ROLE_EDITOR:
             status_filter = [
                 QuizStatus.QUIZ_STATUS_PUBLISHED,
                 QuizStatus.QUIZ_STATUS_DRAFT,
@@ -188,71 +271,255 @@ async def get_quizzes() -> Optional[Quizzes]:
         # If a status is provided, ensure it is a valid status for the user's role.
         if (
             status == QuizStatus.QUIZ_STATUS_PUBLISHED
-            or UserRole(session["user"].role) == UserRole.USER_ROLE_EDITOR
+            or g.user.role == UserRole.USER_ROLE_EDITOR
         ):
             status_filter = [status]
         else:
             # If the user is not an editor, they can only view published quizzes.
             return abort(HTTPStatus.BAD_REQUEST)
 
-    quizzes, count = queries.get_quizzes(
-        query, [e.value for e in status_filter], limit, offset
+    # Revalidate the page against the version of the quiz collection, which is cheaper than listing it.
+    version = await async_queries.get_quiz_collection_version()
+    etag = utilities.make_etag(
+        "quizzes",
+        version,
+        g.user.role.value,
+        request.query_string.decode(),
     )
-    return Quizzes(quizzes=quizzes, count=count)
+    headers = get_validators(etag)
+
+    if is_not_modified(etag):
+        return Response("", HTTPStatus.NOT_MODIFIED, headers)
+
+    try:
+        quizzes, count, next_cursor = await async_queries.get_quizzes(
+            query,
+            [e.value for e in status_filter],
+            limit,
+            offset,
+            sort=sort,
+            page_cursor=page_cursor,
+        )
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
+
+    return (
+        Quizzes(quizzes=quizzes, count=count, next_cursor=next_cursor),
+        HTTPStatus.OK,
+        headers,
+    )
+
+
+# Most quizzes which can be requested together from the /api/quizzes/batch route.
+QUIZ_BATCH_MAX_IDS = 100
+
+
+@dataclass
+class QuizBatch:
+    """Response for the /api/quizzes/batch route."""
+
+    quizzes: list[Quiz]
+    missing: list[int]
+
+
+# GET /api/quizzes/batch
+@app.get("/api/quizzes/batch")
+@valid_login_required
+@serialization.json_response(QuizBatch)
+async def get_quizzes_batch() -> Optional[QuizBatch]:
+    """Get several quizzes by ID at once, such as ?ids=1,2,3. If the user is an editor or viewer, include the answers.
+
+    Quizzes are returned in the order of the requested IDs, and IDs which do not exist are listed as missing.
+    """
+
+    quiz_ids: list[int] = []
+
+    try:
+        for value in request.args.getlist("ids"):
+            for quiz_id in value.split(","):
+                if quiz_id.strip():
+                    quiz_ids.append(int(quiz_id))
+    except ValueError:
+        return abort(HTTPStatus.BAD_REQUEST, "ids must be a comma separated list of quiz IDs")
+
+    # Remove duplicate IDs, keeping the order they were requested in.
+    quiz_ids = list(dict.fromkeys(quiz_ids))
+
+    if len(quiz_ids) == 0 or len(quiz_ids) > QUIZ_BATCH_MAX_IDS:
+        return abort(
+            HTTPStatus.BAD_REQUEST,
+            f"Between 1 and {QUIZ_BATCH_MAX_IDS} quiz IDs must be requested",
+        )
+
+    include_answers = g.user.role in [
+        UserRole.USER_ROLE_EDITOR,
+        UserRole.USER_ROLE_VIEWER,
+    ]
+
+    quizzes = await async_queries.get_quizzes_by_ids(quiz_ids, include_answers)
+
+    found_ids = {quiz.id for quiz in quizzes}
+    missing = [quiz_id for quiz_id in quiz_ids if quiz_id not in found_ids]
+
+    return QuizBatch(quizzes=quizzes, missing=missing)
+
+
+# Serializes exported quizzes the same way as validated API responses.
+quiz_adapter = TypeAdapter(Quiz)
+
+
+def parse_export_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 date from the query string. Dates with a timezone are converted to the local time
+    the database stores."""
+
+    if not value:
+        return None
+
+    date = datetime.fromisoformat(value)
+    if date.tzinfo is not None:
+        date = date.astimezone().replace(tzinfo=None)
+
+    return date
+
+
+# GET /api/export
+@app.get("/api/export")
+@valid_login_required
+async def get_export() -> Response:
+    """Stream every quiz with its questions and answers as newline delimited JSON. Requires UserRoleEditor.
+
+    Quizzes can be filtered with a comma separated list of statuses, such as ?status=draft,published, and
+    by when they were last updated with ?updated_since= (inclusive) and ?updated_until= (exclusive).
+    """
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    try:
+        _status = request.args.get("status", None)
+        if _status:
+            status_filter = [QuizStatus(value.strip()).value for value in _status.split(",")]
+        else:
+            status_filter = [e.value for e in QuizStatus]
+
+        updated_since = parse_export_date(request.args.get("updated_since", None))
+        updated_until = parse_export_date(request.args.get("updated_until", None))
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
+
+    async def generate():
+        async for quiz in async_queries.export_quizzes(
+            status_filter, updated_since, updated_until
+        ):
+            yield quiz_adapter.dump_json(quiz) + b"\n"
+
+    response = Response(generate(), HTTPStatus.OK, mimetype="application/x-ndjson")
+    response.headers["Content-Disposition"] = 'attachment; filename="quizzes.ndjson"'
+    response.timeout = None
+
+    return response
+
+
+# POST /api/import
+@app.post("/api/import")
+@valid_login_required
+@serialization.json_response(QuizImportResult)
+async def post_import() -> Optional[QuizImportResult]:
+    """Import quizzes in bulk from an NDJSON, JSON or CSV body. Requires UserRoleEditor.
+
+    The format is taken from ?format= or the Content-Type. Valid quizzes are imported and invalid ones are
+    reported by record number. Files larger than the request size limit should use script_import_quizzes.py.
+    """
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    file_format = request.args.get("format", None) or importer.CONTENT_TYPES.get(
+        request.mimetype, None
+    )
+    if file_format not in importer.FORMATS:
+        return abort(
+            HTTPStatus.BAD_REQUEST,
+            f"format must be one of {', '.join(importer.FORMATS)}",
+        )
+
+    data = await request.get_data(as_text=True)
+
+    try:
+        result = await async_queries.import_quizzes(
+            io.StringIO(data, newline=""), file_format, session["user_id"]
+        )
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
+
+    return result
 
 
 # GET /api/quizzes/:quiz_id
 @app.get("/api/quizzes/<int:quiz_id>")
 @valid_login_required
-@validate_response(Quiz)
+@serialization.json_response(Quiz)
 async def get_quiz(quiz_id: int) -> Optional[Quiz]:
     """Get a single quiz by ID. If the user is an editor or viewer, include the answers."""
 
-    return queries.get_quiz(
-        quiz_id,
-        include_answers=UserRole(session["user"].role)
-        in [UserRole.USER_ROLE_EDITOR, UserRole.USER_ROLE_VIEWER],
-    )
+    include_answers = g.user.role in [
+        UserRole.USER_ROLE_EDITOR,
+        UserRole.USER_ROLE_VIEWER,
+    ]
+
+    # Revalidate the quiz against when it was last updated, which is cheaper than loading it.
+    updated_at = await async_queries.get_quiz_updated_at(quiz_id)
+    if updated_at is None:
+        return abort(HTTPStatus.NOT_FOUND)
+
+    etag = utilities.make_etag("quiz", quiz_id, updated_at.isoformat(), include_answers)
+    headers = get_validators(etag, updated_at)
+
+    if is_not_modified(etag, updated_at):
+        return Response("", HTTPStatus.NOT_MODIFIED, headers)
+
+    quiz = await async_queries.get_quiz(quiz_id, include_answers=include_answers)
+
+    return quiz, HTTPStatus.OK, headers
 
 
 # POST /api/quizzes
 @app.post("/api/quizzes")
 @valid_login_required
 @validate_request(QuizIn)
-@validate_response(Quiz)
+@serialization.json_response(Quiz)
 async def post_quiz(data: QuizIn) -> Optional[Quiz]:
     """Create a new quiz. Requires UserRoleEditor."""
-    if UserRole(session["user"].role) != UserRole.USER_ROLE_EDITOR:
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
         return abort(HTTPStatus.FORBIDDEN)
 
-    is_valid, validation_message = validate_quiz(data)
+    is_valid, validation_message = utilities.validate_quiz(data)
     if not is_valid:
         return abort(HTTPStatus.BAD_REQUEST, validation_message)
 
-    return queries.get_quiz(
-        queries.create_update_quiz(session["user_id"], None, data), include_answers=True
-    )
+    quiz_id = await async_queries.create_update_quiz(session["user_id"], None, data)
+
+    return await async_queries.get_quiz(quiz_id, include_answers=True)
 
 
 # PUT /api/quizzes/:quiz_id
 @app.put("/api/quizzes/<int:quiz_id>")
 @valid_login_required
 @validate_request(QuizIn)
-@validate_response(Quiz)
+@serialization.json_response(Quiz)
 async def put_quiz(quiz_id: int, data: QuizIn) -> Optional[Quiz]:
     """Update an existing quiz. Requires UserRoleEditor."""
 
-    if UserRole(session["user"].role) != UserRole.USER_ROLE_EDITOR:
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
         return abort(HTTPStatus.FORBIDDEN)
 
-    is_valid, validation_message = validate_quiz(data)
+    is_valid, validation_message = utilities.validate_quiz(data)
     if not is_valid:
         return abort(HTTPStatus.BAD_REQUEST, validation_message)
 
-    return queries.get_quiz(
-        queries.create_update_quiz(session["user_id"], quiz_id, data),
-        include_answers=True,
-    )
+    quiz_id = await async_queries.create_update_quiz(session["user_id"], quiz_id, data)
+
+    return await async_queries.get_quiz(quiz_id, include_answers=True)
 
 
 # DELETE /api/quizzes/:id
@@ -261,61 +528,279 @@ async def put_quiz(quiz_id: int, data: QuizIn) -> Optional[Quiz]:
 async def delete_quiz(quiz_id: int) -> None:
     """Delete a quiz. Requires UserRoleEditor."""
 
-    if UserRole(session["user"].role) != UserRole.USER_ROLE_EDITOR:
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
         return abort(HTTPStatus.FORBIDDEN)
 
-    quiz = queries.get_quiz(quiz_id, include_answers=True)
-    if quiz is None:
+    updated = await async_queries.set_quiz_status(
+        session["user_id"], [quiz_id], QuizStatus.QUIZ_STATUS_ARCHIVED
+    )
+    if updated == 0:
+        return abort(HTTPStatus.NOT_FOUND)
+
+    return "", HTTPStatus.OK
+
+
+# Most quizzes whose status can be changed together from the /api/quizzes/status route, enough for the
+# end of term cleanup of a whole catalogue in one transaction.
+QUIZ_STATUS_MAX_IDS = 10000
+
+
+@dataclass
+class QuizStatusChange:
+    """Request for the /api/quizzes/status route."""
+
+    ids: list[int]
+    status: QuizStatus
+
+
+@dataclass
+class QuizStatusChangeResult:
+    """Response for the /api/quizzes/status route."""
+
+    updated: int
+
+
+# POST /api/quizzes/status
+@app.post("/api/quizzes/status")
+@valid_login_required
+@validate_request(QuizStatusChange)
+@serialization.json_response(QuizStatusChangeResult)
+async def post_quizzes_status(data: QuizStatusChange) -> Optional[QuizStatusChangeResult]:
+    """Publish, archive or restore many quizzes at once. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    quiz_ids = list(dict.fromkeys(data.ids))
+    if len(quiz_ids) > QUIZ_STATUS_MAX_IDS:
+        return abort(
+            HTTPStatus.BAD_REQUEST,
+            f"At most {QUIZ_STATUS_MAX_IDS} quiz IDs can be changed at once",
+        )
+
+    updated = await async_queries.set_quiz_status(session["user_id"], quiz_ids, data.status)
+
+    return QuizStatusChangeResult(updated=updated)
+
+
+# PATCH /api/quizzes/:quiz_id/questions/:question_id
+@app.patch("/api/quizzes/<int:quiz_id>/questions/<int:question_id>")
+@valid_login_required
+@validate_request(QuestionUpdate)
+@serialization.json_response(Question)
+async def patch_question(
+    quiz_id: int, question_id: int, data: QuestionUpdate
+) -> Optional[Question]:
+    """Change the text of a question. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    try:
+        question = await async_queries.update_question(
+            session["user_id"], quiz_id, question_id, data
+        )
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
+
+    if question is None:
+        return abort(HTTPStatus.NOT_FOUND)
+
+    return question
+
+
+# POST /api/quizzes/:quiz_id/questions
+@app.post("/api/quizzes/<int:quiz_id>/questions")
+@valid_login_required
+@validate_request(QuestionIn)
+@serialization.json_response(Question)
+async def post_question(quiz_id: int, data: QuestionIn) -> Optional[Question]:
+    """Insert a question at its order, renumbering the questions after it. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    is_valid, validation_message = utilities.validate_question(data)
+    if not is_valid:
+        return abort(HTTPStatus.BAD_REQUEST, validation_message)
+
+    question = await async_queries.insert_question(session["user_id"], quiz_id, data)
+    if question is None:
         return abort(HTTPStatus.NOT_FOUND)
 
-    quiz.status = QuizStatus.QUIZ_STATUS_ARCHIVED
+    return question
+
+
+# DELETE /api/quizzes/:quiz_id/questions/:question_id
+@app.delete("/api/quizzes/<int:quiz_id>/questions/<int:question_id>")
+@valid_login_required
+async def delete_question(quiz_id: int, question_id: int) -> None:
+    """Delete a question, renumbering the questions after it. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    try:
+        deleted = await async_queries.delete_question(
+            session["user_id"], quiz_id, question_id
+        )
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
 
-    queries.create_update_quiz(session["user_id"], quiz_id, quiz)
+    if not deleted:
+        return abort(HTTPStatus.NOT_FOUND)
 
     return "", HTTPStatus.OK
 
 
-def validate_quiz(quiz: QuizIn):
-    """Validate a quiz."""
+# PATCH /api/quizzes/:quiz_id/questions/:question_id/answers/:answer_id
+@app.patch("/api/quizzes/<int:quiz_id>/questions/<int:question_id>/answers/<int:answer_id>")
+@valid_login_required
+@validate_request(QuizQuestionAnswerUpdate)
+@serialization.json_response(QuizQuestionAnswer)
+async def patch_answer(
+    quiz_id: int, question_id: int, answer_id: int, data: QuizQuestionAnswerUpdate
+) -> Optional[QuizQuestionAnswer]:
+    """Change the text or correctness of an answer. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
 
-    if not quiz.name:
-        return False, "quiz.name: Missing quiz name"
+    try:
+        answer = await async_queries.update_answer(
+            session["user_id"], quiz_id, question_id, answer_id, data
+        )
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
 
-    if not quiz.status or quiz.status not in [
-        QuizStatus.QUIZ_STATUS_DRAFT,
-        QuizStatus.QUIZ_STATUS_PUBLISHED,
-        QuizStatus.QUIZ_STATUS_ARCHIVED,
-    ]:
-        return False, "quiz.status: Invalid quiz status '" + quiz.status + "'"
+    if answer is None:
+        return abort(HTTPStatus.NOT_FOUND)
 
-    if not quiz.questions or len(quiz.questions) < 1:
-        return False, "quiz.questions: Missing questions"
+    return answer
 
-    for question_index, question in enumerate(quiz.questions):
-        if not question.name:
-            return False, f"quiz.questions.{question_index}.name: Missing question name"
 
-        if not question.answers or len(question.answers) < 1:
-            return False, f"quiz.questions.{question_index}.name: Missing answers"
+# POST /api/quizzes/:quiz_id/questions/:question_id/answers
+@app.post("/api/quizzes/<int:quiz_id>/questions/<int:question_id>/answers")
+@valid_login_required
+@validate_request(QuizQuestionAnswerIn)
+@serialization.json_response(QuizQuestionAnswer)
+async def post_answer(
+    quiz_id: int, question_id: int, data: QuizQuestionAnswerIn
+) -> Optional[QuizQuestionAnswer]:
+    """Insert an answer at its order, re-indexing the answers after it. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
 
-        has_correct_answer = False
-        for answer_index, answer in enumerate(question.answers):
-            if not answer.name:
-                return (
-                    False,
-                    f"quiz.questions.{question_index}.answers.{answer_index}.name: Missing answer name",
-                )
+    try:
+        answer = await async_queries.insert_answer(
+            session["user_id"], quiz_id, question_id, data
+        )
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
+
+    if answer is None:
+        return abort(HTTPStatus.NOT_FOUND)
 
-            if answer.is_correct:
-                has_correct_answer = True
+    return answer
 
-        if not has_correct_answer:
-            return (
-                False,
-                f"quiz.questions.{question_index}.answers: No correct answer set",
+
+# DELETE /api/quizzes/:quiz_id/questions/:question_id/answers/:answer_id
+@app.delete("/api/quizzes/<int:quiz_id>/questions/<int:question_id>/answers/<int:answer_id>")
+@valid_login_required
+async def delete_answer(quiz_id: int, question_id: int, answer_id: int) -> None:
+    """Delete an answer, re-indexing the answers after it. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    try:
+        deleted = await async_queries.delete_answer(
+            session["user_id"], quiz_id, question_id, answer_id
+        )
+    except ValueError as e:
+        return abort(HTTPStatus.BAD_REQUEST, str(e))
+
+    if not deleted:
+        return abort(HTTPStatus.NOT_FOUND)
+
+    return "", HTTPStatus.OK
+
+
+# Metrics of the connection pools and caches, as (metric name, type, description, stats key).
+POOL_METRICS = [
+    ("database_pool_size", "gauge", "Connections each pool may open.", "size"),
+    ("database_pool_open_connections", "gauge", "Connections each pool has opened.", "open"),
+    ("database_pool_active_jobs", "gauge", "Jobs running on each pool.", "active"),
+    ("database_pool_queued_jobs", "gauge", "Jobs waiting for a connection of each pool.", "queued"),
+]
+WRITER_METRICS = [
+    ("database_writer_jobs_total", "counter", "Write jobs run by the writer.", "jobs"),
+    ("database_writer_failed_jobs_total", "counter", "Write jobs which raised or were not committed.", "failed_jobs"),
+    ("database_writer_commits_total", "counter", "Transactions committed by the writer.", "commits"),
+    ("database_writer_commit_seconds_total", "counter", "Time spent committing transactions.", "commit_seconds"),
+    ("database_writer_commit_max_seconds", "gauge", "Longest time taken to commit a transaction.", "max_commit_seconds"),
+]
+CACHE_METRICS = [
+    ("cache_hits_total", "counter", "Values found in each cache.", "hits"),
+    ("cache_misses_total", "counter", "Values missing from each cache.", "misses"),
+    ("cache_evictions_total", "counter", "Values evicted from each cache.", "evictions"),
+    ("cache_entries", "gauge", "Values held in each cache.", "entries"),
+    ("cache_resident_bytes", "gauge", "Estimated memory used by each cache.", "resident_bytes"),
+]
+
+
+# GET /api/admin/metrics
+@app.get("/api/admin/metrics")
+@valid_login_required
+async def get_metrics() -> Response:
+    """Get the statement, connection pool, writer and cache metrics in the Prometheus text format. Requires UserRoleEditor."""
+
+    if g.user.role != UserRole.USER_ROLE_EDITOR:
+        return abort(HTTPStatus.FORBIDDEN)
+
+    stats = async_queries.stats()
+    pools = {name: value for name, value in stats.items() if not name.endswith("_cache")}
+    caches = {
+        name.removesuffix("_cache"): value
+        for name, value in stats.items()
+        if name.endswith("_cache")
+    }
+
+    lines = instrumentation.format_statement_metrics()
+    lines.extend(request_timing.format_metrics())
+
+    for name, metric_type, description, key in POOL_METRICS:
+        lines.extend(
+            instrumentation.format_metric(
+                name,
+                metric_type,
+                description,
+                [({"pool": pool}, value[key]) for pool, value in pools.items()],
             )
+        )
 
-    return True, None
+    for name, metric_type, description, key in WRITER_METRICS:
+        lines.extend(
+            instrumentation.format_metric(name, metric_type, description, [({}, stats["write"][key])])
+        )
+
+    for name, metric_type, description, key in CACHE_METRICS:
+        lines.extend(
+            instrumentation.format_metric(
+                name,
+                metric_type,
+                description,
+                [({"cache": cache}, value[key]) for cache, value in caches.items()],
+            )
+        )
+
+    return Response(
+        "\n".join(lines) + "\n",
+        HTTPStatus.OK,
+        {"Cache-Control": "no-store"},
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
 
 
 if __name__ == "__main__":
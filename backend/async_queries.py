@@ -0,0 +1,715 @@
+"""This module contains awaitable versions of the database queries.
+
+Reads are run on a bounded pool of read connections in a thread pool, so a slow query no longer
+blocks the event loop. Writes are queued for a single writer on the shared connection in queries.py,
+which commits the writes queued together in one transaction.
+
+When STORAGE_MODE is "memory", quizzes found in the quiz store are returned directly, without a read connection.
+"""
+
+import asyncio
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Optional, TextIO
+
+import importer
+import queries
+import request_timing
+import utilities
+from cache import LRUCache
+from _types.app import (
+    Question,
+    QuestionIn,
+    QuestionUpdate,
+    Quiz,
+    QuizImportResult,
+    QuizIn,
+    QuizQuestionAnswer,
+    QuizQuestionAnswerIn,
+    QuizQuestionAnswerUpdate,
+    QuizStatus,
+    QuizWithQuestionCount,
+    User,
+    UserRole,
+)
+from _types.queries import DatabaseUser
+
+# Number of read connections (and threads) available to serve queries.
+READ_POOL_SIZE = int(os.environ.get("DATABASE_READ_POOL_SIZE", 4))
+
+# Limits of the cache of assembled quizzes.
+QUIZ_CACHE_MAX_ENTRIES = int(os.environ.get("QUIZ_CACHE_MAX_ENTRIES", 1000))
+QUIZ_CACHE_MAX_BYTES = int(os.environ.get("QUIZ_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+QUIZ_CACHE_TTL = float(os.environ.get("QUIZ_CACHE_TTL", 300))
+
+# Limits of the cache of logged in users. Changes made through this module are applied immediately,
+# and changes made to the database directly are picked up after the TTL.
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", 10000))
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 60))
+
+# Number of threads hashing passwords. Each hash takes tens of milliseconds, so logins are bounded by this
+# pool instead of blocking the event loop.
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+# Most writes committed together in one transaction, and how many milliseconds the writer waits for more
+# writes to arrive before committing. By default only the writes already queued are grouped.
+WRITE_BATCH_SIZE = int(os.environ.get("WRITE_BATCH_SIZE", 64))
+WRITE_BATCH_DELAY = float(os.environ.get("WRITE_BATCH_DELAY", 0)) / 1000
+
+# Number of quizzes read from the database at a time while exporting.
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 100))
+
+
+def connect_reader() -> sqlite3.Connection:
+    """Open a read only connection to the database."""
+
+    connection = queries.connect()
+    connection.execute("PRAGMA query_only = ON")
+
+    return connection
+
+
+class ConnectionPool:
+    """A bounded pool of connections, each used by at most one thread at a time."""
+
+    def __init__(self, name: str, size: int, connect: Callable[[], sqlite3.Connection]):
+        self.name = name
+        self.size = size
+
+        self._connect = connect
+        self._connections: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix=f"database-{name}"
+        )
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._queued = 0
+        self._active = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run the function on a pooled connection, passed as the connection keyword argument."""
+
+        with self._lock:
+            self._queued += 1
+
+        # The function runs in the context of the caller, so the time it spends can be added to the request.
+        context = contextvars.copy_context()
+
+        with request_timing.measure("db"):
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, context.run, self._call, func, args, kwargs
+            )
+
+    def _call(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+
+        connection = self._acquire()
+        try:
+            return func(*args, connection=connection, **kwargs)
+        finally:
+            self._connections.put(connection)
+
+            with self._lock:
+                self._active -= 1
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._connections.get_nowait()
+        except queue.Empty:
+            pass
+
+        # There is one worker per connection, so a new connection is only opened while below the pool size.
+        with self._lock:
+            self._opened += 1
+
+        return self._connect()
+
+    def stats(self) -> dict[str, int]:
+        """Return the size of the pool and the number of queued and running jobs."""
+
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "active": self._active,
+                "queued": self._queued,
+            }
+
+
+class WriteJob:
+    __slots__ = ("func", "args", "kwargs", "context", "future")
+
+    def __init__(self, func: Callable[..., Any], args: tuple, kwargs: dict, future: asyncio.Future):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.context = contextvars.copy_context()
+        self.future = future
+
+
+class Writer:
+    """A single writer, which takes write jobs from a queue and runs them on one connection.
+
+    The jobs waiting when the writer becomes free are run together in one transaction with one commit, each
+    in its own savepoint, so a job which raises only rolls back its own changes. Callers get their job's
+    result once the transaction holding it has been committed.
+
+    After each commit, on_commit is called on the event loop with the IDs of the quizzes the transaction
+    changed, before any job's result is set, so it runs even if the caller of a job has been cancelled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], sqlite3.Connection],
+        batch_size: int,
+        batch_delay: float,
+        on_commit: Optional[Callable[[list[int]], None]] = None,
+    ):
+        self.name = name
+        self.batch_size = max(1, batch_size)
+        self.batch_delay = batch_delay
+        self.on_commit = on_commit
+
+        self._connect = connect
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"database-{name}")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue[WriteJob]] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._jobs = 0
+        self._failed_jobs = 0
+        self._commits = 0
+        self._commit_time = 0.0
+        self._max_commit_time = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Queue the function to run on the writer's connection, passed as the connection keyword argument."""
+
+        loop = asyncio.get_running_loop()
+
+        # The queue and task belong to the loop which started them, so they are replaced if it has changed.
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._write())
+
+        # The job runs in the context of the caller, so the time it spends can be added to the request.
+        with request_timing.measure("db"):
+            job = WriteJob(func, args, kwargs, loop.create_future())
+            self._queue.put_nowait(job)
+
+            return await job.future
+
+    async def _write(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+
+        while True:
+            batch = [await queue.get()]
+
+            if self.batch_delay > 0:
+                deadline = loop.time() + self.batch_delay
+                while len(batch) < self.batch_size and loop.time() < deadline:
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        break
+
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                outcomes, changed_quiz_ids = await loop.run_in_executor(
+                    self._executor, self._run_batch, batch
+                )
+            except asyncio.CancelledError:
+                for job in batch:
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                # The batch could not be run at all, such as when the connection could not be opened, so
+                # every job in it fails and the writer carries on with the next batch.
+                outcomes = [(False, e)] * len(batch)
+                changed_quiz_ids = []
+
+            if changed_quiz_ids and self.on_commit is not None:
+                self.on_commit(changed_quiz_ids)
+
+            for job, (succeeded, value) in zip(batch, outcomes):
+                if job.future.cancelled():
+                    continue
+
+                if succeeded:
+                    job.future.set_result(value)
+                else:
+                    job.future.set_exception(value)
+
+    def _run_batch(self, batch: list[WriteJob]) -> tuple[list[tuple[bool, Any]], list[int]]:
+        if self._connection is None:
+            self._connection = self._connect()
+
+        connection = self._connection
+        outcomes: list[tuple[bool, Any]] = []
+        changed_quiz_ids: list[int] = []
+
+        with self._lock:
+            self._active = len(batch)
+
+        try:
+            if not connection.in_transaction:
+                connection.execute("BEGIN IMMEDIATE")
+
+            for job in batch:
+                try:
+                    with queries.transaction(connection):
+                        value = job.context.run(job.func, *job.args, connection=connection, **job.kwargs)
+                except Exception as e:
+                    outcomes.append((False, e))
+                else:
+                    outcomes.append((True, value))
+
+            start = time.perf_counter()
+            connection.commit()
+            commit_time = time.perf_counter() - start
+        except Exception as e:
+            # Nothing in the transaction was written, so every job in it has failed, and the quizzes they
+            # changed are forgotten.
+            queries.rollback(connection)
+
+            outcomes = [(False, e)] * len(batch)
+            commit_time = None
+        else:
+            # Errors updating the store are not caught above, as the batch has been committed regardless.
+            changed_quiz_ids = queries.publish_changes(connection)
+
+        with self._lock:
+            self._active = 0
+            self._jobs += len(batch)
+            self._failed_jobs += sum(1 for succeeded, _ in outcomes if not succeeded)
+
+            if commit_time is not None:
+                self._commits += 1
+                self._commit_time += commit_time
+                self._max_commit_time = max(self._max_commit_time, commit_time)
+
+        return outcomes, changed_quiz_ids
+
+    def stats(self) -> dict[str, Any]:
+        """Return the queue depth and running jobs, as a pool of one connection, and the commit metrics."""
+
+        with self._lock:
+            return {
+                "size": 1,
+                "open": 0 if self._connection is None else 1,
+                "active": self._active,
+                "queued": 0 if self._queue is None else self._queue.qsize(),
+                "jobs": self._jobs,
+                "failed_jobs": self._failed_jobs,
+                "commits": self._commits,
+                "commit_seconds": self._commit_time,
+                "max_commit_seconds": self._max_commit_time,
+            }
+
+
+read_pool = ConnectionPool("read", READ_POOL_SIZE, connect_reader)
+
+# hashlib.scrypt releases the GIL, so hashes in this pool run in parallel with each other and the event loop.
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password"
+)
+
+# Verified against when logging in as an unknown user, so it takes as long as logging in with a wrong password.
+# Hashed once here, so no login pays for building it.
+_dummy_salt = utilities.generate_salt()
+_dummy_password = utilities.hash_password("", _dummy_salt)
+
+# Assembled quizzes, keyed by quiz ID and whether answers are included.
+quiz_cache = LRUCache(QUIZ_CACHE_MAX_ENTRIES, QUIZ_CACHE_MAX_BYTES, QUIZ_CACHE_TTL)
+
+# Users resolved for authenticated requests, keyed by user ID. Its generation is the version of the cached users.
+user_cache = LRUCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_MAX_ENTRIES * 4096, USER_CACHE_TTL)
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Return the metrics of the read pool, the writer and the caches."""
+
+    return {
+        **{pool.name: pool.stats() for pool in (read_pool, writer)},
+        "quiz_cache": quiz_cache.stats(),
+        "user_cache": user_cache.stats(),
+    }
+
+
+def invalidate_quiz(quiz_id: int) -> None:
+    """Remove a quiz from the cache after it has been changed."""
+
+    quiz_cache.invalidate((quiz_id, True), (quiz_id, False))
+
+
+def invalidate_quizzes(quiz_ids: list[int]) -> None:
+    """Remove the quizzes changed by a committed write from the cache."""
+
+    for quiz_id in dict.fromkeys(quiz_ids):
+        invalidate_quiz(quiz_id)
+
+
+# Quizzes are removed from the cache by the writer once their changes are committed, rather than by the
+# functions below once their write returns, so they are removed even if the request is cancelled meanwhile.
+writer = Writer("write", lambda: queries.conn, WRITE_BATCH_SIZE, WRITE_BATCH_DELAY, invalidate_quizzes)
+
+
+# User Management
+
+
+async def get_database_user_by_username(username: str) -> Optional[DatabaseUser]:
+    """Get user from the database using the provided username."""
+
+    return await read_pool.run(queries.get_database_user_by_username, username)
+
+
+async def get_user(user_id: int) -> Optional[User]:
+    """Get user from the database using the provided ID."""
+
+    return await read_pool.run(queries.get_user, user_id)
+
+
+async def get_cached_user(user_id: int) -> Optional[User]:
+    """Get user using the provided ID, from the cache if they were resolved recently.
+
+    Cached users are shared between requests and must not be modified.
+    """
+
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    generation = user_cache.generation
+    user = await read_pool.run(queries.get_user, user_id)
+
+    if user is not None:
+        user_cache.set(user_id, user, generation)
+
+    return user
+
+
+async def verify_password(
+    database_user: Optional[DatabaseUser], password: str
+) -> Optional[DatabaseUser]:
+    """Check the password of a user in the password pool, returning the user if it matches.
+
+    A user whose hash is a legacy SHA-256 hash, or uses a different cost than is configured, has their
+    password rehashed and stored.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    if database_user is None:
+        await loop.run_in_executor(
+            password_executor, utilities.compare_passwords, password, _dummy_password, _dummy_salt
+        )
+
+        return None
+
+    matches = await loop.run_in_executor(
+        password_executor,
+        utilities.compare_passwords,
+        password,
+        database_user.password,
+        database_user.salt,
+    )
+    if not matches:
+        return None
+
+    if utilities.password_needs_rehash(database_user.password):
+        await update_user_password(database_user.id, password)
+
+    return database_user
+
+
+async def update_user_password(user_id: int, password: str) -> bool:
+    """Hash a new password with a new salt in the password pool, and store it."""
+
+    salt = utilities.generate_salt()
+    hashed_password = await asyncio.get_running_loop().run_in_executor(
+        password_executor, utilities.hash_password, password, salt
+    )
+
+    return await writer.run(queries.update_user_password, user_id, hashed_password, salt)
+
+
+async def update_user_role(user_id: int, role: UserRole) -> bool:
+    """Change the role of a user, applying it to their next request."""
+
+    updated = await writer.run(queries.update_user_role, user_id, role)
+    user_cache.invalidate(user_id)
+
+    return updated
+
+
+async def delete_user(user_id: int) -> bool:
+    """Delete a user, rejecting their next request."""
+
+    deleted = await writer.run(queries.delete_user, user_id)
+    user_cache.invalidate(user_id)
+
+    return deleted
+
+
+def invalidate_users() -> None:
+    """Remove every user from the cache, such as after changing users in the database directly."""
+
+    user_cache.clear()
+
+
+# Quiz Management
+
+
+async def get_quizzes(
+    query: str,
+    status_list: list[str],
+    limit: int,
+    offset: int,
+    sort: Optional[str] = None,
+    page_cursor: Optional[str] = None,
+) -> tuple[list[QuizWithQuestionCount], int, Optional[str]]:
+    """Get a page of quizzes from the database, along with the total count and the cursor for the next page."""
+
+    # Pages served from the quiz store do not need a read connection, but are still read in a thread, as
+    # the first read of a listing after every write sorts the matching quizzes.
+    if queries.store is not None and queries.store.covers(status_list):
+        return await asyncio.to_thread(
+            queries.get_quizzes_page,
+            query,
+            status_list,
+            limit,
+            offset,
+            sort=sort,
+            page_cursor=page_cursor,
+        )
+
+    return await read_pool.run(
+        queries.get_quizzes_page,
+        query,
+        status_list,
+        limit,
+        offset,
+        sort=sort,
+        page_cursor=page_cursor,
+    )
+
+
+async def get_quiz_updated_at(quiz_id: int) -> Optional[datetime]:
+    """Get when a quiz was last updated, or None if it does not exist."""
+
+    if queries.store is not None:
+        updated_at = queries.store.get_updated_at(quiz_id)
+        if updated_at is not None:
+            return updated_at.to_datetime()
+
+    return await read_pool.run(queries.get_quiz_updated_at, quiz_id)
+
+
+async def get_quiz_collection_version() -> int:
+    """Get the version of the quiz collection, which changes whenever any quiz is changed."""
+
+    return await read_pool.run(queries.get_quiz_collection_version)
+
+
+async def get_quiz(quiz_id: int, include_answers: bool) -> Optional[Quiz]:
+    """Get a quiz using the provided ID, from the quiz store or the cache if it has been assembled recently.
+
+    Cached quizzes are shared between requests and must not be modified.
+    """
+
+    if queries.store is not None:
+        quiz = queries.store.get(quiz_id, include_answers)
+        if quiz is not None:
+            return quiz
+
+    key = (quiz_id, include_answers)
+
+    quiz = quiz_cache.get(key)
+    if quiz is not None:
+        return quiz
+
+    generation = quiz_cache.generation
+    quiz = await read_pool.run(queries.get_quiz, quiz_id, include_answers)
+
+    if quiz is not None:
+        quiz_cache.set(key, quiz, generation)
+
+    return quiz
+
+
+async def get_quizzes_by_ids(quiz_ids: list[int], include_answers: bool) -> list[Quiz]:
+    """Get several quizzes in the order of the provided IDs. Quizzes in the quiz store or assembled recently
+    are taken from them, and the rest are loaded together with a single query.
+
+    Cached quizzes are shared between requests and must not be modified.
+    """
+
+    quizzes: dict[int, Quiz] = {}
+    missing_ids = []
+    store = queries.store
+
+    for quiz_id in quiz_ids:
+        quiz = store.get(quiz_id, include_answers) if store is not None else None
+        if quiz is None:
+            quiz = quiz_cache.get((quiz_id, include_answers))
+        if quiz is None:
+            missing_ids.append(quiz_id)
+        else:
+            quizzes[quiz_id] = quiz
+
+    if len(missing_ids) > 0:
+        generation = quiz_cache.generation
+        loaded = await read_pool.run(
+            queries.get_quizzes_by_ids, missing_ids, include_answers
+        )
+
+        for quiz in loaded:
+            quiz_cache.set((quiz.id, include_answers), quiz, generation)
+            quizzes[quiz.id] = quiz
+
+    return [quizzes[quiz_id] for quiz_id in quiz_ids if quiz_id in quizzes]
+
+
+async def export_quizzes(
+    status_list: list[str],
+    updated_since: Optional[datetime] = None,
+    updated_until: Optional[datetime] = None,
+) -> AsyncIterator[Quiz]:
+    """Yield every quiz matching the filters, with its questions and answers, ordered by ID.
+
+    Quizzes are read EXPORT_CHUNK_SIZE at a time, so memory use does not grow with the catalogue, and a
+    pooled connection is only held while a chunk is read rather than while the client consumes it.
+    Exported quizzes bypass the cache.
+    """
+
+    after_id = 0
+
+    while True:
+        quizzes = await read_pool.run(
+            queries.get_quizzes_for_export,
+            status_list,
+            updated_since,
+            updated_until,
+            after_id,
+            EXPORT_CHUNK_SIZE,
+        )
+
+        for quiz in quizzes:
+            yield quiz
+
+        if len(quizzes) < EXPORT_CHUNK_SIZE:
+            return
+
+        after_id = quizzes[-1].id
+
+
+async def import_quizzes(file: TextIO, file_format: str, user_id: int) -> QuizImportResult:
+    """Import every quiz in the file. Each chunk is read and validated in a thread, so parsing a large file
+    does not block the event loop, and then written as a separate job, so other writes are not held up for
+    the whole import."""
+
+    result = QuizImportResult(imported=0, failed=0, errors=[])
+    chunks = importer.chunk_records(
+        importer.read_records(file, file_format), importer.IMPORT_CHUNK_SIZE
+    )
+
+    while True:
+        quizzes = await asyncio.to_thread(importer.parse_next_chunk, chunks, result)
+        if quizzes is None:
+            break
+
+        # Counted once the writer has committed the chunk, so a failed commit is not reported as imported.
+        result.imported += await writer.run(importer.insert_chunk, quizzes, user_id)
+
+    return result
+
+
+async def create_update_quiz(user_id: int, quiz_id: Optional[int], quiz: QuizIn) -> int:
+    """Create or update a quiz in the database."""
+
+    return await writer.run(queries.create_update_quiz, user_id, quiz_id, quiz)
+
+
+async def set_quiz_status(user_id: int, quiz_ids: list[int], status: QuizStatus) -> int:
+    """Change the status of the quizzes in a single transaction."""
+
+    return await writer.run(queries.set_quiz_status, user_id, quiz_ids, status)
+
+
+# Question and Answer Management
+
+
+async def update_question(
+    user_id: int, quiz_id: int, question_id: int, question: QuestionUpdate
+) -> Optional[Question]:
+    """Change the text of a question."""
+
+    return await writer.run(
+        queries.update_question, user_id, quiz_id, question_id, question
+    )
+
+
+async def insert_question(
+    user_id: int, quiz_id: int, question: QuestionIn
+) -> Optional[Question]:
+    """Insert a question at its order, moving the questions after it down."""
+
+    return await writer.run(
+        queries.insert_question, user_id, quiz_id, question
+    )
+
+
+async def delete_question(user_id: int, quiz_id: int, question_id: int) -> bool:
+    """Delete a question and its answers, moving the questions after it up."""
+
+    return await writer.run(queries.delete_question, user_id, quiz_id, question_id)
+
+
+async def update_answer(
+    user_id: int,
+    quiz_id: int,
+    question_id: int,
+    answer_id: int,
+    answer: QuizQuestionAnswerUpdate,
+) -> Optional[QuizQuestionAnswer]:
+    """Change the text or correctness of an answer."""
+
+    return await writer.run(
+        queries.update_answer, user_id, quiz_id, question_id, answer_id, answer
+    )
+
+
+async def insert_answer(
+    user_id: int, quiz_id: int, question_id: int, answer: QuizQuestionAnswerIn
+) -> Optional[QuizQuestionAnswer]:
+    """Insert an answer at its order, moving the answers after it down."""
+
+    return await writer.run(
+        queries.insert_answer, user_id, quiz_id, question_id, answer
+    )
+
+
+async def delete_answer(
+    user_id: int, quiz_id: int, question_id: int, answer_id: int
+) -> bool:
+    """Delete an answer, moving the answers after it up."""
+
+    return await writer.run(
+        queries.delete_answer, user_id, quiz_id, question_id, answer_id
+    )
@@ -0,0 +1,130 @@
+"""This module generates deterministic synthetic data for benchmarks.
+
+The same seed and sizes always produce the same users, quizzes, questions and answers, so benchmark
+results can be compared between runs.
+"""
+
+import random
+import sqlite3
+from datetime import datetime
+
+import queries
+import utilities
+from _types.app import QuestionIn, QuizIn, QuizQuestionAnswerIn, QuizStatus
+from migrations import migrate
+
+WORDS = [
+    "history", "science", "planet", "river", "capital", "element", "poem", "battle", "number",
+    "animal", "language", "mountain", "ocean", "painting", "invention", "empire", "music", "sport",
+    "island", "desert", "theory", "molecule", "author", "festival", "currency", "volcano", "forest",
+    "engine", "galaxy", "climate", "garden", "railway", "bridge", "castle", "harbour", "legend",
+]
+
+ROLES = ["editor", "viewer", "restricted"]
+
+# Share of generated quizzes with each status.
+STATUS_WEIGHTS = {
+    QuizStatus.QUIZ_STATUS_PUBLISHED: 6,
+    QuizStatus.QUIZ_STATUS_DRAFT: 3,
+    QuizStatus.QUIZ_STATUS_ARCHIVED: 1,
+}
+
+# Every generated user has this password.
+PASSWORD = "password"
+
+
+def create_database(path: str) -> sqlite3.Connection:
+    """Open the database at the path, with the schema and migrations applied."""
+
+    connection = sqlite3.connect(path)
+
+    with open("schema.sql", "r", encoding="utf-8") as file:
+        connection.executescript(file.read())
+
+    migrate(connection)
+
+    return connection
+
+
+def generate_name(rng: random.Random, words: int) -> str:
+    """Generate a name from the provided number of random words."""
+
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def generate_quiz(rng: random.Random, questions: int, answers: int) -> QuizIn:
+    """Generate a quiz with the provided number of questions, each with the provided number of answers."""
+
+    statuses = list(STATUS_WEIGHTS)
+    status = rng.choices(statuses, weights=list(STATUS_WEIGHTS.values()))[0]
+
+    quiz_questions = []
+    for question_order in range(1, questions + 1):
+        correct_order = rng.randint(1, answers)
+
+        quiz_questions.append(
+            QuestionIn(
+                name=generate_name(rng, 6) + "?",
+                order=question_order,
+                answers=[
+                    QuizQuestionAnswerIn(
+                        name=generate_name(rng, 2),
+                        order=answer_order,
+                        is_correct=answer_order == correct_order,
+                    )
+                    for answer_order in range(1, answers + 1)
+                ],
+            )
+        )
+
+    return QuizIn(name=generate_name(rng, 3), status=status, questions=quiz_questions)
+
+
+def generate_data(
+    connection: sqlite3.Connection,
+    users: int,
+    quizzes: int,
+    questions: int,
+    answers: int,
+    seed: int = 0,
+    chunk_size: int = 1000,
+) -> None:
+    """Fill an empty database with users named user1, user2 and so on, and quizzes updated by them.
+
+    Users cycle through the editor, viewer and restricted roles, so user1 is an editor and user2 a viewer.
+    """
+
+    rng = random.Random(seed)
+
+    # Every user shares a salt, so the password is only hashed once.
+    salt = rng.getrandbits(128).to_bytes(16, "big").hex()
+    hashed_password = utilities.hash_password(PASSWORD, salt)
+    created_at = datetime(2024, 1, 1).isoformat()
+
+    connection.executemany(
+        "INSERT INTO user (id, name, username, password, salt, created_at, role) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                user_id,
+                generate_name(rng, 2),
+                f"user{user_id}",
+                hashed_password,
+                salt,
+                created_at,
+                ROLES[(user_id - 1) % len(ROLES)],
+            )
+            for user_id in range(1, users + 1)
+        ],
+    )
+    connection.commit()
+
+    # Quizzes are only ever updated by editors.
+    editor_ids = list(range(1, users + 1, len(ROLES)))
+
+    for start in range(0, quizzes, chunk_size):
+        count = min(chunk_size, quizzes - start)
+        queries.insert_quizzes(
+            rng.choice(editor_ids),
+            [generate_quiz(rng, questions, answers) for _ in range(count)],
+            connection=connection,
+        )
@@ -0,0 +1,131 @@
+"""This module contains a bounded in-process cache with least recently used eviction and expiry."""
+
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from typing import Any, Callable, Hashable, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory used by a value, including the dataclasses, lists and dictionaries it contains."""
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (str, bytes, int, float, bool, Enum)) or value is None:
+        return size
+
+    if is_dataclass(value):
+        return size + sum(estimate_size(getattr(value, f.name)) for f in fields(value))
+
+    if isinstance(value, (list, tuple, set)):
+        return size + sum(estimate_size(item) for item in value)
+
+    if isinstance(value, dict):
+        return size + sum(
+            estimate_size(key) + estimate_size(item) for key, item in value.items()
+        )
+
+    return size
+
+
+class LRUCache:
+    """A cache holding up to max_entries values and max_bytes of estimated memory, each for up to ttl seconds.
+
+    The least recently used values are evicted first. The cache is not thread safe, and is meant to be used
+    from the event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        size_of: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # Incremented on every invalidation, so values read before a write can be discarded.
+        self.generation = 0
+
+        self._size_of = size_of
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._resident_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get the value stored for the key, or None if it is missing or has expired."""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Store the value for the key. If the cache was invalidated since the passed generation, the value is discarded."""
+
+        if generation is not None and generation != self.generation:
+            return
+
+        size = self._size_of(value)
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self._resident_bytes += size
+
+        while len(self._entries) > self.max_entries or self._resident_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Remove the values stored for the keys."""
+
+        self.generation += 1
+
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every value from the cache."""
+
+        self.generation += 1
+        self._entries.clear()
+        self._resident_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the hit, miss and eviction counts and the current size of the cache."""
+
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "resident_bytes": self._resident_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._resident_bytes -= size
@@ -0,0 +1,237 @@
+"""This module contains functions for importing quizzes in bulk from NDJSON, JSON or CSV files.
+
+Records are validated like quizzes posted to the API and inserted in chunks, each chunk with one
+transaction and one batched statement per table. Invalid records are reported and skipped.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+
+import queries
+from _types.app import QuizImportError, QuizImportResult, QuizIn
+from pydantic import TypeAdapter, ValidationError
+from utilities import validate_quiz
+
+# Number of records inserted per transaction.
+IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", 1000))
+
+# Most errors listed in an import result. Further errors are only counted.
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = ["ndjson", "json", "csv"]
+
+# CSV files have one row per answer. Consecutive rows with the same quiz, and then question, are grouped.
+CSV_COLUMNS = [
+    "quiz",
+    "status",
+    "question",
+    "question_order",
+    "answer",
+    "answer_order",
+    "is_correct",
+]
+
+FILE_EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "json", ".csv": "csv"}
+
+CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/json": "json",
+    "text/csv": "csv",
+}
+
+quiz_adapter = TypeAdapter(QuizIn)
+
+
+def read_records(file: TextIO, file_format: str) -> Iterator[tuple[int, Any]]:
+    """Read the records of a file as (record number, record) pairs. Records which cannot be decoded are
+    returned as the exception raised while decoding them.
+
+    NDJSON and CSV records are numbered by the line they start on, and JSON records by their position in
+    the top level array.
+    """
+
+    if file_format == "ndjson":
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, e
+
+    elif file_format == "json":
+        try:
+            records = json.load(file)
+        except ValueError as e:
+            yield 1, e
+            return
+
+        if not isinstance(records, list):
+            records = [records]
+
+        yield from enumerate(records, start=1)
+
+    elif file_format == "csv":
+        yield from read_csv_records(file)
+
+    else:
+        raise ValueError(f"Unsupported format '{file_format}', expected one of {', '.join(FORMATS)}")
+
+
+def read_csv_records(file: TextIO) -> Iterator[tuple[int, dict]]:
+    """Read quizzes from CSV rows of answers, grouping consecutive rows of the same quiz and question."""
+
+    reader = csv.DictReader(file)
+
+    missing_columns = set(CSV_COLUMNS) - set(reader.fieldnames or [])
+    if missing_columns:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing_columns))}")
+
+    record_number = 0
+    record: Optional[dict] = None
+    question: Optional[dict] = None
+
+    for row in reader:
+        if record is None or (row["quiz"], row["status"]) != (record["name"], record["status"]):
+            if record is not None:
+                yield record_number, record
+
+            record_number = reader.line_num
+            record = {"name": row["quiz"], "status": row["status"], "questions": []}
+            question = None
+
+        if question is None or (row["question"], row["question_order"]) != (
+            question["name"],
+            question["order"],
+        ):
+            question = {"name": row["question"], "order": row["question_order"], "answers": []}
+            record["questions"].append(question)
+
+        question["answers"].append(
+            {
+                "name": row["answer"],
+                "order": row["answer_order"],
+                "is_correct": row["is_correct"],
+            }
+        )
+
+    if record is not None:
+        yield record_number, record
+
+
+def chunk_records(
+    records: Iterable[tuple[int, Any]], chunk_size: int
+) -> Iterator[list[tuple[int, Any]]]:
+    """Split records into lists of up to chunk_size records."""
+
+    chunk = []
+
+    for record in records:
+        chunk.append(record)
+
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def parse_quiz(record: Any) -> QuizIn:
+    """Convert a decoded record to a quiz, raising ValueError if it is not a valid quiz."""
+
+    if isinstance(record, Exception):
+        raise ValueError(f"Invalid record: {record}")
+
+    try:
+        quiz = quiz_adapter.validate_python(record)
+    except ValidationError as e:
+        error = e.errors()[0]
+        path = ".".join(["quiz", *(str(part) for part in error["loc"])])
+        raise ValueError(f"{path}: {error['msg']}") from e
+
+    is_valid, validation_message = validate_quiz(quiz)
+    if not is_valid:
+        raise ValueError(validation_message)
+
+    return quiz
+
+
+def parse_chunk(chunk: list[tuple[int, Any]], result: QuizImportResult) -> list[QuizIn]:
+    """Validate a chunk of records, adding the invalid ones to the result. Returns the valid quizzes."""
+
+    quizzes = []
+
+    for record_number, record in chunk:
+        try:
+            quizzes.append(parse_quiz(record))
+        except ValueError as e:
+            result.failed += 1
+
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(QuizImportError(record=record_number, message=str(e)))
+
+    return quizzes
+
+
+def parse_next_chunk(
+    chunks: Iterator[list[tuple[int, Any]]], result: QuizImportResult
+) -> Optional[list[QuizIn]]:
+    """Read and validate the next chunk of records, adding the invalid ones to the result. Returns the valid
+    quizzes, or None once every chunk has been read."""
+
+    chunk = next(chunks, None)
+    if chunk is None:
+        return None
+
+    return parse_chunk(chunk, result)
+
+
+def insert_chunk(
+    quizzes: list[QuizIn],
+    user_id: int,
+    connection: Optional[sqlite3.Connection] = None,
+) -> int:
+    """Insert the valid quizzes of a chunk. Returns the number imported, to be added to the result once the
+    quizzes are committed."""
+
+    return len(queries.insert_quizzes(user_id, quizzes, connection=connection))
+
+
+def import_chunk(
+    chunk: list[tuple[int, Any]],
+    user_id: int,
+    result: QuizImportResult,
+    connection: Optional[sqlite3.Connection] = None,
+) -> int:
+    """Validate and insert a chunk of records, adding the outcome to the result. Returns the number imported."""
+
+    imported = insert_chunk(parse_chunk(chunk, result), user_id, connection=connection)
+    result.imported += imported
+
+    return imported
+
+
+def import_quizzes(
+    file: TextIO,
+    file_format: str,
+    user_id: int,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[QuizImportResult], None]] = None,
+    connection: Optional[sqlite3.Connection] = None,
+) -> QuizImportResult:
+    """Import every quiz in the file, calling progress after each chunk."""
+
+    result = QuizImportResult(imported=0, failed=0, errors=[])
+
+    for chunk in chunk_records(read_records(file, file_format), chunk_size):
+        import_chunk(chunk, user_id, result, connection=connection)
+
+        if progress is not None:
+            progress(result)
+
+    return result
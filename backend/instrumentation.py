@@ -0,0 +1,223 @@
+"""This module contains instrumented SQLite connections, which record how often each statement runs, how long
+it takes and how many rows it returns, and capture the query plan of slow statements.
+
+Statements are grouped by their text with whitespace collapsed and placeholder lists shortened, so an IN
+list of any length counts as the same statement.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+# Whether connections opened by queries.connect are instrumented. Every statement then pays for timing and
+# grouping, so it is off unless enabled.
+DATABASE_INSTRUMENTATION = os.environ.get("DATABASE_INSTRUMENTATION", "0") != "0"
+
+# Statements taking longer than this many milliseconds have their query plan captured.
+SLOW_QUERY_THRESHOLD = float(os.environ.get("SLOW_QUERY_THRESHOLD", 100)) / 1000
+
+WHITESPACE = re.compile(r"\s+")
+PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+    slow_count: int = 0
+    slow_plan: Optional[str] = None
+
+
+_lock = threading.Lock()
+_statements: dict[str, StatementStats] = {}
+
+
+def normalize_statement(sql: str) -> str:
+    """Collapse the whitespace of a statement and shorten lists of placeholders to ?, ..."""
+
+    return PLACEHOLDER_LIST.sub("?, ...", WHITESPACE.sub(" ", sql).strip())
+
+
+def record_execution(statement: str, elapsed: float) -> None:
+    with _lock:
+        stats = _statements.get(statement)
+        if stats is None:
+            stats = _statements[statement] = StatementStats()
+
+        stats.count += 1
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+
+        if elapsed >= SLOW_QUERY_THRESHOLD:
+            stats.slow_count += 1
+
+
+def record_rows(statement: str, rows: int) -> None:
+    with _lock:
+        stats = _statements.get(statement)
+        if stats is not None:
+            stats.rows += rows
+
+
+def record_plan(statement: str, plan: str) -> None:
+    with _lock:
+        stats = _statements.get(statement)
+        if stats is not None:
+            stats.slow_plan = plan
+
+
+def statement_stats() -> dict[str, StatementStats]:
+    """Return a copy of the statistics of every statement run so far."""
+
+    with _lock:
+        return {
+            statement: StatementStats(**vars(stats)) for statement, stats in _statements.items()
+        }
+
+
+def reset() -> None:
+    """Forget the statistics of every statement."""
+
+    with _lock:
+        _statements.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """A cursor which records the time taken by each statement and the number of rows fetched from it."""
+
+    _statement: Optional[str] = None
+
+    def execute(self, sql: str, parameters: Any = ()) -> "InstrumentedCursor":
+        self._statement = normalize_statement(sql)
+
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed = time.perf_counter() - start
+
+        record_execution(self._statement, elapsed)
+
+        if elapsed >= SLOW_QUERY_THRESHOLD:
+            self._capture_plan(sql, parameters, elapsed)
+
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> "InstrumentedCursor":
+        self._statement = normalize_statement(sql)
+
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        record_execution(self._statement, time.perf_counter() - start)
+
+        return self
+
+    def fetchone(self) -> Any:
+        row = super().fetchone()
+        if row is not None and self._statement is not None:
+            record_rows(self._statement, 1)
+
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._statement is not None:
+            record_rows(self._statement, len(rows))
+
+        return rows
+
+    def fetchall(self) -> list:
+        rows = super().fetchall()
+        if self._statement is not None:
+            record_rows(self._statement, len(rows))
+
+        return rows
+
+    def _capture_plan(self, sql: str, parameters: Any, elapsed: float) -> None:
+        # Explaining a statement does not run it, so this is also safe for writes. A plain cursor is used so
+        # the plan itself is not recorded.
+        try:
+            cursor = sqlite3.Cursor(self.connection)
+            rows = cursor.execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+            cursor.close()
+        except sqlite3.Error:
+            return
+
+        plan = "\n".join(row[3] for row in rows)
+        record_plan(self._statement, plan)
+
+        logging.warning(
+            "Slow statement took %.1f ms: %s\n%s", elapsed * 1000, self._statement, plan
+        )
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """A connection whose cursors, including those used by execute, are instrumented."""
+
+    def cursor(self, factory=InstrumentedCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    # The shortcut methods create their cursors internally, without calling cursor.
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_sample(name: str, labels: dict[str, Any], value: float) -> str:
+    """Format a labelled sample in the Prometheus text format."""
+
+    label_text = ",".join(f'{key}="{escape_label(str(label))}"' for key, label in labels.items())
+
+    return f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}"
+
+
+def format_metric(
+    name: str, metric_type: str, description: str, samples: list[tuple[dict[str, Any], float]]
+) -> list[str]:
+    """Format a metric and its labelled samples in the Prometheus text format."""
+
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+    lines.extend(format_sample(name, labels, value) for labels, value in samples)
+
+    return lines
+
+
+def format_statement_metrics() -> list[str]:
+    """Format the statement statistics in the Prometheus text format. Captured plans are added as comments."""
+
+    stats = statement_stats()
+    lines = []
+
+    for name, metric_type, description, attribute in [
+        ("sqlite_statement_executions_total", "counter", "Times each statement was run.", "count"),
+        ("sqlite_statement_seconds_total", "counter", "Time spent running each statement.", "total_time"),
+        ("sqlite_statement_max_seconds", "gauge", "Longest time taken by each statement.", "max_time"),
+        ("sqlite_statement_rows_total", "counter", "Rows fetched from each statement.", "rows"),
+        ("sqlite_statement_slow_total", "counter", "Times each statement exceeded the slow threshold.", "slow_count"),
+    ]:
+        lines.extend(
+            format_metric(
+                name,
+                metric_type,
+                description,
+                [({"statement": statement}, getattr(s, attribute)) for statement, s in stats.items()],
+            )
+        )
+
+    for statement, s in stats.items():
+        if s.slow_plan is not None:
+            lines.append(f"# Plan of slow statement: {statement}")
+            lines.extend(f"#   {line}" for line in s.slow_plan.splitlines())
+
+    return lines
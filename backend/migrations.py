@@ -0,0 +1,59 @@
+"""This module applies the versioned schema migrations in the migrations folder.
+
+Each migration is a SQL file named `<version>_<description>.sql`. The version of the database is
+stored in `PRAGMA user_version`, and every migration newer than it is applied in its own transaction.
+"""
+
+import os
+import sqlite3
+
+MIGRATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def get_migrations() -> list[tuple[int, str]]:
+    """Get the available migrations as a sorted list of version and file path."""
+
+    migrations = []
+
+    for file_name in os.listdir(MIGRATIONS_PATH):
+        if not file_name.endswith(".sql"):
+            continue
+
+        version = int(file_name.split("_", 1)[0])
+        migrations.append((version, os.path.join(MIGRATIONS_PATH, file_name)))
+
+    migrations.sort()
+
+    return migrations
+
+
+def get_version(connection: sqlite3.Connection) -> int:
+    """Get the schema version of the database."""
+
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """Apply any pending migrations to the database and return the resulting schema version."""
+
+    version = get_version(connection)
+
+    for migration_version, path in get_migrations():
+        if migration_version <= version:
+            continue
+
+        with open(path, "r", encoding="utf-8") as file:
+            script = file.read()
+
+        try:
+            connection.executescript(
+                f"BEGIN;\n{script}\nPRAGMA user_version = {migration_version};\nCOMMIT;"
+            )
+        except Exception as e:
+            if connection.in_transaction:
+                connection.rollback()
+            raise e
+
+        version = migration_version
+
+    return version
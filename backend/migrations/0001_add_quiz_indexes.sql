@@ -0,0 +1,8 @@
+-- Index questions by quiz, ordered as they are displayed
+CREATE INDEX IF NOT EXISTS quiz_question_quiz_id_order ON quiz_question (`quiz_id`, `order`);
+
+-- Index answers by question, ordered as they are displayed
+CREATE INDEX IF NOT EXISTS quiz_question_answer_question_id_order ON quiz_question_answer (`question_id`, `order`);
+
+-- Index quizzes by status for the quiz listing filters
+CREATE INDEX IF NOT EXISTS quiz_status_id ON quiz (`status`, `id`);
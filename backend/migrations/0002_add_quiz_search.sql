@@ -0,0 +1,23 @@
+-- Full text index over quiz names, with prefix indexes for search-as-you-type
+CREATE VIRTUAL TABLE IF NOT EXISTS quiz_search USING fts5(
+    `name`,
+    content = 'quiz',
+    content_rowid = 'id',
+    prefix = '2 3'
+);
+
+INSERT INTO quiz_search (quiz_search) VALUES ('rebuild');
+
+-- Keep the search index in sync with the quiz table
+CREATE TRIGGER IF NOT EXISTS quiz_search_insert AFTER INSERT ON quiz BEGIN
+    INSERT INTO quiz_search (rowid, `name`) VALUES (new.id, new.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_search_delete AFTER DELETE ON quiz BEGIN
+    INSERT INTO quiz_search (quiz_search, rowid, `name`) VALUES ('delete', old.id, old.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_search_update AFTER UPDATE OF `name` ON quiz BEGIN
+    INSERT INTO quiz_search (quiz_search, rowid, `name`) VALUES ('delete', old.id, old.name);
+    INSERT INTO quiz_search (rowid, `name`) VALUES (new.id, new.name);
+END;
@@ -0,0 +1,5 @@
+-- Covering indexes for keyset pagination of quiz listings, filtered by status.
+-- The quiz id is the rowid, so it is implicitly the last column of each index.
+CREATE INDEX IF NOT EXISTS quiz_status_updated_at ON quiz (`status`, `updated_at`);
+
+CREATE INDEX IF NOT EXISTS quiz_status_name ON quiz (`status`, `name`);
@@ -0,0 +1,41 @@
+-- Store the number of questions on each quiz, instead of counting them for every listed quiz
+ALTER TABLE quiz ADD COLUMN `question_count` INTEGER NOT NULL DEFAULT 0;
+
+UPDATE quiz SET `question_count` = (SELECT COUNT(*) FROM quiz_question WHERE quiz_question.quiz_id = quiz.id);
+
+CREATE TRIGGER IF NOT EXISTS quiz_question_count_insert AFTER INSERT ON quiz_question BEGIN
+    UPDATE quiz SET `question_count` = `question_count` + 1 WHERE id = new.quiz_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_question_count_delete AFTER DELETE ON quiz_question BEGIN
+    UPDATE quiz SET `question_count` = `question_count` - 1 WHERE id = old.quiz_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_question_count_update AFTER UPDATE OF `quiz_id` ON quiz_question BEGIN
+    UPDATE quiz SET `question_count` = `question_count` - 1 WHERE id = old.quiz_id;
+    UPDATE quiz SET `question_count` = `question_count` + 1 WHERE id = new.quiz_id;
+END;
+
+-- Store the number of quizzes with each status, instead of counting them for every quiz listing
+CREATE TABLE IF NOT EXISTS quiz_status_count (
+    `status` TEXT PRIMARY KEY NOT NULL,
+    `count`  INTEGER NOT NULL
+);
+
+INSERT INTO quiz_status_count (`status`, `count`) SELECT `status`, COUNT(*) FROM quiz GROUP BY `status`;
+
+CREATE TRIGGER IF NOT EXISTS quiz_status_count_insert AFTER INSERT ON quiz BEGIN
+    INSERT INTO quiz_status_count (`status`, `count`) VALUES (new.status, 1)
+    ON CONFLICT (`status`) DO UPDATE SET `count` = `count` + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_status_count_delete AFTER DELETE ON quiz BEGIN
+    UPDATE quiz_status_count SET `count` = `count` - 1 WHERE `status` = old.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_status_count_update AFTER UPDATE OF `status` ON quiz
+WHEN old.status != new.status BEGIN
+    UPDATE quiz_status_count SET `count` = `count` - 1 WHERE `status` = old.status;
+    INSERT INTO quiz_status_count (`status`, `count`) VALUES (new.status, 1)
+    ON CONFLICT (`status`) DO UPDATE SET `count` = `count` + 1;
+END;
@@ -0,0 +1,19 @@
+-- Version of the quiz collection, incremented on every change to a quiz so listings can be revalidated
+CREATE TABLE IF NOT EXISTS quiz_collection_version (
+    `id`      INTEGER PRIMARY KEY NOT NULL CHECK (`id` = 1),
+    `version` INTEGER NOT NULL
+);
+
+INSERT INTO quiz_collection_version (`id`, `version`) VALUES (1, 1) ON CONFLICT (`id`) DO NOTHING;
+
+CREATE TRIGGER IF NOT EXISTS quiz_collection_version_insert AFTER INSERT ON quiz BEGIN
+    UPDATE quiz_collection_version SET `version` = `version` + 1 WHERE `id` = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_collection_version_update AFTER UPDATE ON quiz BEGIN
+    UPDATE quiz_collection_version SET `version` = `version` + 1 WHERE `id` = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS quiz_collection_version_delete AFTER DELETE ON quiz BEGIN
+    UPDATE quiz_collection_version SET `version` = `version` + 1 WHERE `id` = 1;
+END;
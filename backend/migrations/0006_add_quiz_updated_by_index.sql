@@ -0,0 +1,2 @@
+-- Index quizzes by the user who last updated them, reloaded into the quiz store when that user changes
+CREATE INDEX IF NOT EXISTS quiz_updated_by ON quiz (`updated_by`);
@@ -1,35 +1,151 @@
 """This module contains functions for querying the database."""
 
+import logging
+import os
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
+import instrumentation
+import migrations
+import quiz_store
+import request_timing
 import utilities
 from _types.app import (
     Question,
+    QuestionIn,
+    QuestionUpdate,
     Quiz,
     QuizIn,
     QuizQuestionAnswer,
+    QuizQuestionAnswerIn,
+    QuizQuestionAnswerUpdate,
     QuizStatus,
     QuizWithQuestionCount,
+    Timestamp,
     User,
     UserRole,
 )
-from _types.queries import DatabaseUser
+from _types.queries import DatabaseUser, QuizSaveResult
 
 # Specify the path to your SQLite database file
-DATABASE_PATH = "database.db"
+DATABASE_PATH = os.environ.get("DATABASE_PATH", "database.db")
+
+# Where quizzes are read from: "sqlite", or "memory" to serve published and draft quizzes from an in-memory
+# store loaded at startup. Writes always go to SQLite.
+STORAGE_MODE = os.environ.get("STORAGE_MODE", "sqlite")
+
+# Statuses of the quizzes held by the in-memory store.
+STORE_STATUSES = [QuizStatus.QUIZ_STATUS_PUBLISHED.value, QuizStatus.QUIZ_STATUS_DRAFT.value]
+
+# Number of quizzes loaded into the store per query.
+STORE_LOAD_CHUNK_SIZE = 500
+
+# Number of quizzes whose status is changed per statement, below SQLite's limit of 999 variables before 3.32.
+STATUS_CHUNK_SIZE = 500
+
+
+def connect() -> sqlite3.Connection:
+    """Open a new connection to the database. Connections may be shared between threads but must not be used concurrently."""
+
+    if instrumentation.DATABASE_INSTRUMENTATION:
+        return sqlite3.connect(
+            DATABASE_PATH,
+            check_same_thread=False,
+            factory=instrumentation.InstrumentedConnection,
+        )
+
+    return sqlite3.connect(DATABASE_PATH, check_same_thread=False)
+
 
 # Connect to the database
-conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
+conn = connect()
+
+
+# The in-memory quiz store, when STORAGE_MODE is "memory".
+store: Optional[quiz_store.QuizStore] = None
+
+# IDs of the quizzes changed in the open transaction of each connection, reloaded into the store on commit.
+# The writer in async_queries also removes them from the quiz cache.
+_changed_quizzes: dict[sqlite3.Connection, list[int]] = {}
+
+
+@contextmanager
+def transaction(connection: sqlite3.Connection, immediate: bool = False) -> Iterator[None]:
+    """Run the block in a transaction, committed when the block ends or rolled back if it raises.
+
+    Inside another transaction, as when the writer in async_queries groups several writes into one commit,
+    the block runs in a savepoint instead. Raising then only undoes the block's own changes, and committing
+    is left to the outer transaction.
+    """
+
+    if connection.in_transaction:
+        changed = _changed_quizzes.get(connection)
+        changed_count = 0 if changed is None else len(changed)
+
+        connection.execute("SAVEPOINT write")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK TO write")
+            connection.execute("RELEASE write")
+            if connection in _changed_quizzes:
+                del _changed_quizzes[connection][changed_count:]
+            raise
+        else:
+            connection.execute("RELEASE write")
+        return
+
+    connection.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield
+    except BaseException:
+        rollback(connection)
+        raise
+    else:
+        commit(connection)
+
+
+def commit(connection: sqlite3.Connection) -> None:
+    """Commit the open transaction, then reload the quizzes it changed into the store."""
+
+    connection.commit()
+    publish_changes(connection)
+
+
+def publish_changes(connection: sqlite3.Connection) -> list[int]:
+    """Reload the quizzes changed by the transaction just committed on the connection into the store. Returns
+    the IDs of the changed quizzes."""
+
+    changed = _changed_quizzes.pop(connection, [])
+    if changed and store is not None:
+        refresh_store(changed, connection)
+
+    return changed
+
+
+def rollback(connection: sqlite3.Connection) -> None:
+    """Roll back the open transaction, forgetting the quizzes it changed."""
+
+    connection.rollback()
+    _changed_quizzes.pop(connection, None)
+
+
+def mark_quizzes_changed(connection: sqlite3.Connection, quiz_ids: list[int]) -> None:
+    """Record that the open transaction changed the quizzes, so the store is updated when it commits."""
+
+    _changed_quizzes.setdefault(connection, []).extend(quiz_ids)
 
 # User Management
 
 
-def get_database_user_by_username(username: str) -> Optional[DatabaseUser]:
+def get_database_user_by_username(
+    username: str, connection: Optional[sqlite3.Connection] = None
+) -> Optional[DatabaseUser]:
     """Get user from the database using the provided username."""
 
-    cursor = conn.cursor()
+    cursor = (connection or conn).cursor()
     cursor.execute(
         "SELECT `id`, `name`, `username`, `password`, `salt`, `created_at`, `role` FROM user WHERE username = ?",
         (username,),
@@ -41,13 +157,15 @@ def get_database_user_by_username(username: str) -> Optional[DatabaseUser]:
         return None
 
     return DatabaseUser(
-        row[0], row[1], row[2], row[3], row[4], utilities.convert_from_iso(row[5]), row[6]
+        row[0], row[1], row[2], row[3], row[4], Timestamp(row[5]), row[6]
     )
 
 
-def get_user(user_id: int) -> Optional[User]:
+def get_user(
+    user_id: int, connection: Optional[sqlite3.Connection] = None
+) -> Optional[User]:
     """Get user from the database using the provided ID."""
-    cursor = conn.cursor()
+    cursor = (connection or conn).cursor()
     cursor.execute(
         "SELECT `id`, `name`, `username`, `created_at`, `role` FROM user WHERE id = ?",
         (user_id,),
@@ -58,33 +176,102 @@ def get_user(user_id: int) -> Optional[User]:
     if row is None:
         return None
 
-    return User(row[0], row[1], row[2], utilities.convert_from_iso(row[3]), row[4])
+    return User(
+        row[0], row[1], row[2], Timestamp(row[3]), UserRole(row[4])
+    )
 
 
-def create_user(username: str, plain_password: str, name: str, role: str) -> int:
+def create_user(
+    username: str,
+    plain_password: str,
+    name: str,
+    role: str,
+    connection: Optional[sqlite3.Connection] = None,
+) -> int:
     """Create a new user in the database. Handles generating a salt and hashing the password."""
 
+    connection = connection or conn
+
     # Generate salt cryptographically
     salt = utilities.generate_salt()
 
     # Hash the password with the salt
     hashed_password = utilities.hash_password(plain_password, salt)
 
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO user (name, username, password, salt, created_at, role) VALUES (?, ?, ?, ?, ?, ?)",
-        (name, username, hashed_password, salt, datetime.now().isoformat(), role),
-    )
-    cursor.close()
-    conn.commit()
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            "INSERT INTO user (name, username, password, salt, created_at, role) VALUES (?, ?, ?, ?, ?, ?)",
+            (name, username, hashed_password, salt, datetime.now().isoformat(), role),
+        )
+        cursor.close()
 
     return cursor.lastrowid
 
 
-def count_users() -> int:
+def update_user_role(
+    user_id: int, role: UserRole, connection: Optional[sqlite3.Connection] = None
+) -> bool:
+    """Change the role of a user. Returns False if the user does not exist."""
+
+    connection = connection or conn
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute("UPDATE user SET role = ? WHERE id = ?", (role.value, user_id))
+        updated = cursor.rowcount > 0
+        mark_quizzes_updated_by_changed(cursor, user_id)
+        cursor.close()
+
+    return updated
+
+
+def update_user_password(
+    user_id: int, hashed_password: str, salt: str, connection: Optional[sqlite3.Connection] = None
+) -> bool:
+    """Replace the password hash and salt of a user. Returns False if the user does not exist."""
+
+    connection = connection or conn
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            "UPDATE user SET password = ?, salt = ? WHERE id = ?", (hashed_password, salt, user_id)
+        )
+        updated = cursor.rowcount > 0
+        cursor.close()
+
+    return updated
+
+
+def delete_user(user_id: int, connection: Optional[sqlite3.Connection] = None) -> bool:
+    """Delete a user. Returns False if the user does not exist."""
+
+    connection = connection or conn
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM user WHERE id = ?", (user_id,))
+        deleted = cursor.rowcount > 0
+        mark_quizzes_updated_by_changed(cursor, user_id)
+        cursor.close()
+
+    return deleted
+
+
+def mark_quizzes_updated_by_changed(cursor: sqlite3.Cursor, user_id: int) -> None:
+    """Record that the quizzes last updated by the user have changed, as each quiz in the store holds a copy
+    of that user."""
+
+    if store is not None:
+        cursor.execute("SELECT id FROM quiz WHERE updated_by = ?", (user_id,))
+        mark_quizzes_changed(cursor.connection, [row[0] for row in cursor.fetchall()])
+
+
+def count_users(connection: Optional[sqlite3.Connection] = None) -> int:
     """Count the number of users in the database."""
 
-    cursor = conn.cursor()
+    cursor = (connection or conn).cursor()
     cursor.execute("SELECT COUNT(*) FROM user")
     count = cursor.fetchone()[0]
     cursor.close()
@@ -95,13 +282,124 @@ def count_users() -> int:
 # Quiz Management
 
 
+# Sort orders for quiz listings, as the sort key and its direction. Ties are broken by the quiz ID.
+QUIZ_SORT_ORDERS = {
+    "updated_at": ("quiz.updated_at", "DESC"),
+    "name": ("quiz.name", "ASC"),
+    "id": ("quiz.id", "ASC"),
+    "relevance": ("quiz_search.rank", "ASC"),
+}
+
+
 def get_quizzes(
-    query: str, status_list: list[str], limit: int, offset: 0
+    query: str,
+    status_list: list[str],
+    limit: int,
+    offset: 0,
+    connection: Optional[sqlite3.Connection] = None,
 ) -> [list[QuizWithQuestionCount], int]:
     """Get quizzes from the database. Handles filtering by query and status, and paginating the results."""
 
+    results, count, _ = get_quizzes_page(
+        query, status_list, limit, offset, connection=connection
+    )
+
+    return results, count
+
+
+def get_quizzes_page(
+    query: str,
+    status_list: list[str],
+    limit: int,
+    offset: int,
+    sort: Optional[str] = None,
+    page_cursor: Optional[str] = None,
+    connection: Optional[sqlite3.Connection] = None,
+) -> [list[QuizWithQuestionCount], int, Optional[str]]:
+    """Get a page of quizzes from the database, along with the total count and the cursor for the next page.
+
+    Pages are either fetched by offset or, when a cursor from a previous page is passed, by seeking
+    directly to the sort key of the last quiz returned, so every page costs the same to fetch.
+    Raises ValueError if the sort order or cursor is invalid.
+    """
+
+    connection = connection or conn
+
+    if not status_list:
+        return [], 0, None
+
+    search_query = utilities.build_search_query(query)
+
+    # A search without any words, such as only punctuation, matches no quiz names.
+    if query.strip() and not search_query:
+        return [], 0, None
+
+    # Default to ranking search results by relevance, otherwise show the most recently updated quizzes first.
+    sort = sort or ("relevance" if search_query else "updated_at")
+    if sort not in QUIZ_SORT_ORDERS or (sort == "relevance" and not search_query):
+        raise ValueError(f"Invalid sort '{sort}'")
+
+    sort_key, direction = QUIZ_SORT_ORDERS[sort]
+    order_by = f"{sort_key} {direction}, quiz.id {direction}"
+
+    # Seek past the last quiz of the previous page.
+    keyset_filter = ""
+    keyset_parameters = ()
+    if page_cursor:
+        cursor_sort, *keyset_parameters = utilities.decode_cursor(page_cursor)
+        if cursor_sort != sort or len(keyset_parameters) != 2:
+            raise ValueError("Cursor does not match the sort order")
+
+        comparison = "<" if direction == "DESC" else ">"
+        keyset_filter = f"AND ({sort_key}, quiz.id) {comparison} (?, ?)"
+        offset = 0
+
+    if store is not None and store.covers(status_list):
+        results, count, last = store.page(
+            status_list, query, sort, tuple(keyset_parameters) or None, offset, limit
+        )
+        next_cursor = None if last is None else utilities.encode_cursor([sort, *last])
+
+        return results, count, next_cursor
+
+    # Fetch one extra quiz to find out if there is a next page.
+    page_limit = offset + limit + 1
+
+    if search_query:
+        # Search quiz names through the full text index.
+        page_query = f"""
+            SELECT quiz.id, {sort_key} AS sort_key
+            FROM quiz_search JOIN quiz ON quiz.id = quiz_search.rowid
+            WHERE
+                quiz_search MATCH ?
+                AND quiz.status in {utilities.build_list(len(status_list))}
+                {keyset_filter}
+            ORDER BY {order_by}
+            LIMIT ?
+        """
+        page_parameters = (search_query, *status_list, *keyset_parameters, page_limit)
+    else:
+        # Read each status in sort order from its index and merge them, instead of sorting every quiz.
+        page_query = " UNION ALL ".join(
+            f"""
+                SELECT * FROM (
+                    SELECT quiz.id, {sort_key} AS sort_key
+                    FROM quiz
+                    WHERE quiz.status = ? {keyset_filter}
+                    ORDER BY {order_by}
+                    LIMIT ?
+                )
+            """
+            for _ in status_list
+        )
+        page_parameters = tuple(
+            parameter
+            for status in status_list
+            for parameter in (status, *keyset_parameters, page_limit)
+        )
+
     # Query quizzes
-    cursor = conn.cursor()
+    cursor = connection.cursor()
     cursor.execute(
         f"""
             SELECT
@@ -110,85 +408,187 @@ def get_quizzes(
                 quiz.status,
                 quiz.created_at,
                 quiz.updated_at,
-                (SELECT COUNT(*) FROM quiz_question WHERE quiz_question.quiz_id = quiz.id) AS question_count,
+                quiz.question_count,
                 quiz.updated_by,
                 user.name AS user_name,
                 user.username AS user_username,
                 user.created_at AS user_created_at,
-                user.role AS user_role
+                user.role AS user_role,
+                page.sort_key
             FROM
-                quiz
+                ({page_query}) AS page
+                JOIN quiz ON quiz.id = page.id
                 LEFT JOIN user ON user.id = quiz.updated_by
-            WHERE
-                (quiz.name LIKE ? OR ? = '')
-                AND quiz.status in {utilities.build_list(len(status_list))}
+            ORDER BY page.sort_key {direction}, page.id {direction}
             LIMIT ? OFFSET ?
         """,
         (
-            "%" + query + "%",
-            query,
-            *status_list,
-            limit,
+            *page_parameters,
+            limit + 1,
             offset,
         ),
     )
     rows = cursor.fetchall()
     cursor.close()
 
-    if rows:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = utilities.encode_cursor([sort, rows[-1][11], rows[-1][0]])
+
+    with request_timing.measure("assembly"):
         results = [
             QuizWithQuestionCount(
                 id=row[0],
                 name=row[1],
                 status=QuizStatus(row[2]),
                 questions=None,
-                created_at=utilities.convert_from_iso(row[3]),
-                updated_at=utilities.convert_from_iso(row[4]),
+                created_at=Timestamp(row[3]),
+                updated_at=Timestamp(row[4]),
                 question_count=row[5],
                 updated_by=User(
                     id=row[6],
                     name=row[7],
                     username=row[8],
-                    created_at=utilities.convert_from_iso(row[9]),
+                    created_at=Timestamp(row[9]),
                     role=UserRole(row[10]),
                 ),
             )
             for row in rows
         ]
-    else:
-        results = []
 
-    # Get the total count of quizzes
-    cursor = conn.cursor()
-    cursor.execute(
-        f"""
-            SELECT
-                COUNT(*)
-            FROM
-                quiz
-            WHERE
-                (quiz.name LIKE ? OR ? = '')
-                AND quiz.status in {utilities.build_list(len(status_list))}
-        """,
-        (
-            "%" + query + "%",
-            query,
-            *status_list,
-        ),
-    )
+    # Get the total count of quizzes, from the maintained status counters unless searching.
+    cursor = connection.cursor()
+    if search_query:
+        cursor.execute(
+            f"""
+                SELECT
+                    COUNT(*)
+                FROM
+                    quiz_search JOIN quiz ON quiz.id = quiz_search.rowid
+                WHERE
+                    quiz_search MATCH ?
+                    AND quiz.status in {utilities.build_list(len(status_list))}
+            """,
+            (
+                search_query,
+                *status_list,
+            ),
+        )
+    else:
+        cursor.execute(
+            f"""
+                SELECT
+                    COALESCE(SUM(count), 0)
+                FROM
+                    quiz_status_count
+                WHERE
+                    status in {utilities.build_list(len(status_list))}
+            """,
+            status_list,
+        )
     rows = cursor.fetchone()
     count = rows[0] if rows else 0
     cursor.close()
 
-    return results, count
+    return results, count, next_cursor
 
 
-def get_quiz(quiz_id: int, include_answers: bool) -> Optional[Quiz]:
+def get_quiz_updated_at(
+    quiz_id: int, connection: Optional[sqlite3.Connection] = None
+) -> Optional[datetime]:
+    """Get when a quiz was last updated, or None if it does not exist."""
+
+    if store is not None:
+        updated_at = store.get_updated_at(quiz_id)
+        if updated_at is not None:
+            return updated_at.to_datetime()
+
+    cursor = (connection or conn).cursor()
+    cursor.execute("SELECT updated_at FROM quiz WHERE id = ?", (quiz_id,))
+    row = cursor.fetchone()
+    cursor.close()
+
+    if row is None:
+        return None
+
+    return utilities.convert_from_iso(row[0])
+
+
+def get_quiz_collection_version(
+    connection: Optional[sqlite3.Connection] = None,
+) -> int:
+    """Get the version of the quiz collection, which changes whenever any quiz is changed."""
+
+    cursor = (connection or conn).cursor()
+    cursor.execute("SELECT version FROM quiz_collection_version WHERE id = 1")
+    row = cursor.fetchone()
+    cursor.close()
+
+    return row[0] if row else 0
+
+
+def get_quiz(
+    quiz_id: int,
+    include_answers: bool,
+    connection: Optional[sqlite3.Connection] = None,
+) -> Optional[Quiz]:
     """Get a quiz from the database using the provided ID."""
 
-    cursor = conn.cursor()
+    quizzes = get_quizzes_by_ids([quiz_id], include_answers, connection)
+
+    return quizzes[0] if len(quizzes) > 0 else None
+
+
+def get_quizzes_by_ids(
+    quiz_ids: list[int],
+    include_answers: bool,
+    connection: Optional[sqlite3.Connection] = None,
+) -> List[Quiz]:
+    """Get several quizzes, in the order of the provided IDs. Quizzes which do not exist are left out.
+
+    Quizzes in the store are taken from it, and the rest are loaded from the database.
+    """
+
+    if store is None:
+        return load_quizzes_by_ids(quiz_ids, include_answers, connection)
+
+    quizzes = {}
+    missing_ids = []
+
+    for quiz_id in quiz_ids:
+        quiz = store.get(quiz_id, include_answers)
+        if quiz is None:
+            missing_ids.append(quiz_id)
+        else:
+            quizzes[quiz_id] = quiz
+
+    for quiz in load_quizzes_by_ids(missing_ids, include_answers, connection):
+        quizzes[quiz.id] = quiz
+
+    return [quizzes[quiz_id] for quiz_id in quiz_ids if quiz_id in quizzes]
+
+
+def load_quizzes_by_ids(
+    quiz_ids: list[int],
+    include_answers: bool,
+    connection: Optional[sqlite3.Connection] = None,
+) -> List[Quiz]:
+    """Load several quizzes from the database, in the order of the provided IDs.
+
+    The quizzes, their questions and their answers are read with one ordered query each, so every row is
+    read once, and then merged in a single pass. Quizzes which do not exist are left out of the result.
+    """
+
+    if len(quiz_ids) == 0:
+        return []
+
+    placeholders = utilities.build_list(len(quiz_ids))
+    parameters = list(quiz_ids)
+
+    cursor = (connection or conn).cursor()
     cursor.execute(
-        """
+        f"""
             SELECT
                 quiz.id,
                 quiz.name,
@@ -199,99 +599,239 @@ def get_quiz(quiz_id: int, include_answers: bool) -> Optional[Quiz]:
                 user.name AS user_name,
                 user.username AS user_username,
                 user.created_at AS user_created_at,
-                user.role AS user_role,
-                quiz_question.id AS quiz_question_id,
-                quiz_question.name AS quiz_question_name,
-                quiz_question.`order` AS quiz_question_order,
-                quiz_question_answer.id AS quiz_question_answer_id,
-                quiz_question_answer.name AS quiz_question_answer,
-                quiz_question_answer.`order` AS quiz_question_answer_order,
-                quiz_question_answer.is_correct AS quiz_question_answer_is_correct
+                user.role AS user_role
             FROM
                 quiz
                 LEFT JOIN user ON user.id = quiz.updated_by
-                JOIN quiz_question ON quiz_question.quiz_id = quiz.id
-                JOIN quiz_question_answer ON quiz_question_answer.question_id = quiz_question.id
             WHERE
-                quiz.id = ?
-            ORDER BY quiz_question_order, quiz_question_answer_order
+                quiz.id IN {placeholders}
         """,
-        (quiz_id,),
+        parameters,
     )
-    rows = cursor.fetchall()
+    quiz_rows = cursor.fetchall()
+
+    if len(quiz_rows) == 0:
+        cursor.close()
+        return []
+
+    cursor.execute(
+        f"""
+            SELECT
+                quiz_question.id,
+                quiz_question.quiz_id,
+                quiz_question.name,
+                quiz_question.`order`
+            FROM quiz_question
+            WHERE quiz_question.quiz_id IN {placeholders}
+            ORDER BY quiz_question.quiz_id, quiz_question.`order`, quiz_question.id
+        """,
+        parameters,
+    )
+    question_rows = cursor.fetchall()
+
+    cursor.execute(
+        f"""
+            SELECT
+                quiz_question_answer.id,
+                quiz_question_answer.question_id,
+                quiz_question_answer.name,
+                quiz_question_answer.`order`,
+                quiz_question_answer.is_correct
+            FROM
+                quiz_question
+                JOIN quiz_question_answer ON quiz_question_answer.question_id = quiz_question.id
+            WHERE quiz_question.quiz_id IN {placeholders}
+            ORDER BY quiz_question_answer.question_id, quiz_question_answer.`order`, quiz_question_answer.id
+        """,
+        parameters,
+    )
+    answer_rows = cursor.fetchall()
     cursor.close()
 
-    if len(rows) == 0:
-        return None
+    with request_timing.measure("assembly"):
+        questions = extract_questions(question_rows, answer_rows, include_answers)
+        quizzes = {
+            row[0]: extract_quiz(row, questions.get(row[0], [])) for row in quiz_rows
+        }
 
-    first_row = rows[0]
-    quiz = Quiz(
-        name=first_row[1],
-        status=QuizStatus(first_row[2]),
-        questions=extract_questions(rows, include_answers),
-        created_at=utilities.convert_from_iso(first_row[3]),
-        updated_at=utilities.convert_from_iso(first_row[4]),
-        updated_by=User(
-            id=first_row[5],
-            name=first_row[6],
-            username=first_row[7],
-            created_at=utilities.convert_from_iso(first_row[8]),
-            role=UserRole(first_row[9]),
-        ),
-        id=first_row[0],
+    return [quizzes[quiz_id] for quiz_id in quiz_ids if quiz_id in quizzes]
+
+
+def load_store(connection: Optional[sqlite3.Connection] = None) -> quiz_store.QuizStore:
+    """Load every quiz of the store's statuses from the database into a new store."""
+
+    connection = connection or conn
+
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT id FROM quiz WHERE status IN {utilities.build_list(len(STORE_STATUSES))} ORDER BY id",
+        STORE_STATUSES,
     )
+    quiz_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
 
-    return quiz
+    new_store = quiz_store.QuizStore(STORE_STATUSES)
+    # Stored all at once, as each replacement copies the store's indexes.
+    new_store.replace(load_store_quizzes(quiz_ids, connection))
 
+    return new_store
 
-def extract_questions(rows, include_answers: bool) -> List[Question]:
-    """Extract questions from the provided rows."""
 
-    questions = {}
+def load_store_quizzes(quiz_ids: list[int], connection: sqlite3.Connection) -> dict[int, Optional[Quiz]]:
+    """Load quizzes for the store, STORE_LOAD_CHUNK_SIZE at a time. Quizzes which do not exist are None."""
 
-    for row in rows:
-        question_id = row[10]
+    quizzes: dict[int, Optional[Quiz]] = dict.fromkeys(quiz_ids)
 
-        if question_id not in questions:
-            questions[question_id] = Question(
-                name=row[11],
-                order=row[12],
-                id=question_id,
-                answers=[],
-                quiz_id=row[0]
-            )
+    for start in range(0, len(quiz_ids), STORE_LOAD_CHUNK_SIZE):
+        chunk = quiz_ids[start : start + STORE_LOAD_CHUNK_SIZE]
+        quizzes.update((quiz.id, quiz) for quiz in load_quizzes_by_ids(chunk, True, connection))
+
+    return quizzes
+
+
+def refresh_store(quiz_ids: list[int], connection: Optional[sqlite3.Connection] = None) -> None:
+    """Reload the quizzes into the store from the database, all at once. Quizzes which no longer exist, or are
+    no longer of the store's statuses, are removed from it.
+
+    The changes have already been committed, so this never raises. If the quizzes can not be reloaded the
+    store can no longer be trusted, so it is dropped and quizzes are read from the database from then on.
+    """
+
+    global store
+
+    quiz_ids = list(dict.fromkeys(quiz_ids))
+
+    try:
+        store.replace(load_store_quizzes(quiz_ids, connection or conn))
+    except Exception:
+        logging.exception("Could not reload changed quizzes, reading quizzes from the database instead")
+        store = None
+
+
+def extract_quiz(row, questions: List[Question]) -> Quiz:
+    """Extract a quiz and the user who last updated it from the provided row."""
+
+    updated_by = None
+    if row[6] is not None:
+        updated_by = User(
+            id=row[5],
+            name=row[6],
+            username=row[7],
+            created_at=Timestamp(row[8]),
+            role=UserRole(row[9]),
+        )
+
+    return Quiz(
+        name=row[1],
+        status=QuizStatus(row[2]),
+        questions=questions,
+        created_at=Timestamp(row[3]),
+        updated_at=Timestamp(row[4]),
+        updated_by=updated_by,
+        id=row[0],
+    )
+
+
+def extract_questions(
+    question_rows, answer_rows, include_answers: bool
+) -> dict[int, List[Question]]:
+    """Extract the questions of each quiz from the provided rows, keyed by quiz ID.
 
+    Question rows must be ordered by quiz and question order, and answer rows by question and answer order,
+    so the questions and answers are appended in order and never need sorting.
+    """
+
+    questions_by_quiz: dict[int, List[Question]] = {}
+    questions: dict[int, Question] = {}
+
+    # Arguments are passed by position, in the order of the fields, as keyword arguments take twice as long
+    # to pass for thousands of rows.
+    for question_id, quiz_id, name, order in question_rows:
+        question = Question(name, order, [], question_id, quiz_id)
+
+        questions[question_id] = question
+        questions_by_quiz.setdefault(quiz_id, []).append(question)
+
+    for answer_id, question_id, name, order, is_correct in answer_rows:
         questions[question_id].answers.append(
             QuizQuestionAnswer(
-                name=row[14],
-                order=row[15],
-                is_correct=bool(row[16]) if include_answers else None,
-                id=row[13],
-                question_id=question_id,
+                name, order, bool(is_correct) if include_answers else None, answer_id, question_id
             )
         )
 
-        # Sort answers by order
-        questions[question_id].answers.sort(key=lambda x: x.order)
+    return questions_by_quiz
+
+
+def get_quizzes_for_export(
+    status_list: list[str],
+    updated_since: Optional[datetime],
+    updated_until: Optional[datetime],
+    after_id: int,
+    limit: int,
+    connection: Optional[sqlite3.Connection] = None,
+) -> List[Quiz]:
+    """Get the next quizzes to export, with their questions and answers, ordered by ID.
 
-    values = list(questions.values())
-    values.sort(key=lambda x: x.order)
+    Only quizzes with an ID after after_id are returned, so the whole catalogue can be read in pages by
+    passing the ID of the last quiz of the previous page. updated_since is inclusive and updated_until is
+    exclusive.
+    """
+
+    if len(status_list) == 0:
+        return []
+
+    filters = [f"status IN {utilities.build_list(len(status_list))}", "id > ?"]
+    parameters: list = [*status_list, after_id]
+
+    if updated_since is not None:
+        filters.append("updated_at >= ?")
+        parameters.append(updated_since.isoformat())
+
+    if updated_until is not None:
+        filters.append("updated_at < ?")
+        parameters.append(updated_until.isoformat())
+
+    connection = connection or conn
+
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT id FROM quiz WHERE {' AND '.join(filters)} ORDER BY id LIMIT ?",
+        [*parameters, limit],
+    )
+    quiz_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
 
-    return values
+    return get_quizzes_by_ids(quiz_ids, True, connection)
 
 
-def create_update_quiz(user_id: int, quiz_id: int, quiz: QuizIn) -> int:
+def create_update_quiz(
+    user_id: int,
+    quiz_id: int,
+    quiz: QuizIn,
+    connection: Optional[sqlite3.Connection] = None,
+) -> int:
     """Create a new quiz in the database."""
 
-    try:
-        cursor = conn.cursor()
+    return save_quiz(user_id, quiz_id, quiz, connection=connection).quiz_id
 
-        if quiz_id:
-            cursor.execute(
-                "DELETE FROM quiz_question_answer WHERE question_id IN (SELECT id FROM quiz_question WHERE quiz_id = ?);",
-                (quiz_id,),
-            )
-            cursor.execute("DELETE FROM quiz_question WHERE quiz_id = ?;", (quiz_id,))
+
+def save_quiz(
+    user_id: int,
+    quiz_id: Optional[int],
+    quiz: QuizIn,
+    connection: Optional[sqlite3.Connection] = None,
+) -> QuizSaveResult:
+    """Create or update a quiz in the database, only writing the questions and answers which have changed.
+
+    Incoming questions and answers are matched to the stored rows by ID, or otherwise by order, so
+    unchanged rows keep their IDs. Returns the quiz ID and the number of rows inserted, updated or deleted.
+    """
+
+    connection = connection or conn
+    rows_touched = 0
+
+    with transaction(connection):
+        cursor = connection.cursor()
 
         cursor.execute(
             """
@@ -313,33 +853,684 @@ def create_update_quiz(user_id: int, quiz_id: int, quiz: QuizIn) -> int:
                 user_id,
             ),
         )
+        rows_touched += cursor.rowcount
 
         if not quiz_id:
             quiz_id = cursor.lastrowid
 
-        for question in quiz.questions:
+        if quiz.questions is not None:
+            rows_touched += save_quiz_questions(cursor, quiz_id, quiz.questions)
+
+        cursor.close()
+        mark_quizzes_changed(connection, [quiz_id])
+
+    return QuizSaveResult(quiz_id=quiz_id, rows_touched=rows_touched)
+
+
+def save_quiz_questions(
+    cursor: sqlite3.Cursor, quiz_id: int, questions: list[QuestionIn]
+) -> int:
+    """Write the differences between the stored and provided questions of a quiz. Returns the number of rows changed."""
+
+    cursor.execute(
+        "SELECT id, name, `order` FROM quiz_question WHERE quiz_id = ?", (quiz_id,)
+    )
+    existing_questions = {row[0]: row for row in cursor.fetchall()}
+
+    cursor.execute(
+        """
+            SELECT
+                quiz_question_answer.id,
+                quiz_question_answer.name,
+                quiz_question_answer.`order`,
+                quiz_question_answer.is_correct,
+                quiz_question_answer.question_id
+            FROM
+                quiz_question
+                JOIN quiz_question_answer ON quiz_question_answer.question_id = quiz_question.id
+            WHERE
+                quiz_question.quiz_id = ?
+        """,
+        (quiz_id,),
+    )
+    existing_answers = {}
+    for row in cursor.fetchall():
+        existing_answers.setdefault(row[4], {})[row[0]] = row
+
+    question_matches, deleted_question_ids = match_rows(questions, existing_questions)
+
+    # IDs are allocated up front so new questions and their answers can be inserted in batches.
+    # This is safe as the quiz has already been written, so this transaction holds the write lock.
+    next_question_id = get_next_id(cursor, "quiz_question")
+    next_answer_id = get_next_id(cursor, "quiz_question_answer")
+
+    question_inserts = []
+    question_updates = []
+    answer_inserts = []
+    answer_updates = []
+    answer_deletes = []
+
+    for question, existing_question in question_matches:
+        if existing_question is None:
+            question_id = next_question_id
+            next_question_id += 1
+            question_inserts.append((question_id, question.name, question.order, quiz_id))
+            answer_matches, deleted_answer_ids = match_rows(question.answers, {})
+        else:
+            question_id = existing_question[0]
+            if (question.name, question.order) != existing_question[1:]:
+                question_updates.append((question.name, question.order, question_id))
+            answer_matches, deleted_answer_ids = match_rows(
+                question.answers, existing_answers.get(question_id, {})
+            )
+
+        for answer, existing_answer in answer_matches:
+            if existing_answer is None:
+                answer_inserts.append(
+                    (
+                        next_answer_id,
+                        answer.name,
+                        answer.order,
+                        answer.is_correct,
+                        question_id,
+                    )
+                )
+                next_answer_id += 1
+            elif (answer.name, answer.order, bool(answer.is_correct)) != (
+                existing_answer[1],
+                existing_answer[2],
+                bool(existing_answer[3]),
+            ):
+                answer_updates.append(
+                    (answer.name, answer.order, answer.is_correct, existing_answer[0])
+                )
+
+        answer_deletes.extend((answer_id,) for answer_id in deleted_answer_ids)
+
+    rows_touched = 0
+
+    for query, parameters in [
+        ("DELETE FROM quiz_question_answer WHERE id = ?", answer_deletes),
+        (
+            "DELETE FROM quiz_question_answer WHERE question_id = ?",
+            [(question_id,) for question_id in deleted_question_ids],
+        ),
+        (
+            "DELETE FROM quiz_question WHERE id = ?",
+            [(question_id,) for question_id in deleted_question_ids],
+        ),
+        (
+            "UPDATE quiz_question SET name = ?, `order` = ? WHERE id = ?",
+            question_updates,
+        ),
+        (
+            "INSERT INTO quiz_question (id, name, `order`, quiz_id) VALUES (?, ?, ?, ?)",
+            question_inserts,
+        ),
+        (
+            "UPDATE quiz_question_answer SET name = ?, `order` = ?, is_correct = ? WHERE id = ?",
+            answer_updates,
+        ),
+        (
+            "INSERT INTO quiz_question_answer (id, name, `order`, is_correct, question_id) VALUES (?, ?, ?, ?, ?)",
+            answer_inserts,
+        ),
+    ]:
+        if parameters:
+            cursor.executemany(query, parameters)
+            rows_touched += cursor.rowcount
+
+    return rows_touched
+
+
+def match_rows(items: list, existing_rows: dict[int, tuple]) -> tuple[list, list[int]]:
+    """Match provided questions or answers to existing rows, first by ID and then by order.
+
+    Existing rows must start with their ID, name and order. Returns the list of items paired with their
+    matching row, or None if they are new, and the IDs of the existing rows which were not matched.
+    """
+
+    unmatched_rows = dict(existing_rows)
+    matches = []
+
+    for item in items:
+        row = unmatched_rows.pop(item.id, None) if item.id is not None else None
+        matches.append([item, row])
+
+    rows_by_order = {}
+    for row in unmatched_rows.values():
+        rows_by_order.setdefault(row[2], []).append(row)
+
+    for match in matches:
+        if match[1] is None and rows_by_order.get(match[0].order):
+            match[1] = rows_by_order[match[0].order].pop(0)
+            del unmatched_rows[match[1][0]]
+
+    return [tuple(match) for match in matches], list(unmatched_rows)
+
+
+def get_next_id(cursor: sqlite3.Cursor, table: str) -> int:
+    """Get the next unused ID of the table."""
+
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+
+    return cursor.fetchone()[0]
+
+
+def insert_quizzes(
+    user_id: int,
+    quizzes: list[QuizIn],
+    connection: Optional[sqlite3.Connection] = None,
+) -> list[int]:
+    """Insert new quizzes with their questions and answers in a single transaction. Returns the quiz IDs.
+
+    IDs are allocated up front, so every table is written with one batched statement no matter how many
+    quizzes are inserted.
+    """
+
+    connection = connection or conn
+
+    if len(quizzes) == 0:
+        return []
+
+    # Take the write lock before reading the next IDs, so no other connection can allocate them.
+    with transaction(connection, immediate=True):
+        cursor = connection.cursor()
+
+        next_quiz_id = get_next_id(cursor, "quiz")
+        next_question_id = get_next_id(cursor, "quiz_question")
+        next_answer_id = get_next_id(cursor, "quiz_question_answer")
+
+        now = datetime.now().isoformat()
+        quiz_ids = []
+        quiz_inserts = []
+        question_inserts = []
+        answer_inserts = []
+
+        for quiz in quizzes:
+            quiz_id = next_quiz_id
+            next_quiz_id += 1
+
+            quiz_ids.append(quiz_id)
+            quiz_inserts.append((quiz_id, quiz.name, quiz.status.value, now, now, user_id))
+
+            for question in quiz.questions or []:
+                question_id = next_question_id
+                next_question_id += 1
+
+                question_inserts.append((question_id, question.name, question.order, quiz_id))
+
+                for answer in question.answers:
+                    answer_inserts.append(
+                        (
+                            next_answer_id,
+                            answer.name,
+                            answer.order,
+                            answer.is_correct,
+                            question_id,
+                        )
+                    )
+                    next_answer_id += 1
+
+        cursor.executemany(
+            "INSERT INTO quiz (id, name, status, created_at, updated_at, updated_by) VALUES (?, ?, ?, ?, ?, ?)",
+            quiz_inserts,
+        )
+        cursor.executemany(
+            "INSERT INTO quiz_question (id, name, `order`, quiz_id) VALUES (?, ?, ?, ?)",
+            question_inserts,
+        )
+        cursor.executemany(
+            "INSERT INTO quiz_question_answer (id, name, `order`, is_correct, question_id) VALUES (?, ?, ?, ?, ?)",
+            answer_inserts,
+        )
+
+        cursor.close()
+        mark_quizzes_changed(connection, quiz_ids)
+
+    return quiz_ids
+
+
+def set_quiz_status(
+    user_id: int,
+    quiz_ids: list[int],
+    status: QuizStatus,
+    connection: Optional[sqlite3.Connection] = None,
+) -> int:
+    """Change the status of the quizzes in a single transaction. Returns the number of quizzes which exist.
+
+    The IDs are bound STATUS_CHUNK_SIZE at a time, so any number of quizzes can be changed at once.
+    """
+
+    connection = connection or conn
+    updated_at = datetime.now().isoformat()
+    quiz_ids = list(dict.fromkeys(quiz_ids))
+    updated = 0
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        for start in range(0, len(quiz_ids), STATUS_CHUNK_SIZE):
+            chunk = quiz_ids[start : start + STATUS_CHUNK_SIZE]
+            cursor.execute(
+                f"""
+                    UPDATE quiz SET status = ?, updated_at = ?, updated_by = ?
+                    WHERE id IN {utilities.build_list(len(chunk))}
+                """,
+                [status.value, updated_at, user_id, *chunk],
+            )
+            updated += cursor.rowcount
+        cursor.close()
+        mark_quizzes_changed(connection, quiz_ids)
+
+    return updated
+
+
+# Question and Answer Management
+#
+# These functions change a single question or answer, renumbering its siblings when one is inserted or deleted,
+# and mark the quiz as updated. Each raises ValueError if the change would leave the quiz invalid.
+
+
+def touch_quiz(cursor: sqlite3.Cursor, user_id: int, quiz_id: int) -> bool:
+    """Mark a quiz as updated by the user. Returns False if the quiz does not exist."""
+
+    cursor.execute(
+        "UPDATE quiz SET updated_at = ?, updated_by = ? WHERE id = ?",
+        (datetime.now().isoformat(), user_id, quiz_id),
+    )
+    mark_quizzes_changed(cursor.connection, [quiz_id])
+
+    return cursor.rowcount > 0
+
+
+def clamp_order(order: int, count: int) -> int:
+    """Clamp the order of a question or answer inserted among count siblings to between 1 and count + 1."""
+
+    return min(max(order, 1), count + 1)
+
+
+def get_question(
+    cursor: sqlite3.Cursor, quiz_id: int, question_id: int
+) -> Optional[Question]:
+    """Get a question of a quiz with its answers, or None if it does not exist."""
+
+    cursor.execute(
+        "SELECT id, name, `order` FROM quiz_question WHERE id = ? AND quiz_id = ?",
+        (question_id, quiz_id),
+    )
+    row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    cursor.execute(
+        """
+            SELECT id, name, `order`, is_correct
+            FROM quiz_question_answer
+            WHERE question_id = ?
+            ORDER BY `order`, id
+        """,
+        (question_id,),
+    )
+
+    return Question(
+        name=row[1],
+        order=row[2],
+        id=row[0],
+        quiz_id=quiz_id,
+        answers=[
+            QuizQuestionAnswer(
+                name=answer_row[1],
+                order=answer_row[2],
+                is_correct=bool(answer_row[3]),
+                id=answer_row[0],
+                question_id=question_id,
+            )
+            for answer_row in cursor.fetchall()
+        ],
+    )
+
+
+def update_question(
+    user_id: int,
+    quiz_id: int,
+    question_id: int,
+    question: QuestionUpdate,
+    connection: Optional[sqlite3.Connection] = None,
+) -> Optional[Question]:
+    """Change the text of a question. Returns the updated question, or None if it does not exist."""
+
+    connection = connection or conn
+
+    if not question.name:
+        raise ValueError("question.name: Missing question name")
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            "UPDATE quiz_question SET name = ? WHERE id = ? AND quiz_id = ?",
+            (question.name, question_id, quiz_id),
+        )
+
+        updated_question = None
+        if cursor.rowcount > 0:
+            touch_quiz(cursor, user_id, quiz_id)
+            updated_question = get_question(cursor, quiz_id, question_id)
+
+        cursor.close()
+
+    return updated_question
+
+
+def insert_question(
+    user_id: int,
+    quiz_id: int,
+    question: QuestionIn,
+    connection: Optional[sqlite3.Connection] = None,
+) -> Optional[Question]:
+    """Insert a question with its answers at its order, moving the questions after it down. Orders before the
+    first question or after the last are clamped to them, so the questions stay numbered from 1 without gaps.
+
+    Returns the inserted question, or None if the quiz does not exist.
+    """
+
+    connection = connection or conn
+
+    with transaction(connection):
+        cursor = connection.cursor()
+
+        inserted_question = None
+        if touch_quiz(cursor, user_id, quiz_id):
+            cursor.execute("SELECT COUNT(*) FROM quiz_question WHERE quiz_id = ?", (quiz_id,))
+            order = clamp_order(question.order, cursor.fetchone()[0])
+
+            cursor.execute(
+                "UPDATE quiz_question SET `order` = `order` + 1 WHERE quiz_id = ? AND `order` >= ?",
+                (quiz_id, order),
+            )
             cursor.execute(
                 "INSERT INTO quiz_question (name, `order`, quiz_id) VALUES (?, ?, ?)",
-                (question.name, question.order, quiz_id),
+                (question.name, order, quiz_id),
             )
             question_id = cursor.lastrowid
 
-            for answer in question.answers:
-                cursor.execute(
-                    "INSERT INTO quiz_question_answer (name, `order`, is_correct, question_id) VALUES (?, ?, ?, ?)",
-                    (answer.name, answer.order, answer.is_correct, question_id),
-                )
+            cursor.executemany(
+                "INSERT INTO quiz_question_answer (name, `order`, is_correct, question_id) VALUES (?, ?, ?, ?)",
+                [
+                    (answer.name, answer.order, answer.is_correct, question_id)
+                    for answer in question.answers
+                ],
+            )
+
+            inserted_question = get_question(cursor, quiz_id, question_id)
 
         cursor.close()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    else:
-        conn.commit()
 
-    return quiz_id
+    return inserted_question
+
+
+def delete_question(
+    user_id: int,
+    quiz_id: int,
+    question_id: int,
+    connection: Optional[sqlite3.Connection] = None,
+) -> bool:
+    """Delete a question and its answers, moving the questions after it up. Returns False if it does not exist."""
+
+    connection = connection or conn
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT `order` FROM quiz_question WHERE id = ? AND quiz_id = ?",
+            (question_id, quiz_id),
+        )
+        row = cursor.fetchone()
+
+        if row is not None:
+            cursor.execute("SELECT question_count FROM quiz WHERE id = ?", (quiz_id,))
+            if cursor.fetchone()[0] <= 1:
+                raise ValueError("quiz.questions: A quiz must have at least one question")
+
+            cursor.execute(
+                "DELETE FROM quiz_question_answer WHERE question_id = ?", (question_id,)
+            )
+            cursor.execute("DELETE FROM quiz_question WHERE id = ?", (question_id,))
+            cursor.execute(
+                "UPDATE quiz_question SET `order` = `order` - 1 WHERE quiz_id = ? AND `order` > ?",
+                (quiz_id, row[0]),
+            )
+            touch_quiz(cursor, user_id, quiz_id)
+
+        cursor.close()
+
+    return row is not None
+
+
+def check_question_has_correct_answer(cursor: sqlite3.Cursor, question_id: int) -> None:
+    """Raise ValueError if the question has no answers, or none of them are correct."""
+
+    cursor.execute(
+        "SELECT COUNT(*), COALESCE(MAX(is_correct), 0) FROM quiz_question_answer WHERE question_id = ?",
+        (question_id,),
+    )
+    answer_count, has_correct_answer = cursor.fetchone()
+
+    if answer_count == 0:
+        raise ValueError("question.answers: A question must have at least one answer")
+
+    if not has_correct_answer:
+        raise ValueError("question.answers: No correct answer set")
+
+
+def update_answer(
+    user_id: int,
+    quiz_id: int,
+    question_id: int,
+    answer_id: int,
+    answer: QuizQuestionAnswerUpdate,
+    connection: Optional[sqlite3.Connection] = None,
+) -> Optional[QuizQuestionAnswer]:
+    """Change the text or correctness of an answer. Returns the updated answer, or None if it does not exist."""
+
+    connection = connection or conn
+
+    if answer.name is not None and not answer.name:
+        raise ValueError("answer.name: Missing answer name")
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+                UPDATE quiz_question_answer
+                SET
+                    name = COALESCE(?, name),
+                    is_correct = COALESCE(?, is_correct)
+                WHERE
+                    id = ?
+                    AND question_id = (SELECT id FROM quiz_question WHERE id = ? AND quiz_id = ?)
+                RETURNING name, `order`, is_correct
+            """,
+            (answer.name, answer.is_correct, answer_id, question_id, quiz_id),
+        )
+        row = cursor.fetchone()
+
+        updated_answer = None
+        if row is not None:
+            if answer.is_correct is False:
+                check_question_has_correct_answer(cursor, question_id)
+
+            touch_quiz(cursor, user_id, quiz_id)
+            updated_answer = QuizQuestionAnswer(
+                name=row[0],
+                order=row[1],
+                is_correct=bool(row[2]),
+                id=answer_id,
+                question_id=question_id,
+            )
+
+        cursor.close()
+
+    return updated_answer
+
+
+def insert_answer(
+    user_id: int,
+    quiz_id: int,
+    question_id: int,
+    answer: QuizQuestionAnswerIn,
+    connection: Optional[sqlite3.Connection] = None,
+) -> Optional[QuizQuestionAnswer]:
+    """Insert an answer at its order, moving the answers after it down. Orders before the first answer or
+    after the last are clamped to them, so the answers stay numbered from 1 without gaps.
+
+    Returns the inserted answer, or None if the question does not exist.
+    """
+
+    connection = connection or conn
+
+    if not answer.name:
+        raise ValueError("answer.name: Missing answer name")
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT 1 FROM quiz_question WHERE id = ? AND quiz_id = ?",
+            (question_id, quiz_id),
+        )
+
+        inserted_answer = None
+        if cursor.fetchone() is not None:
+            cursor.execute(
+                "SELECT COUNT(*) FROM quiz_question_answer WHERE question_id = ?", (question_id,)
+            )
+            order = clamp_order(answer.order, cursor.fetchone()[0])
+
+            cursor.execute(
+                "UPDATE quiz_question_answer SET `order` = `order` + 1 WHERE question_id = ? AND `order` >= ?",
+                (question_id, order),
+            )
+            cursor.execute(
+                "INSERT INTO quiz_question_answer (name, `order`, is_correct, question_id) VALUES (?, ?, ?, ?)",
+                (answer.name, order, answer.is_correct, question_id),
+            )
+            touch_quiz(cursor, user_id, quiz_id)
+
+            inserted_answer = QuizQuestionAnswer(
+                name=answer.name,
+                order=order,
+                is_correct=answer.is_correct,
+                id=cursor.lastrowid,
+                question_id=question_id,
+            )
+
+        cursor.close()
+
+    return inserted_answer
+
+
+def delete_answer(
+    user_id: int,
+    quiz_id: int,
+    question_id: int,
+    answer_id: int,
+    connection: Optional[sqlite3.Connection] = None,
+) -> bool:
+    """Delete an answer, moving the answers after it up. Returns False if it does not exist."""
+
+    connection = connection or conn
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+                DELETE FROM quiz_question_answer
+                WHERE
+                    id = ?
+                    AND question_id = (SELECT id FROM quiz_question WHERE id = ? AND quiz_id = ?)
+                RETURNING `order`
+            """,
+            (answer_id, question_id, quiz_id),
+        )
+        row = cursor.fetchone()
+
+        if row is not None:
+            check_question_has_correct_answer(cursor, question_id)
+
+            cursor.execute(
+                "UPDATE quiz_question_answer SET `order` = `order` - 1 WHERE question_id = ? AND `order` > ?",
+                (question_id, row[0]),
+            )
+            touch_quiz(cursor, user_id, quiz_id)
+
+        cursor.close()
+
+    return row is not None
+
+
+def check_quiz_counters(
+    rebuild: bool = False, connection: Optional[sqlite3.Connection] = None
+) -> int:
+    """Count the quiz question counts and status counts that do not match the data. If rebuild is set, correct them."""
+
+    connection = connection or conn
+
+    with transaction(connection):
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+                SELECT
+                    quiz.id,
+                    (SELECT COUNT(*) FROM quiz_question WHERE quiz_question.quiz_id = quiz.id) AS actual_count
+                FROM
+                    quiz
+                WHERE
+                    quiz.question_count != actual_count
+            """
+        )
+        question_counts = cursor.fetchall()
+
+        cursor.execute(
+            """
+                SELECT
+                    statuses.status,
+                    (SELECT COUNT(*) FROM quiz WHERE quiz.status = statuses.status) AS actual_count
+                FROM
+                    (SELECT status FROM quiz UNION SELECT status FROM quiz_status_count) AS statuses
+                    LEFT JOIN quiz_status_count ON quiz_status_count.status = statuses.status
+                WHERE
+                    quiz_status_count.count IS NOT actual_count
+            """
+        )
+        status_counts = cursor.fetchall()
+
+        if rebuild:
+            cursor.executemany(
+                "UPDATE quiz SET question_count = ? WHERE id = ?",
+                [(count, quiz_id) for quiz_id, count in question_counts],
+            )
+            cursor.executemany(
+                """
+                    INSERT INTO quiz_status_count (status, count) VALUES (?, ?)
+                    ON CONFLICT(status) DO UPDATE SET count = excluded.count
+                """,
+                status_counts,
+            )
+
+        cursor.close()
+
+    return len(question_counts) + len(status_counts)
 
 
 # Bootstrap tables
 with open("schema.sql", "r", encoding="utf-8") as file:
     conn.executescript(file.read())
+
+# Apply schema migrations
+migrations.migrate(conn)
+
+# Use write-ahead logging so readers on other connections are not blocked by the writer.
+conn.execute("PRAGMA journal_mode=WAL")
+
+if STORAGE_MODE == "memory":
+    store = load_store(conn)
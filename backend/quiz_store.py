@@ -0,0 +1,282 @@
+"""This module contains the in-memory quiz store, which serves quiz reads when STORAGE_MODE is "memory".
+
+The store holds every quiz of the statuses it covers, fully assembled, with indexes by ID, by status and by
+the words of the quiz names. It is a read model only: every write still goes to SQLite first, and the
+quizzes changed by a transaction are reloaded into the store once it commits (see queries.commit).
+
+Readers never take a lock. The quizzes and indexes are kept in an immutable snapshot, and each change builds
+a new snapshot, copying only the indexes it touches, then replaces the old one in a single assignment. A
+reader therefore sees every quiz changed by a transaction or none of them.
+"""
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Optional
+
+from _types.app import Question, Quiz, QuizQuestionAnswer, QuizWithQuestionCount, Timestamp
+
+# Words are runs of letters and digits, as split by the full text index's unicode61 tokenizer.
+WORD = re.compile(r"[^\W_]+")
+
+# Sort orders of quiz listings, as whether they are descending. Ties are broken by the quiz ID.
+SORT_DESCENDING = {"updated_at": True, "name": False, "id": False, "relevance": False}
+
+# Most sorted listings kept per snapshot, so arbitrary searches can not grow it without bound.
+MAX_CACHED_ORDERS = 256
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into case folded words without diacritics, as the full text index does."""
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return WORD.findall(stripped.casefold())
+
+
+def copy_quiz(quiz: Quiz, include_answers: bool) -> Quiz:
+    """Copy a quiz with new questions and answers, leaving out the correctness of every answer if requested."""
+
+    return Quiz(
+        quiz.name,
+        quiz.status,
+        [
+            Question(
+                question.name,
+                question.order,
+                [
+                    QuizQuestionAnswer(
+                        answer.name,
+                        answer.order,
+                        answer.is_correct if include_answers else None,
+                        answer.id,
+                        answer.question_id,
+                    )
+                    for answer in question.answers
+                ],
+                question.id,
+                question.quiz_id,
+            )
+            for question in quiz.questions
+        ],
+        quiz.id,
+        quiz.updated_by,
+        quiz.created_at,
+        quiz.updated_at,
+    )
+
+
+class StoredQuiz:
+    """A quiz held by the store, with its listing summary and name words."""
+
+    __slots__ = ("quiz", "summary", "words")
+
+    def __init__(self, quiz: Quiz):
+        self.quiz = quiz
+        self.summary = QuizWithQuestionCount(
+            quiz.name,
+            quiz.status,
+            None,
+            quiz.id,
+            quiz.updated_by,
+            quiz.created_at,
+            quiz.updated_at,
+            len(quiz.questions),
+        )
+        self.words = tokenize(quiz.name)
+
+    def sort_key(self, sort: str, terms: tuple[str, ...]) -> Any:
+        if sort == "updated_at":
+            return self.quiz.updated_at
+        if sort == "name":
+            return self.quiz.name
+        if sort == "id":
+            return self.quiz.id
+
+        if not self.words:
+            return 0.0
+
+        # Relevance approximates the full text index's bm25 rank: names with a larger share of words
+        # matching the search come first. Like bm25, lower is better.
+        matching = sum(1 for word in self.words if any(word.startswith(term) for term in terms))
+        return -matching / len(self.words)
+
+
+class Snapshot:
+    """The quizzes and indexes of the store at one point in time. Only the orders cache changes once built."""
+
+    __slots__ = ("quizzes", "by_status", "by_word", "words", "orders")
+
+    def __init__(
+        self,
+        quizzes: dict[int, StoredQuiz],
+        by_status: dict[str, set[int]],
+        by_word: dict[str, set[int]],
+        words: list[str],
+    ):
+        self.quizzes = quizzes
+        self.by_status = by_status
+        self.by_word = by_word
+        # Every indexed word, sorted so the words starting with a prefix can be found by bisection.
+        self.words = words
+        # Sorted (sort key, quiz ID) pairs of each listing read from this snapshot.
+        self.orders: dict[tuple, list[tuple[Any, int]]] = {}
+
+    def match(self, term: str) -> set[int]:
+        """Get the IDs of the quizzes with a word starting with the term."""
+
+        ids: set[int] = set()
+
+        index = bisect_left(self.words, term)
+        while index < len(self.words) and self.words[index].startswith(term):
+            ids |= self.by_word[self.words[index]]
+            index += 1
+
+        return ids
+
+    def order(self, statuses: tuple[str, ...], terms: tuple[str, ...], sort: str) -> list[tuple[Any, int]]:
+        """Get the quizzes of the statuses matching every term, as (sort key, quiz ID) pairs in ascending order."""
+
+        key = (statuses, terms, sort)
+
+        order = self.orders.get(key)
+        if order is not None:
+            return order
+
+        ids: set[int] = set()
+        for status in statuses:
+            ids |= self.by_status.get(status, set())
+
+        for term in terms:
+            ids &= self.match(term)
+
+        order = sorted((self.quizzes[quiz_id].sort_key(sort, terms), quiz_id) for quiz_id in ids)
+
+        if len(self.orders) >= MAX_CACHED_ORDERS:
+            self.orders.clear()
+        self.orders[key] = order
+
+        return order
+
+
+class QuizStore:
+    """Every quiz of the covered statuses, assembled and indexed in memory."""
+
+    def __init__(self, statuses: Iterable[str]):
+        self.statuses = frozenset(statuses)
+
+        self._snapshot = Snapshot({}, {}, {}, [])
+        # Held by writers while they build the next snapshot.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshot.quizzes)
+
+    def covers(self, statuses: Iterable[str]) -> bool:
+        """Whether every quiz of the statuses is in the store."""
+
+        return self.statuses.issuperset(statuses)
+
+    def get(self, quiz_id: int, include_answers: bool) -> Optional[Quiz]:
+        """Get a quiz by ID, or None if it is not in the store.
+
+        The questions and answers of the stored quizzes can be modified, so each read returns a copy, and
+        changes made by one reader never reach the next.
+        """
+
+        stored = self._snapshot.quizzes.get(quiz_id)
+        if stored is None:
+            return None
+
+        return copy_quiz(stored.quiz, include_answers)
+
+    def page(
+        self,
+        statuses: list[str],
+        query: str,
+        sort: str,
+        after: Optional[tuple[Any, int]],
+        offset: int,
+        limit: int,
+    ) -> tuple[list[QuizWithQuestionCount], int, Optional[tuple[Any, int]]]:
+        """Get a page of quizzes of the statuses whose names contain every word of the query as a prefix.
+
+        Pages start after the (sort key, quiz ID) pair of the last quiz of the previous page, if passed, and
+        then skip offset quizzes. Returns the quizzes, the total count and the pair of the last quiz when
+        there is a next page. Raises ValueError if the pair can not be compared with the sort keys.
+        """
+
+        snapshot = self._snapshot
+        order = snapshot.order(tuple(sorted(set(statuses))), tuple(tokenize(query)), sort)
+
+        try:
+            if SORT_DESCENDING[sort]:
+                end = len(order) if after is None else bisect_left(order, after)
+                end = max(0, end - offset)
+                selected = order[max(0, end - limit - 1) : end][::-1]
+            else:
+                start = 0 if after is None else bisect_right(order, after)
+                selected = order[start + offset : start + offset + limit + 1]
+        except TypeError as e:
+            raise ValueError("Cursor does not match the sort order") from e
+
+        next_after = None
+        if len(selected) > limit:
+            selected = selected[:limit]
+            next_after = selected[-1]
+
+        results = [snapshot.quizzes[quiz_id].summary for _, quiz_id in selected]
+
+        return results, len(order), next_after
+
+    def get_updated_at(self, quiz_id: int) -> Optional[Timestamp]:
+        """Get when a quiz in the store was last updated, or None if it is not in the store."""
+
+        stored = self._snapshot.quizzes.get(quiz_id)
+
+        return None if stored is None else stored.quiz.updated_at
+
+    def replace(self, quizzes: dict[int, Optional[Quiz]]) -> None:
+        """Store the quizzes by ID, all at once. Quizzes which are None, or whose status is not covered, are removed."""
+
+        with self._lock:
+            snapshot = self._snapshot
+
+            stored_quizzes = dict(snapshot.quizzes)
+            by_status = dict(snapshot.by_status)
+            by_word = dict(snapshot.by_word)
+            # Index sets are shared with the old snapshot, so each is copied before its first change.
+            copied: set[tuple[str, str]] = set()
+            words_changed = False
+
+            def index_set(index: dict[str, set[int]], kind: str, key: str) -> set[int]:
+                if (kind, key) not in copied:
+                    index[key] = set(index.get(key, ()))
+                    copied.add((kind, key))
+                return index.setdefault(key, set())
+
+            for quiz_id, quiz in quizzes.items():
+                previous = stored_quizzes.pop(quiz_id, None)
+                if previous is not None:
+                    index_set(by_status, "status", previous.quiz.status.value).discard(quiz_id)
+                    for word in set(previous.words):
+                        ids = index_set(by_word, "word", word)
+                        ids.discard(quiz_id)
+                        if not ids:
+                            del by_word[word]
+                            words_changed = True
+
+                if quiz is None or quiz.status.value not in self.statuses:
+                    continue
+
+                stored = stored_quizzes[quiz_id] = StoredQuiz(quiz)
+                index_set(by_status, "status", quiz.status.value).add(quiz_id)
+                for word in set(stored.words):
+                    words_changed = words_changed or word not in by_word
+                    index_set(by_word, "word", word).add(quiz_id)
+
+            words = sorted(by_word) if words_changed else snapshot.words
+
+            self._snapshot = Snapshot(stored_quizzes, by_status, by_word, words)
@@ -0,0 +1,180 @@
+"""This module contains request timing, which keeps latency histograms for each route and status, and splits the
+time of sampled requests into phases reported in the Server-Timing header.
+
+Phases are measured with measure(), which does nothing outside a sampled request. When REQUEST_TIMING is
+disabled no hooks are registered at all, so requests only pay for the check in measure().
+"""
+
+import os
+import random
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import ContextManager, Optional
+
+from instrumentation import format_sample
+from quart import Quart, Response, g, request
+
+# Whether request latencies are recorded.
+REQUEST_TIMING = os.environ.get("REQUEST_TIMING", "1") != "0"
+
+# Fraction of requests whose time is split into phases and reported in the Server-Timing header. The header
+# shows any client how long the server spends on each phase, so it is off unless enabled.
+REQUEST_TIMING_SAMPLE_RATE = float(os.environ.get("REQUEST_TIMING_SAMPLE_RATE", 0))
+
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# Phases reported in the Server-Timing header, in order.
+PHASES = ["auth", "db", "assembly", "serialize"]
+
+
+class RequestTimings:
+    """The time spent in each phase of a request. Phases are exclusive, so time spent in a phase measured
+    within another, such as assembling quizzes while holding a database connection, is only counted once."""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.current: Optional[str] = None
+
+
+# Timings of the current request, or None if the request is not sampled.
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+# Bucket counts, sum and count of the latencies of each method, route and status.
+_histograms: dict[tuple[str, str, int], tuple[list[int], list[float]]] = {}
+
+
+class _Phase:
+    __slots__ = ("timings", "phase", "parent", "start")
+
+    def __init__(self, timings: RequestTimings, phase: str):
+        self.timings = timings
+        self.phase = phase
+
+    def __enter__(self) -> None:
+        self.parent = self.timings.current
+        self.timings.current = self.phase
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        phases = self.timings.phases
+
+        phases[self.phase] = phases.get(self.phase, 0.0) + elapsed
+        if self.parent is not None:
+            phases[self.parent] = phases.get(self.parent, 0.0) - elapsed
+
+        self.timings.current = self.parent
+
+
+# Returned by measure outside sampled requests, so they do not pay for timing.
+_NOT_MEASURED = nullcontext()
+
+
+def measure(phase: str) -> ContextManager[None]:
+    """Add the time spent in the block to the phase of the current request, if it is sampled."""
+
+    timings = _timings.get()
+    if timings is None:
+        return _NOT_MEASURED
+
+    return _Phase(timings, phase)
+
+
+def observe(method: str, route: str, status: int, elapsed: float) -> None:
+    """Record the latency of a request in the histogram of its method, route and status."""
+
+    key = (method, route, status)
+
+    histogram = _histograms.get(key)
+    if histogram is None:
+        histogram = _histograms[key] = ([0] * (len(BUCKETS) + 1), [0.0])
+
+    histogram[0][bisect_left(BUCKETS, elapsed)] += 1
+    histogram[1][0] += elapsed
+
+
+def reset() -> None:
+    """Forget every recorded latency."""
+
+    _histograms.clear()
+
+
+def format_server_timing(timings: RequestTimings, total: float) -> str:
+    """Format the phases of a request as a Server-Timing header, in milliseconds."""
+
+    entries = [
+        f"{phase};dur={max(0.0, timings.phases[phase]) * 1000:.3f}"
+        for phase in PHASES
+        if phase in timings.phases
+    ]
+    entries.append(f"total;dur={total * 1000:.3f}")
+
+    return ", ".join(entries)
+
+
+def format_metrics() -> list[str]:
+    """Format the latency histograms in the Prometheus text format."""
+
+    name = "http_request_duration_seconds"
+    lines = [
+        f"# HELP {name} Latency of requests by method, route and status.",
+        f"# TYPE {name} histogram",
+    ]
+
+    for (method, route, status), (counts, total) in sorted(_histograms.items()):
+        labels = {"method": method, "route": route, "status": status}
+
+        cumulative = 0
+        for bound, count in zip([*BUCKETS, "+Inf"], counts):
+            cumulative += count
+            lines.append(format_sample(f"{name}_bucket", {**labels, "le": bound}, cumulative))
+
+        lines.append(format_sample(f"{name}_sum", labels, total[0]))
+        lines.append(format_sample(f"{name}_count", labels, cumulative))
+
+    return lines
+
+
+def install(app: Quart) -> None:
+    """Register the hooks which time each request, if REQUEST_TIMING is enabled."""
+
+    if not REQUEST_TIMING:
+        return
+
+    @app.before_request
+    async def start_timing() -> None:
+        g.request_start = time.perf_counter()
+
+        if REQUEST_TIMING_SAMPLE_RATE >= 1 or random.random() < REQUEST_TIMING_SAMPLE_RATE:
+            g.request_timings = RequestTimings()
+            _timings.set(g.request_timings)
+
+    @app.after_request
+    async def finish_timing(response: Response) -> Response:
+        start = g.get("request_start", None)
+        if start is None:
+            return response
+
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        observe(request.method, route, response.status_code, elapsed)
+
+        timings = g.get("request_timings", None)
+        if timings is not None:
+            response.headers["Server-Timing"] = format_server_timing(timings, elapsed)
+
+        return response
+
+    # Responses are converted, including quart_schema's serialization of dataclasses, in make_response.
+    make_response = app.make_response
+
+    @wraps(make_response)
+    async def timed_make_response(*args, **kwargs):
+        with measure("serialize"):
+            return await make_response(*args, **kwargs)
+
+    app.make_response = timed_make_response
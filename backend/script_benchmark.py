@@ -0,0 +1,251 @@
+""" Script to benchmark the queries and API routes against a generated database, optionally comparing the
+results with a stored baseline. """
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+# Fraction by which a median may grow over the baseline before it is reported as a regression.
+DEFAULT_THRESHOLD = 0.2
+
+# Shortest time a single sample of a micro benchmark should take. Faster functions are called several
+# times per sample, so timer resolution and noise do not dominate.
+MIN_SAMPLE_TIME = 0.001
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    """Summarize a list of timings in seconds as milliseconds."""
+
+    timings = sorted(timings)
+
+    return {
+        "runs": len(timings),
+        "min_ms": timings[0] * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "max_ms": timings[-1] * 1000,
+    }
+
+
+def measure(func: Callable[[], Any], repeats: int, warmup: int = 2) -> dict[str, float]:
+    """Time repeated calls of the function, as the time taken per call."""
+
+    for _ in range(warmup):
+        func()
+
+    start = time.perf_counter()
+    func()
+    loops = max(1, int(MIN_SAMPLE_TIME / max(time.perf_counter() - start, 1e-9)))
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+
+    return summarize(timings)
+
+
+async def measure_async(func: Callable[[], Any], repeats: int, warmup: int = 2) -> dict[str, float]:
+    """Time repeated awaits of the coroutine function."""
+
+    for _ in range(warmup):
+        await func()
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+
+    return summarize(timings)
+
+
+def run_micro_benchmarks(repeats: int, quiz_id: int) -> dict[str, dict[str, float]]:
+    """Benchmark the query, assembly and validation functions directly."""
+
+    import queries
+    from utilities import validate_quiz
+
+    quiz = queries.get_quiz(quiz_id, True)
+
+    cursor = queries.conn.cursor()
+    cursor.execute(
+        "SELECT id, quiz_id, name, `order` FROM quiz_question WHERE quiz_id = ? ORDER BY `order`, id",
+        (quiz_id,),
+    )
+    question_rows = cursor.fetchall()
+    cursor.execute(
+        """
+            SELECT quiz_question_answer.id, question_id, quiz_question_answer.name,
+                quiz_question_answer.`order`, is_correct
+            FROM quiz_question JOIN quiz_question_answer ON quiz_question_answer.question_id = quiz_question.id
+            WHERE quiz_id = ?
+            ORDER BY question_id, quiz_question_answer.`order`, quiz_question_answer.id
+        """,
+        (quiz_id,),
+    )
+    answer_rows = cursor.fetchall()
+    cursor.close()
+
+    return {
+        "get_quizzes": measure(
+            lambda: queries.get_quizzes("", ["published", "draft"], 20, 0), repeats
+        ),
+        "get_quizzes_search": measure(
+            lambda: queries.get_quizzes("history", ["published"], 20, 0), repeats
+        ),
+        "get_quiz": measure(lambda: queries.get_quiz(quiz_id, True), repeats),
+        "extract_questions": measure(
+            lambda: queries.extract_questions(question_rows, answer_rows, True), repeats
+        ),
+        "create_update_quiz": measure(
+            lambda: queries.create_update_quiz(1, quiz_id, quiz), repeats
+        ),
+        "validate_quiz": measure(lambda: validate_quiz(quiz), repeats),
+    }
+
+
+async def run_endpoint_benchmarks(repeats: int, quiz_id: int) -> dict[str, dict[str, float]]:
+    """Benchmark the API routes through the test client, logged in as an editor."""
+
+    from app import app
+    from benchmark_data import PASSWORD
+
+    client = app.test_client()
+    response = await client.post(
+        "/api/auth/login", json={"username": "user1", "password": PASSWORD, "remember": False}
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Could not log in to benchmark the endpoints: {response.status_code}")
+
+    quiz = await (await client.get(f"/api/quizzes/{quiz_id}")).get_json()
+    batch_ids = ",".join(str(i) for i in range(quiz_id, quiz_id + 50))
+
+    async def request(method: str, path: str, **kwargs):
+        response = await client.open(path, method=method, **kwargs)
+        await response.get_data()
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {path} failed: {response.status_code}")
+
+    return {
+        "GET /api/quizzes": await measure_async(
+            lambda: request("GET", "/api/quizzes?limit=20"), repeats
+        ),
+        "GET /api/quizzes?query": await measure_async(
+            lambda: request("GET", "/api/quizzes?limit=20&query=history"), repeats
+        ),
+        "GET /api/quizzes/:quiz_id": await measure_async(
+            lambda: request("GET", f"/api/quizzes/{quiz_id}"), repeats
+        ),
+        "GET /api/quizzes/batch": await measure_async(
+            lambda: request("GET", f"/api/quizzes/batch?ids={batch_ids}"), repeats
+        ),
+        "PUT /api/quizzes/:quiz_id": await measure_async(
+            lambda: request("PUT", f"/api/quizzes/{quiz_id}", json=quiz), repeats
+        ),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """List the benchmarks whose median is slower than the baseline by more than the threshold."""
+
+    regressions = []
+
+    for group, benchmarks in results["benchmarks"].items():
+        for name, result in benchmarks.items():
+            previous = baseline.get("benchmarks", {}).get(group, {}).get(name)
+            if previous is None:
+                continue
+
+            change = result["median_ms"] / previous["median_ms"] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{group} {name}: {previous['median_ms']:.3f} ms -> {result['median_ms']:.3f} ms (+{change:.0%})"
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the queries and API routes.")
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--quizzes", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--answers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--output", help="file to write the results to as JSON, instead of stdout")
+    parser.add_argument("--compare", help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The queries module connects when imported, so the database path is set before importing it.
+        os.environ["DATABASE_PATH"] = os.path.join(directory, "benchmark.db")
+
+        import benchmark_data
+
+        start = time.perf_counter()
+        connection = benchmark_data.create_database(os.environ["DATABASE_PATH"])
+        benchmark_data.generate_data(
+            connection, args.users, args.quizzes, args.questions, args.answers, seed=args.seed
+        )
+        connection.close()
+        print(f"Generated data in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        # Benchmark a quiz in the middle of the table.
+        quiz_id = max(1, args.quizzes // 2)
+
+        results = {
+            "parameters": {
+                "users": args.users,
+                "quizzes": args.quizzes,
+                "questions": args.questions,
+                "answers": args.answers,
+                "seed": args.seed,
+                "repeats": args.repeats,
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            },
+            "benchmarks": {
+                "micro": run_micro_benchmarks(args.repeats, quiz_id),
+                "endpoints": asyncio.run(run_endpoint_benchmarks(args.repeats, quiz_id)),
+            },
+        }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"No regressions over {args.threshold:.0%}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+""" Script to compare assembling a large quiz with the previous single joined query against the current queries. """
+
+import argparse
+import sqlite3
+import sys
+import time
+
+import queries
+from _types.app import (
+    Question,
+    QuestionIn,
+    Quiz,
+    QuizIn,
+    QuizQuestionAnswer,
+    QuizQuestionAnswerIn,
+    QuizStatus,
+    Timestamp,
+    User,
+    UserRole,
+)
+from migrations import migrate
+
+REPEATS = 5
+
+
+def create_database(questions: int, answers: int) -> sqlite3.Connection:
+    """Create an in-memory database holding a single quiz with the requested number of questions and answers."""
+
+    connection = sqlite3.connect(":memory:")
+
+    with open("schema.sql", "r", encoding="utf-8") as file:
+        connection.executescript(file.read())
+
+    migrate(connection)
+
+    user_id = queries.create_user(
+        "benchmark", "password", "Benchmark", "editor", connection=connection
+    )
+    queries.create_update_quiz(
+        user_id,
+        None,
+        QuizIn(
+            name="Benchmark Quiz",
+            status=QuizStatus.QUIZ_STATUS_PUBLISHED,
+            questions=[
+                QuestionIn(
+                    name=f"Question {i}",
+                    order=i,
+                    answers=[
+                        QuizQuestionAnswerIn(name=f"Answer {j}", order=j, is_correct=j == 1)
+                        # Add answers in reverse, so they are not already stored in order.
+                        for j in range(answers, 0, -1)
+                    ],
+                )
+                for i in range(1, questions + 1)
+            ],
+        ),
+        connection=connection,
+    )
+
+    return connection
+
+
+def get_quiz_joined(quiz_id: int, include_answers: bool, connection: sqlite3.Connection) -> Quiz:
+    """Assemble a quiz the way get_quiz previously did, from one row per answer, sorting after every answer."""
+
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+            SELECT
+                quiz.id, quiz.name, quiz.status, quiz.created_at, quiz.updated_at, quiz.updated_by,
+                user.name, user.username, user.created_at, user.role,
+                quiz_question.id, quiz_question.name, quiz_question.`order`,
+                quiz_question_answer.id, quiz_question_answer.name, quiz_question_answer.`order`,
+                quiz_question_answer.is_correct
+            FROM
+                quiz
+                LEFT JOIN user ON user.id = quiz.updated_by
+                JOIN quiz_question ON quiz_question.quiz_id = quiz.id
+                JOIN quiz_question_answer ON quiz_question_answer.question_id = quiz_question.id
+            WHERE quiz.id = ?
+            ORDER BY quiz_question.`order`, quiz_question_answer.`order`
+        """,
+        (quiz_id,),
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+
+    questions = {}
+    for row in rows:
+        if row[10] not in questions:
+            questions[row[10]] = Question(
+                name=row[11], order=row[12], id=row[10], answers=[], quiz_id=row[0]
+            )
+
+        questions[row[10]].answers.append(
+            QuizQuestionAnswer(
+                name=row[14],
+                order=row[15],
+                is_correct=bool(row[16]) if include_answers else None,
+                id=row[13],
+                question_id=row[10],
+            )
+        )
+        questions[row[10]].answers.sort(key=lambda x: x.order)
+
+    values = list(questions.values())
+    values.sort(key=lambda x: x.order)
+
+    first_row = rows[0]
+    return Quiz(
+        name=first_row[1],
+        status=QuizStatus(first_row[2]),
+        questions=values,
+        created_at=Timestamp(first_row[3]),
+        updated_at=Timestamp(first_row[4]),
+        updated_by=User(
+            id=first_row[5],
+            name=first_row[6],
+            username=first_row[7],
+            created_at=Timestamp(first_row[8]),
+            role=UserRole(first_row[9]),
+        ),
+        id=first_row[0],
+    )
+
+
+def measure(func, connection: sqlite3.Connection, repeats: int) -> tuple[float, Quiz]:
+    """Return the fastest time taken to assemble the quiz, and the assembled quiz."""
+
+    best = float("inf")
+    quiz = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        quiz = func(1, True, connection=connection)
+        best = min(best, time.perf_counter() - start)
+
+    return best, quiz
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare assembling a large quiz with the joined and ordered queries.")
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--answers", type=int, default=4)
+    args = parser.parse_args()
+
+    questions = args.questions
+    answers = args.answers
+
+    connection = create_database(questions, answers)
+
+    joined_time, joined_quiz = measure(get_quiz_joined, connection, REPEATS)
+    current_time, current_quiz = measure(queries.get_quiz, connection, REPEATS)
+
+    if joined_quiz != current_quiz:
+        print("The assembled quizzes differ.")
+        sys.exit(1)
+
+    print(f"Quiz with {questions} questions of {answers} answers, best of {REPEATS}:")
+    print(f"  joined query:    {joined_time * 1000:8.2f} ms")
+    print(f"  ordered queries: {current_time * 1000:8.2f} ms")
+    print(f"  speedup:         {joined_time / current_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
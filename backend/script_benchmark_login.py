@@ -0,0 +1,110 @@
+""" Script to benchmark login throughput under concurrency, and how much a burst of logins delays other
+requests, against a generated database. """
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+
+async def run_stage(app, concurrency: int, duration: float) -> dict[str, Any]:
+    """Have each of the clients log in back to back for the duration, while another fetches the logged in
+    user, and summarize the login throughput and the latency of the other requests."""
+
+    from benchmark_data import PASSWORD
+
+    clients = [app.test_client() for _ in range(concurrency)]
+    probe = app.test_client()
+    await probe.post("/api/auth/login", json={"username": "user2", "password": PASSWORD, "remember": False})
+
+    logins = []
+    probes = []
+    deadline = time.perf_counter() + duration
+
+    async def login(client, username: str):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/auth/login", json={"username": username, "password": PASSWORD, "remember": False}
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"Could not log in as {username}: {response.status_code}")
+            logins.append(time.perf_counter() - start)
+
+    async def fetch():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await (await probe.get("/api/auth/@me")).get_data()
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(
+        *(login(client, f"user{index + 1}") for index, client in enumerate(clients)), fetch()
+    )
+
+    logins.sort()
+    probes.sort()
+
+    return {
+        "concurrency": concurrency,
+        "logins": len(logins),
+        "logins_per_second": len(logins) / duration,
+        "login_median_ms": statistics.median(logins) * 1000,
+        "login_p95_ms": logins[int(len(logins) * 0.95)] * 1000,
+        "other_median_ms": statistics.median(probes) * 1000,
+        "other_p95_ms": probes[int(len(probes) * 0.95)] * 1000,
+    }
+
+
+async def benchmark(concurrency_levels: list[int], duration: float) -> list[dict[str, Any]]:
+    from app import app
+
+    stages = []
+
+    print(
+        f"{'clients':>8} {'logins/s':>9} {'login p50':>10} {'login p95':>10} {'other p50':>10} {'other p95':>10}",
+        file=sys.stderr,
+    )
+    for concurrency in concurrency_levels:
+        stage = await run_stage(app, concurrency, duration)
+        stages.append(stage)
+        print(
+            f"{concurrency:>8} {stage['logins_per_second']:>9.1f} {stage['login_median_ms']:>10.1f}"
+            f" {stage['login_p95_ms']:>10.1f} {stage['other_median_ms']:>10.1f} {stage['other_p95_ms']:>10.1f}",
+            file=sys.stderr,
+        )
+
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput under concurrency.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=5, help="seconds per concurrency level")
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The queries module connects when imported, so the database path is set before importing it.
+        os.environ["DATABASE_PATH"] = os.path.join(directory, "benchmark.db")
+
+        import benchmark_data
+
+        connection = benchmark_data.create_database(os.environ["DATABASE_PATH"])
+        benchmark_data.generate_data(connection, max(args.concurrency), 10, 5, 4)
+        connection.close()
+
+        stages = asyncio.run(benchmark(args.concurrency, args.duration))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(stages, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
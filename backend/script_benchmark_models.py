@@ -0,0 +1,218 @@
+""" Script to compare the memory and time taken to convert the rows of a large quiz into the slotted models,
+against the previous plain dataclasses which parsed every timestamp.
+
+Each variant is measured in its own process, so the resident memory of one does not affect the other.
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import serialization
+import utilities
+from _types.app import Quiz, QuizStatus, UserRole
+
+TIMESTAMP = "2024-02-05T19:58:52.973293"
+
+
+@dataclass
+class LegacyUser:
+    id: int
+    name: str
+    username: str
+    created_at: datetime
+    role: UserRole
+
+
+@dataclass
+class LegacyAnswer:
+    name: str
+    order: int
+    is_correct: Optional[bool]
+    id: int
+    question_id: int
+
+
+@dataclass
+class LegacyQuestion:
+    name: str
+    order: int
+    answers: list[LegacyAnswer]
+    id: int
+    quiz_id: int
+
+
+@dataclass
+class LegacyQuiz:
+    name: str
+    status: QuizStatus
+    questions: list[LegacyQuestion]
+    id: int
+    updated_by: Optional[LegacyUser]
+    created_at: datetime
+    updated_at: datetime
+
+
+def create_rows(questions: int, answers: int) -> tuple[tuple, list[tuple], list[tuple]]:
+    """Create the quiz, question and answer rows of a quiz, as queries.get_quizzes_by_ids reads them."""
+
+    quiz_row = (
+        1, "Benchmark Quiz", "published", TIMESTAMP, TIMESTAMP, 1, "Editor", "editor", TIMESTAMP, "editor"
+    )
+    question_rows = [(i, 1, f"Question {i}", i) for i in range(1, questions + 1)]
+    answer_rows = [
+        ((i - 1) * answers + j, i, f"Answer {j}", j, j == 1)
+        for i in range(1, questions + 1)
+        for j in range(1, answers + 1)
+    ]
+
+    return quiz_row, question_rows, answer_rows
+
+
+def convert_legacy(quiz_row: tuple, question_rows: list[tuple], answer_rows: list[tuple]) -> LegacyQuiz:
+    """Convert the rows as the previous models were built, by keyword and parsing every timestamp."""
+
+    questions: dict[int, LegacyQuestion] = {}
+    for question_id, quiz_id, name, order in question_rows:
+        questions[question_id] = LegacyQuestion(
+            name=name, order=order, answers=[], id=question_id, quiz_id=quiz_id
+        )
+
+    for answer_id, question_id, name, order, is_correct in answer_rows:
+        questions[question_id].answers.append(
+            LegacyAnswer(
+                name=name, order=order, is_correct=bool(is_correct), id=answer_id, question_id=question_id
+            )
+        )
+
+    return LegacyQuiz(
+        name=quiz_row[1],
+        status=QuizStatus(quiz_row[2]),
+        questions=list(questions.values()),
+        id=quiz_row[0],
+        updated_by=LegacyUser(
+            id=quiz_row[5],
+            name=quiz_row[6],
+            username=quiz_row[7],
+            created_at=utilities.convert_from_iso(quiz_row[8]),
+            role=UserRole(quiz_row[9]),
+        ),
+        created_at=utilities.convert_from_iso(quiz_row[3]),
+        updated_at=utilities.convert_from_iso(quiz_row[4]),
+    )
+
+
+def convert_current(quiz_row: tuple, question_rows: list[tuple], answer_rows: list[tuple]) -> Quiz:
+    """Convert the rows with the current models."""
+
+    # Imported here, as the queries module connects to the database when imported. See measure_variant.
+    import queries
+
+    questions = queries.extract_questions(question_rows, answer_rows, True)
+
+    return queries.extract_quiz(quiz_row, questions[quiz_row[0]])
+
+
+VARIANTS = {"legacy": (convert_legacy, LegacyQuiz), "current": (convert_current, Quiz)}
+
+
+def resident_bytes() -> int:
+    """Return the resident memory of this process, or 0 where it cannot be read."""
+
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def measure_variant(variant: str, questions: int, answers: int, copies: int, repeats: int) -> dict:
+    """Measure one variant: the time to convert and serialize the quiz, and the memory held by copies of it."""
+
+    convert, model_class = VARIANTS[variant]
+    rows = create_rows(questions, answers)
+
+    # Warm up outside the timings, which also imports the queries module for the current models.
+    convert(*rows)
+
+    convert_timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        convert(*rows)
+        convert_timings.append(time.perf_counter() - start)
+
+    quiz = convert(*rows)
+    serialization.dump_json(quiz, model_class)
+    serialize_timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        serialization.dump_json(quiz, model_class)
+        serialize_timings.append(time.perf_counter() - start)
+    del quiz
+
+    gc.collect()
+    resident_before = resident_bytes()
+    tracemalloc.start()
+    held = [convert(*rows) for _ in range(copies)]
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resident_after = resident_bytes()
+    del held
+
+    return {
+        "convert_ms": statistics.median(convert_timings) * 1000,
+        "serialize_ms": statistics.median(serialize_timings) * 1000,
+        "bytes_per_quiz": traced // copies,
+        "rss_mb": (resident_after - resident_before) / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory and conversion time of the models.")
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--answers", type=int, default=4)
+    parser.add_argument("--copies", type=int, default=20, help="quizzes held at once to measure memory")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--variant", choices=list(VARIANTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        with tempfile.TemporaryDirectory() as directory:
+            # The queries module connects when imported, so the database path is set before it is imported,
+            # leaving the development database untouched.
+            os.environ["DATABASE_PATH"] = os.path.join(directory, "benchmark.db")
+
+            result = measure_variant(args.variant, args.questions, args.answers, args.copies, args.repeats)
+
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+        return
+
+    print(f"{args.questions} questions with {args.answers} answers each, {args.copies} quizzes held")
+    print(f"{'variant':<10} {'convert ms':>11} {'serialize ms':>13} {'bytes/quiz':>12} {'RSS MB':>8}")
+
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--variant", variant, *sys.argv[1:]],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        result = dict(item.split("=") for item in output.split())
+
+        print(
+            f"{variant:<10} {float(result['convert_ms']):>11.2f} {float(result['serialize_ms']):>13.2f}"
+            f" {int(result['bytes_per_quiz']):>12} {float(result['rss_mb']):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+""" Script to check the maintained quiz counters against the data, and optionally rebuild them. """
+
+import sys
+
+from queries import check_quiz_counters
+
+
+def main():
+    rebuild = "--rebuild" in sys.argv[1:]
+
+    mismatches = check_quiz_counters(rebuild=rebuild)
+
+    if mismatches == 0:
+        print("All quiz counters are consistent.")
+    elif rebuild:
+        print(f"Rebuilt {mismatches} inconsistent quiz counters.")
+    else:
+        print(
+            f"Found {mismatches} inconsistent quiz counters. Run with --rebuild to correct them."
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+""" Script to import quizzes in bulk from an NDJSON, JSON or CSV file. """
+
+import argparse
+import os
+import sys
+import time
+
+from importer import FILE_EXTENSIONS, FORMATS, IMPORT_CHUNK_SIZE, import_quizzes
+from queries import get_database_user_by_username
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import quizzes in bulk.")
+    parser.add_argument("file", help="the file to import")
+    parser.add_argument("--user", required=True, help="username the quizzes are saved as")
+    parser.add_argument(
+        "--format", choices=FORMATS, help="format of the file, detected from its extension by default"
+    )
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    file_format = args.format or FILE_EXTENSIONS.get(os.path.splitext(args.file)[1].lower())
+    if file_format is None:
+        print("Error: Could not detect the format of the file. Please pass --format.")
+        sys.exit(1)
+
+    user = get_database_user_by_username(args.user)
+    if user is None:
+        print(f"Error: User {args.user} does not exist.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+
+    def progress(result):
+        elapsed = time.perf_counter() - start
+        print(
+            f"Imported {result.imported} quizzes, {result.failed} failed ({elapsed:.1f}s)",
+            file=sys.stderr,
+        )
+
+    with open(args.file, "r", encoding="utf-8", newline="") as file:
+        try:
+            result = import_quizzes(
+                file, file_format, user.id, chunk_size=args.chunk_size, progress=progress
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    for error in result.errors:
+        print(f"Record {error.record}: {error.message}")
+
+    if result.failed > len(result.errors):
+        print(f"... and {result.failed - len(result.errors)} more errors")
+
+    print(f"Imported {result.imported} quizzes, {result.failed} failed.")
+
+    if result.failed > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
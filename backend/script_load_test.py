@@ -0,0 +1,334 @@
+""" Script to load test the API with a mix of traffic from each role, ramping up concurrency until an error
+rate or latency budget is exceeded.
+
+By default the app is driven in-process through Quart's test client, against a generated database. Pass
+--serve to start the app with hypercorn and drive it over HTTP, or --url to drive an already running server
+whose database was filled by benchmark_data. Both need httpx to be installed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Share of requests of each kind, unless overridden with --mix.
+DEFAULT_MIX = {"list": 40, "search": 20, "get": 30, "save": 5, "login": 5}
+
+# Users created by benchmark_data for each role.
+ROLE_USERS = {"editor": "user1", "viewer": "user2", "restricted": "user3"}
+
+SEARCH_TERMS = ["history", "sci", "planet", "river capital", "ocean", "mount"]
+
+
+class InProcessSession:
+    """A session of requests made in-process through the test client, with its own cookies."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    async def request(self, method: str, path: str, json: Any = None) -> tuple[int, Any]:
+        response = await self._client.open(path, method=method, json=json)
+        body = await response.get_data()
+
+        return response.status_code, body
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPSession:
+    """A session of requests made over HTTP, with its own cookies."""
+
+    def __init__(self, base_url: str):
+        self._client = httpx.AsyncClient(base_url=base_url, timeout=30)
+
+    async def request(self, method: str, path: str, json: Any = None) -> tuple[int, Any]:
+        response = await self._client.request(method, path, json=json)
+
+        return response.status_code, response.content
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class VirtualUser:
+    """A logged in user of a role, making requests drawn from the traffic mix."""
+
+    def __init__(self, session, role: str, password: str, mix: dict[str, int], rng: random.Random):
+        self.session = session
+        self.role = role
+        self.password = password
+        self.rng = rng
+        self.quiz_ids: list[int] = []
+        self.quiz: Optional[dict] = None
+
+        # Only editors can save quizzes, so other roles fetch a quiz instead.
+        self.kinds = list(mix)
+        self.weights = [
+            weight if kind != "save" or role == "editor" else 0 for kind, weight in mix.items()
+        ]
+        if role != "editor" and "get" in mix:
+            self.weights[self.kinds.index("get")] += mix.get("save", 0)
+
+    async def login(self) -> int:
+        status, _ = await self.session.request(
+            "POST",
+            "/api/auth/login",
+            json={"username": ROLE_USERS[self.role], "password": self.password, "remember": False},
+        )
+
+        return status
+
+    async def setup(self) -> None:
+        """Log in and load the quizzes this user can see, and a quiz to save if they are an editor."""
+
+        status = await self.login()
+        if status != 200:
+            raise RuntimeError(f"Could not log in as {ROLE_USERS[self.role]}: {status}")
+
+        _, body = await self.session.request("GET", "/api/quizzes?limit=100")
+        self.quiz_ids = [quiz["id"] for quiz in json.loads(body)["quizzes"]]
+
+        if self.role == "editor" and self.quiz_ids:
+            _, body = await self.session.request("GET", f"/api/quizzes/{self.quiz_ids[0]}")
+            self.quiz = json.loads(body)
+
+    async def step(self) -> tuple[str, int]:
+        """Make one request from the traffic mix, returning the route and status code."""
+
+        kind = self.rng.choices(self.kinds, weights=self.weights)[0]
+
+        if kind == "login":
+            return "POST /api/auth/login", await self.login()
+
+        if kind == "list":
+            offset = self.rng.randint(0, 5) * 20
+            status, _ = await self.session.request("GET", f"/api/quizzes?limit=20&offset={offset}")
+            return "GET /api/quizzes", status
+
+        if kind == "search":
+            query = self.rng.choice(SEARCH_TERMS)
+            status, _ = await self.session.request("GET", f"/api/quizzes?limit=20&query={query}")
+            return "GET /api/quizzes?query", status
+
+        if kind == "save" and self.quiz is not None:
+            status, _ = await self.session.request(
+                "PUT", f"/api/quizzes/{self.quiz['id']}", json=self.quiz
+            )
+            return "PUT /api/quizzes/:quiz_id", status
+
+        quiz_id = self.rng.choice(self.quiz_ids) if self.quiz_ids else 1
+        status, _ = await self.session.request("GET", f"/api/quizzes/{quiz_id}")
+        return "GET /api/quizzes/:quiz_id", status
+
+
+def percentile(timings: list[float], fraction: float) -> float:
+    """Return the timing at the fraction of the sorted timings."""
+
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def summarize_stage(
+    concurrency: int, duration: float, results: list[tuple[str, int, float]]
+) -> dict[str, Any]:
+    """Summarize the (route, status, seconds) results of a stage, overall and per route."""
+
+    by_route = defaultdict(list)
+    for result in results:
+        by_route[result[0]].append(result)
+    by_route["all"] = results
+
+    routes = {}
+    for route, route_results in by_route.items():
+        timings = sorted(result[2] for result in route_results)
+        errors = sum(1 for result in route_results if result[1] >= 400)
+
+        routes[route] = {
+            "requests": len(route_results),
+            "errors": errors,
+            "throughput": len(route_results) / duration,
+            "p50_ms": percentile(timings, 0.50) * 1000 if timings else 0,
+            "p95_ms": percentile(timings, 0.95) * 1000 if timings else 0,
+            "p99_ms": percentile(timings, 0.99) * 1000 if timings else 0,
+        }
+
+    return {"concurrency": concurrency, "duration": duration, "routes": routes}
+
+
+async def run_stage(users: list[VirtualUser], duration: float) -> list[tuple[str, int, float]]:
+    """Have every user make requests back to back for the duration."""
+
+    results = []
+    deadline = time.perf_counter() + duration
+
+    async def run(user: VirtualUser):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                route, status = await user.step()
+            except Exception:
+                route, status = "error", 599
+            results.append((route, status, time.perf_counter() - start))
+
+    await asyncio.gather(*(run(user) for user in users))
+
+    return results
+
+
+def print_stage(stage: dict[str, Any]) -> None:
+    print(f"\nConcurrency {stage['concurrency']}:")
+    print(f"  {'route':<28} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    for route, result in sorted(stage["routes"].items()):
+        print(
+            f"  {route:<28} {result['requests']:>9} {result['errors']:>7} {result['throughput']:>8.1f}"
+            f" {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+
+
+async def load_test(args, create_session, password: str) -> list[dict[str, Any]]:
+    """Ramp up concurrency until the maximum is reached or the error rate or latency budget is exceeded."""
+
+    rng = random.Random(args.seed)
+    roles = list(ROLE_USERS)
+    users: list[VirtualUser] = []
+    stages = []
+    concurrency = args.start_concurrency
+
+    try:
+        while concurrency <= args.max_concurrency:
+            # Users are kept between stages, with each new user taking the next role in turn.
+            while len(users) < concurrency:
+                user = VirtualUser(
+                    create_session(),
+                    roles[len(users) % len(roles)],
+                    password,
+                    args.mix,
+                    random.Random(rng.random()),
+                )
+                await user.setup()
+                users.append(user)
+
+            results = await run_stage(users, args.stage_duration)
+            stage = summarize_stage(concurrency, args.stage_duration, results)
+            stages.append(stage)
+            print_stage(stage)
+
+            overall = stage["routes"]["all"]
+            error_rate = overall["errors"] / max(1, overall["requests"])
+
+            if error_rate > args.max_error_rate:
+                print(f"\nStopping: error rate {error_rate:.1%} exceeds {args.max_error_rate:.1%}")
+                break
+
+            if overall["p95_ms"] > args.latency_budget:
+                print(f"\nStopping: p95 latency {overall['p95_ms']:.1f} ms exceeds {args.latency_budget} ms")
+                break
+
+            concurrency *= 2
+    finally:
+        for user in users:
+            await user.session.close()
+
+    return stages
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse a traffic mix such as list=40,search=20,get=30,save=5,login=5."""
+
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown traffic kind '{kind}'")
+        mix[kind] = int(weight)
+
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main_async(args) -> list[dict[str, Any]]:
+    if args.url:
+        return await load_test(args, lambda: HTTPSession(args.url), args.password)
+
+    from app import app
+    from benchmark_data import PASSWORD
+
+    if not args.serve:
+        return await load_test(args, lambda: InProcessSession(app), PASSWORD)
+
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{free_port()}"]
+    config.accesslog = None
+
+    shutdown = asyncio.Event()
+    server = asyncio.create_task(serve(app, config, shutdown_trigger=shutdown.wait))
+    await asyncio.sleep(0.5)
+
+    try:
+        return await load_test(args, lambda: HTTPSession(f"http://{config.bind[0]}"), PASSWORD)
+    finally:
+        shutdown.set()
+        await server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API.")
+    parser.add_argument("--url", help="base URL of a running server to test")
+    parser.add_argument("--serve", action="store_true", help="start the app with hypercorn and test it over HTTP")
+    parser.add_argument("--password", default="password", help="password of the users of the server at --url")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--start-concurrency", type=int, default=1)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--stage-duration", type=float, default=10, help="seconds per concurrency stage")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--latency-budget", type=float, default=500, help="p95 latency budget in milliseconds")
+    parser.add_argument("--quizzes", type=int, default=2000, help="quizzes to generate when not using --url")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write the stage results to as JSON")
+    args = parser.parse_args()
+
+    if (args.url or args.serve) and httpx is None:
+        print("Error: httpx must be installed to test over HTTP. Install it with 'pip install httpx'.")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if not args.url:
+            # The queries module connects when imported, so the database path is set before importing it.
+            os.environ["DATABASE_PATH"] = os.path.join(directory, "load_test.db")
+
+            import benchmark_data
+
+            connection = benchmark_data.create_database(os.environ["DATABASE_PATH"])
+            benchmark_data.generate_data(connection, 30, args.quizzes, 20, 4, seed=args.seed)
+            connection.close()
+
+        stages = asyncio.run(main_async(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(stages, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
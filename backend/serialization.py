@@ -0,0 +1,87 @@
+"""This module contains the fast path for serializing responses of the _types.app models to JSON.
+
+quart_schema builds a new pydantic TypeAdapter for the type of every response it converts, which costs more
+than assembling the response itself. Here an adapter is built once per model and dumps the model to JSON
+types, which are then encoded with orjson where it is installed, or the json module otherwise. The output
+matches quart_schema's: only the fields of the declared types are included, and keys are sorted.
+"""
+
+import json
+from functools import wraps
+from http import HTTPStatus
+from typing import Any, Callable
+
+import request_timing
+from pydantic import TypeAdapter
+from quart import Response, current_app
+from quart_schema import validate_response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Adapters of each model serialized so far.
+_adapters: dict[Any, TypeAdapter] = {}
+
+
+def get_adapter(model_class: Any) -> TypeAdapter:
+    """Get the adapter of a model, building it the first time the model is serialized."""
+
+    adapter = _adapters.get(model_class)
+    if adapter is None:
+        adapter = _adapters[model_class] = TypeAdapter(model_class)
+
+    return adapter
+
+
+def encode_json(value: Any) -> bytes:
+    """Encode JSON types as compact JSON with sorted keys."""
+
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+
+def dump_json(value: Any, model_class: Any) -> bytes:
+    """Serialize a value of the model to JSON."""
+
+    return encode_json(get_adapter(model_class).dump_python(value, mode="json"))
+
+
+def json_response(model_class: Any, status_code: int = HTTPStatus.OK) -> Callable:
+    """Serialize the responses of a route with the status code as the model, in place of validate_response.
+
+    Responses are only validated in debug or testing mode, where this behaves like validate_response.
+    Responses with other status codes, and Response objects, are returned unchanged.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        validated = validate_response(model_class, status_code)(func)
+
+        @wraps(validated)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if current_app.debug or current_app.testing:
+                result = await validated(*args, **kwargs)
+            else:
+                result = await current_app.ensure_async(func)(*args, **kwargs)
+
+            value, status, headers = result, None, None
+            if isinstance(result, tuple):
+                value, status, headers = result + (None,) * (3 - len(result))
+
+                if status is not None and not isinstance(status, int):
+                    status, headers = None, status
+
+            if isinstance(value, Response) or (status or HTTPStatus.OK) != status_code:
+                return result
+
+            with request_timing.measure("serialize"):
+                body = dump_json(value, model_class)
+
+            return Response(body, status_code, headers, content_type="application/json")
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,182 @@
+"""This module serves the built frontend from memory.
+
+The dist folder is read once, when the app starts serving, into a manifest of every file with its content
+type and ETag. Compressible files are also compressed ahead of time with gzip, and with brotli where it is
+installed, so each request only picks the smallest encoding the client accepts. Vite names the bundles in
+dist/assets after a hash of their contents, so they are cached by clients indefinitely, while index.html
+and other files are revalidated with their ETag.
+
+Files larger than STATIC_MAX_CACHED_FILE_SIZE are left on disk and streamed as before.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from hashlib import blake2b
+from http import HTTPStatus
+from typing import Optional
+
+from quart import Response, request, send_file
+from werkzeug.http import quote_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Largest file held in memory, in bytes.
+STATIC_MAX_CACHED_FILE_SIZE = int(os.environ.get("STATIC_MAX_CACHED_FILE_SIZE", 10 * 1024 * 1024))
+
+# Files smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = 1024
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+}
+
+# Vite's content hashed file names, such as assets/index-4f3a9b2c.js.
+HASHED_ASSET = re.compile(r"^assets/.+-[\w-]{8,}\.\w+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(slots=True, frozen=True)
+class StaticAsset:
+    path: str
+    content_type: str
+    # None for files left on disk, whose ETag is made by send_file.
+    etag: Optional[str]
+    immutable: bool
+    # Bodies by content encoding, with "identity" for the file as it is. None for files left on disk.
+    bodies: Optional[dict[str, bytes]]
+
+
+def compress(body: bytes, content_type: str) -> dict[str, bytes]:
+    """Return the body under each encoding which makes it smaller, including the identity encoding."""
+
+    bodies = {"identity": body}
+
+    if len(body) < MIN_COMPRESS_SIZE or content_type.split(";")[0] not in COMPRESSIBLE_TYPES:
+        return bodies
+
+    # mtime is fixed so the compressed bytes, like the ETag, only depend on the contents.
+    compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(body, quality=11)
+
+    for encoding, compressed_body in compressed.items():
+        if len(compressed_body) < len(body):
+            bodies[encoding] = compressed_body
+
+    return bodies
+
+
+def load_asset(directory: str, path: str) -> StaticAsset:
+    """Read a file of the dist folder, compressing it if it is held in memory."""
+
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+
+    full_path = os.path.join(directory, path)
+    immutable = HASHED_ASSET.match(path) is not None
+
+    if os.path.getsize(full_path) > STATIC_MAX_CACHED_FILE_SIZE:
+        return StaticAsset(path, content_type, None, immutable, None)
+
+    with open(full_path, "rb") as file:
+        body = file.read()
+
+    etag = blake2b(body, digest_size=16).hexdigest()
+
+    return StaticAsset(path, content_type, etag, immutable, compress(body, content_type))
+
+
+class StaticAssets:
+    """The manifest of the files in the dist folder, keyed by their path relative to it."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._assets: Optional[dict[str, StaticAsset]] = None
+
+    def load(self) -> None:
+        """Read the dist folder into the manifest. A missing folder, as in development, has no files."""
+
+        assets = {}
+
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.relpath(os.path.join(root, name), self.directory).replace(os.sep, "/")
+                assets[path] = load_asset(self.directory, path)
+
+        self._assets = assets
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        """Get a file by its path, loading the manifest first if the app has not started serving yet."""
+
+        if self._assets is None:
+            self.load()
+
+        return self._assets.get(path)
+
+    async def response(self, path: str) -> Optional[Response]:
+        """Respond with the file at the path, or None if there is no such file."""
+
+        asset = self.get(path)
+        if asset is None:
+            return None
+
+        return await asset_response(asset, self.directory)
+
+
+def choose_encoding(asset: StaticAsset) -> str:
+    """Choose the smallest encoding of the asset the client accepts."""
+
+    accepted = request.accept_encodings
+    best = "identity"
+
+    for encoding in ("gzip", "br"):
+        if encoding in asset.bodies and accepted[encoding] > 0:
+            if len(asset.bodies[encoding]) < len(asset.bodies[best]):
+                best = encoding
+
+    return best
+
+
+async def asset_response(asset: StaticAsset, directory: str) -> Response:
+    """Respond with the asset, or that the client's copy is current."""
+
+    cache_control = IMMUTABLE_CACHE_CONTROL if asset.immutable else REVALIDATE_CACHE_CONTROL
+
+    if asset.bodies is None:
+        response = await send_file(
+            os.path.join(directory, asset.path), mimetype=asset.content_type, conditional=True
+        )
+        response.headers["Cache-Control"] = cache_control
+        return response
+
+    encoding = choose_encoding(asset)
+
+    # Each encoding is a different representation, so it has its own ETag.
+    etag = asset.etag if encoding == "identity" else f"{asset.etag}-{encoding}"
+
+    headers = {"ETag": quote_etag(etag), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    if request.if_none_match.contains(etag):
+        return Response("", HTTPStatus.NOT_MODIFIED, headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    return Response(asset.bodies[encoding], HTTPStatus.OK, headers, content_type=asset.content_type)
@@ -1,9 +1,32 @@
 """ Unit tests for the app module. """
 
+import json
 import unittest
+from http import HTTPStatus
 
+import app
 from _types.app import QuestionIn, QuizIn, QuizQuestionAnswerIn, QuizStatus
-from app import validate_quiz
+from utilities import validate_quiz
+
+# IDs of the bootstrapped users of each role.
+EDITOR_ID = 1
+VIEWER_ID = 2
+RESTRICTED_ID = 3
+
+ROUTE_QUIZ = {
+    "name": "Route Quiz",
+    "status": "draft",
+    "questions": [
+        {
+            "name": "Question 1",
+            "order": 1,
+            "answers": [
+                {"name": "Answer 1", "order": 1, "is_correct": True},
+                {"name": "Answer 2", "order": 2, "is_correct": False},
+            ],
+        }
+    ],
+}
 
 
 class TestApp(unittest.TestCase):
@@ -203,5 +226,240 @@ class TestApp(unittest.TestCase):
         )
 
 
+
+class TestAppRoutes(unittest.IsolatedAsyncioTestCase):
+    """Unit tests of the API routes, through the test client."""
+
+    async def client(self, user_id=None):
+        """Get a test client, logged in as the user if passed."""
+
+        client = app.app.test_client()
+
+        if user_id is not None:
+            async with client.session_transaction() as session:
+                session["user_id"] = user_id
+
+        return client
+
+    async def create_quiz(self) -> dict:
+        """Create a quiz as an editor and return it."""
+
+        response = await (await self.client(EDITOR_ID)).post("/api/quizzes", json=ROUTE_QUIZ)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        return await response.get_json()
+
+    async def test_question_answer_routes_require_editor(self):
+        """Test that only editors can change single questions and answers."""
+
+        quiz = await self.create_quiz()
+        question = quiz["questions"][0]
+        answer = question["answers"][0]
+        question_path = f"/api/quizzes/{quiz['id']}/questions/{question['id']}"
+        answer_path = f"{question_path}/answers/{answer['id']}"
+
+        requests = [
+            ("PATCH", question_path, {"name": "Changed"}),
+            ("POST", f"/api/quizzes/{quiz['id']}/questions", ROUTE_QUIZ["questions"][0]),
+            ("DELETE", question_path, None),
+            ("PATCH", answer_path, {"name": "Changed"}),
+            ("POST", f"{question_path}/answers", {"name": "Answer 3", "order": 3, "is_correct": False}),
+            ("DELETE", answer_path, None),
+        ]
+
+        for user_id, status in [
+            (None, HTTPStatus.UNAUTHORIZED),
+            (VIEWER_ID, HTTPStatus.FORBIDDEN),
+            (RESTRICTED_ID, HTTPStatus.FORBIDDEN),
+        ]:
+            client = await self.client(user_id)
+            for method, path, body in requests:
+                with self.subTest(user_id=user_id, method=method, path=path):
+                    response = await client.open(path, method=method, json=body)
+                    self.assertEqual(response.status_code, status)
+
+        # Nothing was changed.
+        response = await (await self.client(EDITOR_ID)).get(f"/api/quizzes/{quiz['id']}")
+        self.assertEqual((await response.get_json())["questions"], quiz["questions"])
+
+    async def test_question_answer_routes(self):
+        """Test the status codes of the question and answer routes, and that they change the quiz's ETag."""
+
+        client = await self.client(EDITOR_ID)
+        quiz = await self.create_quiz()
+        quiz_path = f"/api/quizzes/{quiz['id']}"
+        question = quiz["questions"][0]
+        question_path = f"{quiz_path}/questions/{question['id']}"
+        correct_answer, other_answer = question["answers"]
+
+        response = await client.get(quiz_path)
+        etag = response.headers["ETag"]
+        response = await client.get(quiz_path, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        # Change the question's text.
+        response = await client.patch(question_path, json={"name": "Changed Question"})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual((await response.get_json())["name"], "Changed Question")
+
+        response = await client.get(quiz_path, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual((await response.get_json())["questions"][0]["name"], "Changed Question")
+
+        response = await client.patch(question_path, json={"name": ""})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = await client.patch(f"{quiz_path}/questions/999999", json={"name": "Missing"})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+        # Insert a question before the first.
+        new_question = {**ROUTE_QUIZ["questions"][0], "name": "Question 0"}
+        response = await client.post(f"{quiz_path}/questions", json=new_question)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        inserted_question = await response.get_json()
+        self.assertEqual(inserted_question["order"], 1)
+
+        response = await client.post(f"{quiz_path}/questions", json={**new_question, "answers": []})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = await client.post("/api/quizzes/999999/questions", json=new_question)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+        # Change, insert and delete answers.
+        response = await client.patch(
+            f"{question_path}/answers/{other_answer['id']}", json={"name": "Changed Answer"}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual((await response.get_json())["name"], "Changed Answer")
+
+        response = await client.patch(
+            f"{question_path}/answers/{correct_answer['id']}", json={"is_correct": False}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = await client.patch(f"{question_path}/answers/999999", json={"name": "Missing"})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+        response = await client.post(
+            f"{question_path}/answers", json={"name": "Answer 0", "order": 1, "is_correct": False}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        inserted_answer = await response.get_json()
+        self.assertEqual(inserted_answer["order"], 1)
+
+        response = await client.post(
+            f"{question_path}/answers", json={"name": "", "order": 1, "is_correct": False}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = await client.post(
+            f"{quiz_path}/questions/999999/answers", json={"name": "Missing", "order": 1, "is_correct": False}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+        response = await client.delete(f"{question_path}/answers/{inserted_answer['id']}")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = await client.delete(f"{question_path}/answers/{inserted_answer['id']}")
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = await client.delete(f"{question_path}/answers/{correct_answer['id']}")
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+        # Delete questions, but not the last one.
+        response = await client.delete(question_path)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = await client.delete(question_path)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = await client.delete(f"{quiz_path}/questions/{inserted_question['id']}")
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+        response = await client.get(quiz_path)
+        questions = (await response.get_json())["questions"]
+        self.assertEqual([question["name"] for question in questions], ["Question 0"])
+
+    async def test_quizzes_status_route(self):
+        """Test that editors can change the status of many quizzes at once, up to the limit."""
+
+        quiz_ids = [(await self.create_quiz())["id"] for _ in range(2)]
+        body = {"ids": quiz_ids + [999999, quiz_ids[0]], "status": "published"}
+
+        response = await (await self.client()).post("/api/quizzes/status", json=body)
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        for user_id in [VIEWER_ID, RESTRICTED_ID]:
+            response = await (await self.client(user_id)).post("/api/quizzes/status", json=body)
+            self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+        client = await self.client(EDITOR_ID)
+
+        response = await client.post("/api/quizzes/status", json=body)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(await response.get_json(), {"updated": 2})
+
+        for quiz_id in quiz_ids:
+            response = await client.get(f"/api/quizzes/{quiz_id}")
+            self.assertEqual((await response.get_json())["status"], "published")
+
+        response = await client.post("/api/quizzes/status", json={**body, "status": "unknown"})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+        # Repeated IDs only count once towards the limit. The IDs do not exist, so no other quiz is changed.
+        ids = list(range(1000000, 1000000 + app.QUIZ_STATUS_MAX_IDS))
+        response = await client.post("/api/quizzes/status", json={**body, "ids": ids + ids[:10]})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(await response.get_json(), {"updated": 0})
+        response = await client.post("/api/quizzes/status", json={**body, "ids": ids + [999999]})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    async def test_quizzes_batch_route(self):
+        """Test that quizzes are fetched in the requested order, with answers only for editors and viewers."""
+
+        quiz_id = (await self.create_quiz())["id"]
+
+        response = await (await self.client()).get(f"/api/quizzes/batch?ids={quiz_id}")
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+        for user_id, include_answers in [(EDITOR_ID, True), (VIEWER_ID, True), (RESTRICTED_ID, False)]:
+            client = await self.client(user_id)
+            response = await client.get(f"/api/quizzes/batch?ids={quiz_id},999999,1,{quiz_id}")
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+            batch = await response.get_json()
+            self.assertEqual([quiz["id"] for quiz in batch["quizzes"]], [quiz_id, 1])
+            self.assertEqual(batch["missing"], [999999])
+
+            answer = batch["quizzes"][0]["questions"][0]["answers"][0]
+            self.assertEqual(answer["is_correct"], True if include_answers else None)
+
+        client = await self.client(EDITOR_ID)
+        too_many_ids = ",".join(str(quiz_id) for quiz_id in range(1, app.QUIZ_BATCH_MAX_IDS + 2))
+        for query in ["", "?ids=", "?ids=1,one", f"?ids={too_many_ids}"]:
+            with self.subTest(query=query):
+                response = await client.get(f"/api/quizzes/batch{query}")
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    async def test_export_route(self):
+        """Test that editors can export quizzes as NDJSON, filtered by status and update time."""
+
+        quiz = await self.create_quiz()
+        query = f"?status=draft&updated_since={quiz['updated_at']}"
+
+        response = await (await self.client()).get(f"/api/export{query}")
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        for user_id in [VIEWER_ID, RESTRICTED_ID]:
+            response = await (await self.client(user_id)).get(f"/api/export{query}")
+            self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+        client = await self.client(EDITOR_ID)
+
+        response = await client.get(f"/api/export{query}")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+
+        exported = [json.loads(line) for line in (await response.get_data(as_text=True)).splitlines()]
+        self.assertIn(quiz, exported)
+        self.assertTrue(all(exported_quiz["status"] == "draft" for exported_quiz in exported))
+
+        for query in ["?status=unknown", "?updated_since=yesterday", "?updated_until=2024-13-01"]:
+            with self.subTest(query=query):
+                response = await client.get(f"/api/export{query}")
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,312 @@
+""" Unit tests for the async_queries module. """
+
+import asyncio
+import io
+import json
+import sqlite3
+import threading
+import unittest
+import uuid
+from unittest import mock
+
+from _types.app import Quiz, QuizIn, QuizStatus, User, UserRole
+import async_queries
+import importer
+import queries
+import utilities
+from queries import create_user
+from async_queries import (
+    create_update_quiz,
+    delete_user,
+    get_cached_user,
+    get_quiz,
+    get_quizzes,
+    get_user,
+    import_quizzes,
+    invalidate_quiz,
+    quiz_cache,
+    read_pool,
+    stats,
+    update_user_role,
+    user_cache,
+    verify_password,
+    writer,
+    Writer,
+)
+
+
+class TestAsyncQueries(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for the async_queries module."""
+
+    async def test_get_user(self):
+        """Test the get_user function."""
+
+        user = await get_user(1)
+        self.assertIsInstance(user, User)
+        self.assertEqual(user.id, 1)
+
+        user = await get_user(100)
+        self.assertIsNone(user)
+
+    async def test_concurrent_reads(self):
+        """Test that concurrent reads are served by the read pool without exceeding its size."""
+
+        results = await asyncio.gather(
+            *[get_quiz(1, include_answers=True) for _ in range(read_pool.size * 3)],
+            get_quizzes("General", [QuizStatus.QUIZ_STATUS_PUBLISHED.value], 10, 0),
+        )
+
+        for quiz in results[:-1]:
+            self.assertIsInstance(quiz, Quiz)
+            self.assertEqual(quiz.id, 1)
+
+        quizzes, count, _ = results[-1]
+        self.assertEqual(count, 1)
+        self.assertEqual(quizzes[0].name, "General Knowledge")
+
+        read_stats = stats()["read"]
+        self.assertLessEqual(read_stats["open"], read_pool.size)
+        self.assertEqual(read_stats["queued"], 0)
+        self.assertEqual(read_stats["active"], 0)
+
+    async def test_get_quiz_cached(self):
+        """Test that assembled quizzes are served from the cache until invalidated."""
+
+        # The quiz store, when STORAGE_MODE is "memory", is read before the cache.
+        store_patch = mock.patch.object(queries, "store", None)
+        store_patch.start()
+        self.addCleanup(store_patch.stop)
+
+        invalidate_quiz(1)
+
+        quiz = await get_quiz(1, include_answers=False)
+        self.assertIs(await get_quiz(1, include_answers=False), quiz)
+        self.assertIsNot(await get_quiz(1, include_answers=True), quiz)
+
+        invalidate_quiz(1)
+        self.assertIsNone(quiz_cache.get((1, False)))
+        self.assertIsNot(await get_quiz(1, include_answers=False), quiz)
+
+    async def test_cancelled_write_invalidates_quiz(self):
+        """Test that a quiz is removed from the cache once its change commits, even if the writer's caller has
+        been cancelled."""
+
+        store_patch = mock.patch.object(queries, "store", None)
+        store_patch.start()
+        self.addCleanup(store_patch.stop)
+
+        quiz_id = await create_update_quiz(
+            1, None, QuizIn(name="Cancelled Quiz", status=QuizStatus.QUIZ_STATUS_DRAFT, questions=[])
+        )
+        quiz = await get_quiz(quiz_id, include_answers=True)
+        self.assertIs(await get_quiz(quiz_id, include_answers=True), quiz)
+
+        write = asyncio.create_task(
+            create_update_quiz(
+                1,
+                quiz_id,
+                QuizIn(name="Renamed Quiz", status=QuizStatus.QUIZ_STATUS_DRAFT, questions=[]),
+            )
+        )
+        await asyncio.sleep(0)
+        write.cancel()
+
+        # The cancelled write is still committed, before the next write queued after it.
+        await writer.run(queries.count_users)
+
+        self.assertTrue(write.cancelled())
+        self.assertIsNone(quiz_cache.get((quiz_id, True)))
+        self.assertEqual((await get_quiz(quiz_id, include_answers=True)).name, "Renamed Quiz")
+
+    async def test_get_cached_user(self):
+        """Test that users are served from the cache until their role changes or they are deleted."""
+
+        user_id = create_user(str(uuid.uuid4())[:8], "password", "Cached User", "viewer")
+
+        user = await get_cached_user(user_id)
+        self.assertEqual(user.role, UserRole.USER_ROLE_VIEWER)
+
+        hits = user_cache.stats()["hits"]
+        self.assertIs(await get_cached_user(user_id), user)
+        self.assertEqual(user_cache.stats()["hits"], hits + 1)
+
+        self.assertTrue(await update_user_role(user_id, UserRole.USER_ROLE_EDITOR))
+        user = await get_cached_user(user_id)
+        self.assertEqual(user.role, UserRole.USER_ROLE_EDITOR)
+
+        self.assertTrue(await delete_user(user_id))
+        self.assertIsNone(await get_cached_user(user_id))
+
+    async def test_verify_password(self):
+        """Test that passwords are verified and legacy hashes are upgraded on a successful login."""
+
+        username = str(uuid.uuid4())[:8]
+        user_id = create_user(username, "password", "Legacy User", "viewer")
+
+        salt = utilities.generate_salt()
+        queries.update_user_password(user_id, utilities.hash_legacy_password("password", salt), salt)
+        database_user = queries.get_database_user_by_username(username)
+
+        self.assertIsNone(await verify_password(database_user, "wrong"))
+        self.assertEqual(queries.get_database_user_by_username(username).password, database_user.password)
+
+        self.assertIs(await verify_password(database_user, "password"), database_user)
+        upgraded = queries.get_database_user_by_username(username)
+        self.assertTrue(upgraded.password.startswith("scrypt$"))
+        self.assertFalse(utilities.password_needs_rehash(upgraded.password))
+        self.assertIs(await verify_password(upgraded, "password"), upgraded)
+
+        self.assertIsNone(await verify_password(None, "password"))
+
+        self.assertTrue(await delete_user(user_id))
+
+    async def test_writer_group_commit(self):
+        """Test that queued writes are committed together, and a write which raises only rolls back itself."""
+
+        user_ids = [
+            create_user(str(uuid.uuid4())[:8], "password", "Grouped User", "viewer") for _ in range(3)
+        ]
+
+        def rename_and_fail(user_id: int, connection):
+            connection.execute("UPDATE user SET name = 'Renamed' WHERE id = ?", (user_id,))
+            raise ValueError("Invalid write")
+
+        commits = writer.stats()["commits"]
+        results = await asyncio.gather(
+            writer.run(queries.update_user_role, user_ids[0], UserRole.USER_ROLE_EDITOR),
+            writer.run(rename_and_fail, user_ids[1]),
+            writer.run(queries.update_user_role, user_ids[2], UserRole.USER_ROLE_EDITOR),
+            return_exceptions=True,
+        )
+
+        self.assertEqual(results[0], True)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], True)
+        self.assertEqual(writer.stats()["commits"], commits + 1)
+
+        self.assertEqual((await get_user(user_ids[0])).role, UserRole.USER_ROLE_EDITOR)
+        self.assertEqual((await get_user(user_ids[1])).name, "Grouped User")
+        self.assertEqual((await get_user(user_ids[2])).role, UserRole.USER_ROLE_EDITOR)
+
+        for user_id in user_ids:
+            self.assertTrue(await delete_user(user_id))
+
+    async def test_writer_connect_error(self):
+        """Test that jobs fail, rather than wait forever, when the writer can not open its connection."""
+
+        connections = [sqlite3.OperationalError("unable to open database file"), queries.conn]
+
+        def connect():
+            connection = connections.pop(0)
+            if isinstance(connection, Exception):
+                raise connection
+            return connection
+
+        failing_writer = Writer("failing", connect, 4, 0)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            await asyncio.wait_for(failing_writer.run(queries.count_users), 5)
+
+        # The writer keeps running, and opens its connection for the next batch.
+        self.assertGreater(await asyncio.wait_for(failing_writer.run(queries.count_users), 5), 0)
+
+    async def test_writer_store_error(self):
+        """Test that a write which fails to update the quiz store still succeeds, and the store is dropped."""
+
+        queries.store = queries.load_store()
+        self.addCleanup(setattr, queries, "store", None)
+
+        quiz = QuizIn(name="Store Error Quiz", status=QuizStatus.QUIZ_STATUS_DRAFT, questions=[])
+
+        with mock.patch.object(queries.store, "replace", side_effect=KeyError("draft")), self.assertLogs(
+            level="ERROR"
+        ):
+            quiz_id = await writer.run(queries.create_update_quiz, 1, None, quiz)
+
+        self.assertIsNone(queries.store)
+        self.assertEqual((await get_quiz(quiz_id, include_answers=True)).name, "Store Error Quiz")
+
+    async def test_get_quizzes_store(self):
+        """Test that pages of the quiz store are read off the event loop, as sorting a listing can take a while."""
+
+        queries.store = queries.load_store()
+        self.addCleanup(setattr, queries, "store", None)
+
+        page = queries.store.page
+        page_threads = []
+
+        def record_thread(*args):
+            page_threads.append(threading.get_ident())
+            return page(*args)
+
+        with mock.patch.object(queries.store, "page", record_thread):
+            quizzes, count, _ = await get_quizzes("", [QuizStatus.QUIZ_STATUS_PUBLISHED.value], 10, 0)
+
+        self.assertEqual(len(page_threads), 1)
+        self.assertNotIn(threading.get_ident(), page_threads)
+        self.assertEqual(len(quizzes), min(count, 10))
+
+    async def test_import_quizzes(self):
+        """Test that imported records are parsed off the event loop, and only valid quizzes are inserted."""
+
+        quiz = {
+            "name": "Imported Quiz",
+            "status": "draft",
+            "questions": [
+                {"name": "Question", "order": 1, "answers": [{"name": "Yes", "order": 1, "is_correct": True}]}
+            ],
+        }
+
+        parse_chunk = importer.parse_chunk
+        parse_threads = []
+
+        def record_thread(*args):
+            parse_threads.append(threading.get_ident())
+            return parse_chunk(*args)
+
+        with mock.patch.object(importer, "parse_chunk", record_thread):
+            result = await import_quizzes(io.StringIO(json.dumps([quiz, {"name": ""}])), "json", 1)
+
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(result.errors[0].record, 2)
+        self.assertNotIn(threading.get_ident(), parse_threads)
+
+    async def test_import_quizzes_commit_error(self):
+        """Test that quizzes are only counted as imported once their chunk has been committed."""
+
+        class FailingCommitConnection(sqlite3.Connection):
+            def commit(self):
+                raise sqlite3.OperationalError("disk I/O error")
+
+        connection = sqlite3.connect(
+            queries.DATABASE_PATH, check_same_thread=False, factory=FailingCommitConnection
+        )
+        self.addCleanup(connection.close)
+
+        parse_next_chunk = importer.parse_next_chunk
+        results = []
+
+        def record_result(chunks, result):
+            results.append(result)
+            return parse_next_chunk(chunks, result)
+
+        quiz = {
+            "name": "Uncommitted Quiz",
+            "status": "draft",
+            "questions": [
+                {"name": "Question", "order": 1, "answers": [{"name": "Yes", "order": 1, "is_correct": True}]}
+            ],
+        }
+
+        with mock.patch.object(
+            async_queries, "writer", Writer("failing", lambda: connection, 4, 0)
+        ), mock.patch.object(importer, "parse_next_chunk", record_result):
+            with self.assertRaises(sqlite3.OperationalError):
+                await import_quizzes(io.StringIO(json.dumps([quiz])), "json", 1)
+
+        self.assertEqual(results[0].imported, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
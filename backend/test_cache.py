@@ -0,0 +1,78 @@
+""" Unit tests for the cache module. """
+
+import time
+import unittest
+
+from cache import LRUCache
+
+
+class TestCache(unittest.TestCase):
+    """Unit tests for the cache module."""
+
+    def test_get_set(self):
+        """Test that stored values are returned and counted as hits."""
+
+        cache = LRUCache(max_entries=10, max_bytes=1024, ttl=60, size_of=lambda _: 1)
+
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["resident_bytes"], 1)
+
+    def test_evict_least_recently_used(self):
+        """Test that the least recently used values are evicted when a limit is exceeded."""
+
+        cache = LRUCache(max_entries=2, max_bytes=1024, ttl=60, size_of=lambda _: 1)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache = LRUCache(max_entries=10, max_bytes=10, ttl=60, size_of=lambda v: v)
+        cache.set("a", 6)
+        cache.set("b", 6)
+        cache.set("c", 11)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 6)
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.stats()["resident_bytes"], 6)
+
+    def test_expiry(self):
+        """Test that values expire after the TTL."""
+
+        cache = LRUCache(max_entries=10, max_bytes=1024, ttl=0.01, size_of=lambda _: 1)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_invalidate(self):
+        """Test that invalidated values are removed, and values read before an invalidation are discarded."""
+
+        cache = LRUCache(max_entries=10, max_bytes=1024, ttl=60, size_of=lambda _: 1)
+        cache.set("a", 1)
+
+        generation = cache.generation
+        cache.invalidate("a")
+        cache.set("a", 2, generation)
+
+        self.assertIsNone(cache.get("a"))
+
+        cache.set("a", 3, cache.generation)
+        self.assertEqual(cache.get("a"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
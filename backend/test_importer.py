@@ -0,0 +1,119 @@
+""" Unit tests for the importer module. """
+
+import io
+import json
+import unittest
+
+import queries
+from importer import import_quizzes
+from test_migrations import create_database
+
+VALID_QUIZ = {
+    "name": "Imported Quiz",
+    "status": "draft",
+    "questions": [
+        {
+            "name": "Question 1",
+            "order": 1,
+            "answers": [
+                {"name": "Answer 1", "order": 1, "is_correct": True},
+                {"name": "Answer 2", "order": 2, "is_correct": False},
+            ],
+        }
+    ],
+}
+
+
+class TestImporter(unittest.TestCase):
+    """Unit tests for the importer module."""
+
+    def test_import_ndjson(self):
+        """Test that valid records are imported in chunks and invalid records are reported by line."""
+
+        connection = create_database()
+        invalid_quiz = {**VALID_QUIZ, "questions": []}
+
+        lines = [
+            json.dumps(VALID_QUIZ),
+            "{not json",
+            "",
+            json.dumps(invalid_quiz),
+            json.dumps({**VALID_QUIZ, "status": "unknown"}),
+            json.dumps(VALID_QUIZ),
+        ]
+
+        progress = []
+        result = import_quizzes(
+            io.StringIO("\n".join(lines)),
+            "ndjson",
+            1,
+            chunk_size=2,
+            progress=lambda result: progress.append(result.imported),
+            connection=connection,
+        )
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(result.failed, 3)
+        self.assertEqual([error.record for error in result.errors], [2, 4, 5])
+        self.assertEqual(result.errors[1].message, "quiz.questions: Missing questions")
+        self.assertTrue(result.errors[2].message.startswith("quiz.status:"))
+        self.assertEqual(progress, [1, 1, 2])
+
+        quiz_ids = [
+            row[0]
+            for row in connection.execute(
+                "SELECT id FROM quiz WHERE name = 'Imported Quiz' ORDER BY id"
+            )
+        ]
+        self.assertEqual(len(quiz_ids), 2)
+
+        quiz = queries.get_quiz(quiz_ids[1], True, connection=connection)
+        self.assertEqual(len(quiz.questions), 1)
+        self.assertEqual(
+            [answer.is_correct for answer in quiz.questions[0].answers], [True, False]
+        )
+        self.assertEqual(queries.check_quiz_counters(connection=connection), 0)
+
+    def test_import_json(self):
+        """Test that a JSON array of quizzes is imported."""
+
+        connection = create_database()
+
+        result = import_quizzes(
+            io.StringIO(json.dumps([VALID_QUIZ, VALID_QUIZ])), "json", 1, connection=connection
+        )
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(result.failed, 0)
+
+    def test_import_csv(self):
+        """Test that CSV rows are grouped into quizzes and questions."""
+
+        connection = create_database()
+
+        rows = [
+            "quiz,status,question,question_order,answer,answer_order,is_correct",
+            "First,published,Question 1,1,Answer 1,1,true",
+            "First,published,Question 1,1,Answer 2,2,false",
+            "First,published,Question 2,2,Answer 1,1,1",
+            "Second,draft,Question 1,1,Answer 1,1,0",
+        ]
+
+        result = import_quizzes(io.StringIO("\n".join(rows)), "csv", 1, connection=connection)
+
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(result.errors[0].record, 5)
+        self.assertEqual(result.errors[0].message, "quiz.questions.0.answers: No correct answer set")
+
+        quiz_id = connection.execute("SELECT id FROM quiz WHERE name = 'First'").fetchone()[0]
+        quiz = queries.get_quiz(quiz_id, True, connection=connection)
+
+        self.assertEqual([len(question.answers) for question in quiz.questions], [2, 1])
+
+        with self.assertRaises(ValueError):
+            import_quizzes(io.StringIO("quiz,status\n"), "csv", 1, connection=connection)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+""" Unit tests for the instrumentation module. """
+
+import sqlite3
+import unittest
+from unittest import mock
+
+import instrumentation
+import queries
+from instrumentation import InstrumentedConnection, normalize_statement, statement_stats
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Unit tests for the instrumentation module."""
+
+    def setUp(self):
+        instrumentation.reset()
+
+        self.connection = sqlite3.connect(":memory:", factory=InstrumentedConnection)
+        self.connection.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+        self.connection.executemany(
+            "INSERT INTO item (name) VALUES (?)", [("a",), ("b",), ("c",)]
+        )
+
+    def test_connect(self):
+        """Test that queries.connect only opens instrumented connections when instrumentation is enabled."""
+
+        for enabled in [False, True]:
+            with mock.patch.object(instrumentation, "DATABASE_INSTRUMENTATION", enabled):
+                connection = queries.connect()
+                self.addCleanup(connection.close)
+                self.assertEqual(isinstance(connection, InstrumentedConnection), enabled)
+
+    def test_normalize_statement(self):
+        """Test that whitespace is collapsed and placeholder lists of any length are grouped."""
+
+        self.assertEqual(
+            normalize_statement("SELECT *\n    FROM item WHERE id IN (?, ?,?)"),
+            "SELECT * FROM item WHERE id IN (?, ...)",
+        )
+        self.assertEqual(
+            normalize_statement("SELECT * FROM item WHERE id IN (?)"),
+            "SELECT * FROM item WHERE id IN (?)",
+        )
+
+    def test_statement_stats(self):
+        """Test that executions and fetched rows are counted per statement."""
+
+        for ids in [(1, 2), (1, 2, 3)]:
+            cursor = self.connection.cursor()
+            cursor.execute(f"SELECT name FROM item WHERE id IN ({', '.join('?' * len(ids))})", ids)
+            cursor.fetchall()
+
+        self.connection.execute("SELECT name FROM item WHERE id = ?", (1,)).fetchone()
+
+        stats = statement_stats()
+
+        select_in = stats["SELECT name FROM item WHERE id IN (?, ...)"]
+        self.assertEqual(select_in.count, 2)
+        self.assertEqual(select_in.rows, 5)
+        self.assertGreater(select_in.total_time, 0)
+        self.assertGreaterEqual(select_in.total_time, select_in.max_time)
+
+        self.assertEqual(stats["SELECT name FROM item WHERE id = ?"].rows, 1)
+        self.assertEqual(stats["INSERT INTO item (name) VALUES (?)"].count, 1)
+
+    def test_slow_statement_plan(self):
+        """Test that the query plan is captured for statements slower than the threshold."""
+
+        with mock.patch.object(instrumentation, "SLOW_QUERY_THRESHOLD", 0), self.assertLogs(
+            level="WARNING"
+        ):
+            self.connection.execute("SELECT name FROM item WHERE name = ?", ("a",)).fetchall()
+
+        stats = statement_stats()["SELECT name FROM item WHERE name = ?"]
+        self.assertEqual(stats.slow_count, 1)
+        self.assertIn("SCAN item", stats.slow_plan)
+
+        metrics = "\n".join(instrumentation.format_statement_metrics())
+        self.assertIn(
+            'sqlite_statement_slow_total{statement="SELECT name FROM item WHERE name = ?"} 1',
+            metrics,
+        )
+        self.assertIn("#   SCAN item", metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+""" Unit tests for the migrations module. """
+
+import re
+import sqlite3
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import queries
+from _types.app import (
+    QuestionIn,
+    QuestionUpdate,
+    QuizIn,
+    QuizQuestionAnswerIn,
+    QuizQuestionAnswerUpdate,
+    QuizStatus,
+    UserRole,
+)
+from migrations import get_migrations, get_version, migrate
+from quiz_store import QuizStore
+from utilities import encode_cursor
+
+# Tables which must never be read with a full table scan.
+INDEXED_TABLES = ["quiz", "quiz_question", "quiz_question_answer", "user"]
+
+
+def create_database() -> sqlite3.Connection:
+    """Create an in-memory database with the schema, migrations and bootstrap data applied."""
+
+    connection = sqlite3.connect(":memory:")
+
+    with open("schema.sql", "r", encoding="utf-8") as file:
+        connection.executescript(file.read())
+
+    migrate(connection)
+
+    with open("bootstrap_data.sql", "r", encoding="utf-8") as file:
+        connection.executescript(file.read())
+
+    return connection
+
+
+class TestMigrations(unittest.TestCase):
+    """Unit tests for the migrations module."""
+
+    def test_migrate(self):
+        """Test that migrations are applied once and update the schema version."""
+
+        connection = create_database()
+        latest_version = get_migrations()[-1][0]
+
+        self.assertEqual(get_version(connection), latest_version)
+        self.assertEqual(migrate(connection), latest_version)
+
+    def test_query_plans_use_indexes(self):
+        """Test that no statement in the queries module scans a quiz table."""
+
+        connection = create_database()
+
+        statements = []
+        connection.set_trace_callback(statements.append)
+
+        queries.get_database_user_by_username("admin", connection=connection)
+        queries.get_user(1, connection=connection)
+        queries.get_quizzes("", ["published", "draft"], 10, 0, connection=connection)
+        queries.get_quizzes("General", ["published"], 10, 10, connection=connection)
+        for sort, page_cursor in [
+            ("updated_at", encode_cursor(["updated_at", "2024-02-05T19:58:52", 1])),
+            ("name", encode_cursor(["name", "General", 1])),
+            ("id", encode_cursor(["id", 1, 1])),
+        ]:
+            queries.get_quizzes_page(
+                "", ["published", "draft"], 10, 0, sort, page_cursor, connection
+            )
+        queries.get_quizzes_page(
+            "general",
+            ["published"],
+            10,
+            0,
+            "relevance",
+            encode_cursor(["relevance", -1.0, 1]),
+            connection,
+        )
+        queries.get_quiz(1, include_answers=True, connection=connection)
+        queries.get_quizzes_by_ids([1, 2], include_answers=True, connection=connection)
+        queries.get_quizzes_for_export(
+            ["published", "draft"], datetime(2024, 1, 1), datetime(2025, 1, 1), 0, 10, connection
+        )
+
+        quiz = QuizIn(
+            name="Indexed Quiz",
+            status=QuizStatus.QUIZ_STATUS_DRAFT,
+            questions=[
+                QuestionIn(
+                    name="Question 1",
+                    order=1,
+                    answers=[
+                        QuizQuestionAnswerIn(name="Answer 1", order=1, is_correct=True)
+                    ],
+                )
+            ],
+        )
+        quiz_id = queries.create_update_quiz(1, None, quiz, connection=connection)
+        queries.create_update_quiz(1, quiz_id, quiz, connection=connection)
+        queries.insert_quizzes(1, [quiz, quiz], connection=connection)
+        queries.get_quiz_updated_at(quiz_id, connection=connection)
+        queries.get_quiz_collection_version(connection=connection)
+        queries.set_quiz_status(
+            1, [quiz_id, 1], QuizStatus.QUIZ_STATUS_PUBLISHED, connection=connection
+        )
+
+        # Single question and answer changes, which also touch the quiz and check for a correct answer.
+        question = queries.insert_question(
+            1,
+            quiz_id,
+            QuestionIn(
+                name="Question 2",
+                order=1,
+                answers=[QuizQuestionAnswerIn(name="Answer 1", order=1, is_correct=True)],
+            ),
+            connection=connection,
+        )
+        queries.update_question(
+            1, quiz_id, question.id, QuestionUpdate(name="Question 0"), connection=connection
+        )
+        answer = queries.insert_answer(
+            1,
+            quiz_id,
+            question.id,
+            QuizQuestionAnswerIn(name="Answer 0", order=1, is_correct=False),
+            connection=connection,
+        )
+        queries.update_answer(
+            1,
+            quiz_id,
+            question.id,
+            answer.id,
+            QuizQuestionAnswerUpdate(name="Answer 2", is_correct=True),
+            connection=connection,
+        )
+        queries.delete_answer(1, quiz_id, question.id, answer.id, connection=connection)
+        queries.delete_question(1, quiz_id, question.id, connection=connection)
+
+        # Users changed with the quiz store enabled, which reloads the quizzes they last updated.
+        with mock.patch.object(queries, "store", QuizStore(queries.STORE_STATUSES)):
+            user_id = queries.create_user(
+                "indexed", "password", "Indexed", "editor", connection=connection
+            )
+            queries.create_update_quiz(user_id, None, quiz, connection=connection)
+            queries.update_user_role(user_id, UserRole.USER_ROLE_VIEWER, connection=connection)
+            queries.update_user_password(user_id, "hash", "salt", connection=connection)
+            queries.delete_user(user_id, connection=connection)
+
+        connection.set_trace_callback(None)
+
+        scan = re.compile(r"\bSCAN (" + "|".join(INDEXED_TABLES) + r")\b")
+        checked = 0
+
+        for statement in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+
+            plan = connection.execute("EXPLAIN QUERY PLAN " + statement).fetchall()
+            for row in plan:
+                self.assertIsNone(
+                    scan.search(row[3]), f"{row[3]} in plan for: {statement}"
+                )
+
+            checked += 1
+
+        self.assertGreater(checked, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,18 +3,44 @@
 import unittest
 import uuid
 from sqlite3 import IntegrityError
-
-from _types.app import User, QuizIn, QuestionIn, QuizStatus, QuizQuestionAnswerIn
+from unittest import mock
+
+from _types.app import (
+    User,
+    QuizIn,
+    QuestionIn,
+    QuestionUpdate,
+    QuizStatus,
+    QuizQuestionAnswerIn,
+    QuizQuestionAnswerUpdate,
+    UserRole,
+)
 from _types.queries import DatabaseUser
+import queries
+import quiz_store
 from queries import (
+    check_quiz_counters,
     count_users,
     create_user,
     get_database_user_by_username,
     get_user,
     get_quizzes,
+    get_quizzes_page,
     get_quiz,
+    get_quizzes_by_ids,
+    get_quizzes_for_export,
     create_update_quiz,
+    save_quiz,
+    set_quiz_status,
+    update_question,
+    insert_question,
+    delete_question,
+    update_answer,
+    insert_answer,
+    delete_answer,
+    update_user_role,
 )
+from utilities import encode_cursor
 
 
 class TestQueries(unittest.TestCase):
@@ -99,6 +125,63 @@ class TestQueries(unittest.TestCase):
         self.assertEqual(total_count, 0)
         self.assertEqual(len(quizzes), 0)
 
+        # Test case 3: Search by word prefixes in any order, expect "General Knowledge" quiz
+        query = "know gen"
+        status_list = [QuizStatus.QUIZ_STATUS_PUBLISHED.value]
+
+        quizzes, total_count = get_quizzes(query, status_list, limit, offset)
+
+        self.assertEqual(total_count, 1)
+        self.assertEqual(quizzes[0].name, "General Knowledge")
+
+        # Test case 4: Search without any words, expect no quizzes
+        for query in ["!!!", "_"]:
+            quizzes, total_count = get_quizzes(query, status_list, limit, offset)
+
+            self.assertEqual(total_count, 0)
+            self.assertEqual(quizzes, [])
+
+    def test_get_quizzes_page(self):
+        """Test the get_quizzes_page function pages through quizzes by cursor in a stable order."""
+
+        status_list = [
+            QuizStatus.QUIZ_STATUS_PUBLISHED.value,
+            QuizStatus.QUIZ_STATUS_DRAFT.value,
+        ]
+
+        for sort in ["updated_at", "name", "id"]:
+            expected, total_count, _ = get_quizzes_page(
+                "", status_list, 100, 0, sort=sort
+            )
+
+            # Follow the cursors two quizzes at a time, expect the same order as a single page
+            quiz_ids = []
+            page_cursor = None
+            while True:
+                quizzes, count, page_cursor = get_quizzes_page(
+                    "", status_list, 2, 0, sort=sort, page_cursor=page_cursor
+                )
+                self.assertEqual(count, total_count)
+                quiz_ids.extend(quiz.id for quiz in quizzes)
+
+                if page_cursor is None:
+                    break
+
+            self.assertEqual(quiz_ids, [quiz.id for quiz in expected])
+
+        # A cursor can not be used with a different sort order
+        _, _, page_cursor = get_quizzes_page("", status_list, 1, 0, sort="name")
+        with self.assertRaises(ValueError):
+            get_quizzes_page("", status_list, 1, 0, sort="id", page_cursor=page_cursor)
+
+        with self.assertRaises(ValueError):
+            get_quizzes_page("", status_list, 1, 0, page_cursor="invalid")
+
+        with self.assertRaises(ValueError):
+            get_quizzes_page(
+                "", status_list, 1, 0, page_cursor=encode_cursor(["updated_at", {"a": 1}, 2])
+            )
+
     def test_get_quiz(self):
         """Test the get_quiz function."""
 
@@ -128,6 +211,102 @@ class TestQueries(unittest.TestCase):
             for answer in question.answers:
                 self.assertIsNone(answer.is_correct)
 
+    def test_get_quizzes_by_ids(self):
+        """Test that several quizzes are loaded in the requested order, matching get_quiz."""
+
+        quiz = QuizIn(
+            name="Batch Quiz",
+            status=QuizStatus.QUIZ_STATUS_DRAFT,
+            questions=[
+                QuestionIn(
+                    name="Question 1",
+                    order=1,
+                    answers=[
+                        QuizQuestionAnswerIn(name="Answer 1", order=1, is_correct=True)
+                    ],
+                )
+            ],
+        )
+        quiz_id = create_update_quiz(1, None, quiz)
+
+        for include_answers in [True, False]:
+            quizzes = get_quizzes_by_ids([quiz_id, -1, 1], include_answers)
+
+            self.assertEqual([quiz.id for quiz in quizzes], [quiz_id, 1])
+            self.assertEqual(quizzes[0], get_quiz(quiz_id, include_answers))
+            self.assertEqual(quizzes[1], get_quiz(1, include_answers))
+
+        self.assertEqual(get_quizzes_by_ids([], True), [])
+
+    def test_get_quizzes_for_export(self):
+        """Test that exported quizzes are paged by ID and filtered by status and update time."""
+
+        quiz = QuizIn(name="Export Quiz", status=QuizStatus.QUIZ_STATUS_ARCHIVED, questions=[])
+        first_id = create_update_quiz(1, None, quiz)
+        second_id = create_update_quiz(1, None, quiz)
+
+        updated_at = get_quiz(second_id, True).updated_at
+
+        quizzes = get_quizzes_for_export(["archived"], None, None, first_id - 1, 1)
+        self.assertEqual([quiz.id for quiz in quizzes], [first_id])
+
+        quizzes = get_quizzes_for_export(["archived"], None, None, first_id, 1)
+        self.assertEqual([quiz.id for quiz in quizzes], [second_id])
+
+        quizzes = get_quizzes_for_export(["archived"], updated_at, None, first_id - 1, 10)
+        self.assertIn(second_id, [quiz.id for quiz in quizzes])
+
+        quizzes = get_quizzes_for_export(["archived"], None, updated_at, first_id - 1, 10)
+        self.assertNotIn(second_id, [quiz.id for quiz in quizzes])
+
+        quizzes = get_quizzes_for_export(["published"], None, None, first_id - 1, 10)
+        self.assertEqual(quizzes, [])
+
+    def test_get_quiz_assembly(self):
+        """Test that quizzes without questions are kept, and questions and answers are returned in order."""
+
+        empty_quiz_id = create_update_quiz(
+            1,
+            None,
+            QuizIn(name="Empty Quiz", status=QuizStatus.QUIZ_STATUS_DRAFT, questions=[]),
+        )
+
+        quiz = get_quiz(empty_quiz_id, True)
+        self.assertIsNotNone(quiz)
+        self.assertEqual(quiz.questions, [])
+
+        quiz_id = create_update_quiz(
+            1,
+            None,
+            QuizIn(
+                name="Ordered Quiz",
+                status=QuizStatus.QUIZ_STATUS_DRAFT,
+                questions=[
+                    QuestionIn(
+                        name=f"Question {order}",
+                        order=order,
+                        answers=[
+                            QuizQuestionAnswerIn(
+                                name=f"Answer {answer_order}",
+                                order=answer_order,
+                                is_correct=answer_order == 1,
+                            )
+                            for answer_order in [3, 1, 2]
+                        ],
+                    )
+                    for order in [2, 3, 1]
+                ],
+            ),
+        )
+
+        quiz = get_quiz(quiz_id, True)
+        self.assertEqual([question.order for question in quiz.questions], [1, 2, 3])
+        for question in quiz.questions:
+            self.assertEqual([answer.order for answer in question.answers], [1, 2, 3])
+            self.assertEqual(
+                [answer.is_correct for answer in question.answers], [True, False, False]
+            )
+
     def test_create_update_quiz(self):
         """Test the create_update_quiz function."""
 
@@ -248,6 +427,371 @@ class TestQueries(unittest.TestCase):
         self.assertFalse(updated_quiz.questions[1].answers[1].is_correct)
         self.assertEqual(updated_quiz.questions[1].answers[1].order, 2)
 
+        # The maintained counters should match the saved quiz
+        question_count = queries.conn.execute(
+            "SELECT question_count FROM quiz WHERE id = ?", (quiz_id,)
+        ).fetchone()[0]
+        self.assertEqual(question_count, 2)
+        self.assertEqual(check_quiz_counters(), 0)
+
+    def test_save_quiz(self):
+        """Test the save_quiz function only writes changed rows and keeps row IDs stable."""
+
+        quiz = QuizIn(
+            name="Diff Quiz",
+            status=QuizStatus.QUIZ_STATUS_DRAFT,
+            questions=[
+                QuestionIn(
+                    name=f"Question {question_order}",
+                    order=question_order,
+                    answers=[
+                        QuizQuestionAnswerIn(
+                            name=f"Answer {answer_order}",
+                            order=answer_order,
+                            is_correct=answer_order == 1,
+                        )
+                        for answer_order in range(1, 4)
+                    ],
+                )
+                for question_order in range(1, 4)
+            ],
+        )
+
+        # Test case 1: Create a quiz, expect every row to be inserted
+        result = save_quiz(1, None, quiz)
+        self.assertEqual(result.rows_touched, 1 + 3 + 9)
+        created_quiz = get_quiz(result.quiz_id, include_answers=True)
+
+        # Test case 2: Save the quiz unchanged, expect only the quiz row to be updated
+        result = save_quiz(1, created_quiz.id, created_quiz)
+        self.assertEqual(result.rows_touched, 1)
+
+        # Test case 3: Edit one answer, remove a question and add an answer
+        created_quiz.questions[0].answers[1].name = "Edited Answer"
+        created_quiz.questions[1].answers.append(
+            QuizQuestionAnswerIn(name="Answer 4", order=4, is_correct=False)
+        )
+        deleted_question = created_quiz.questions.pop()
+
+        result = save_quiz(1, created_quiz.id, created_quiz)
+        self.assertEqual(result.rows_touched, 1 + 1 + 1 + 1 + 3)
+
+        updated_quiz = get_quiz(created_quiz.id, include_answers=True)
+        self.assertEqual(len(updated_quiz.questions), 2)
+        self.assertEqual(updated_quiz.questions[0].answers[1].name, "Edited Answer")
+        self.assertEqual(len(updated_quiz.questions[1].answers), 4)
+        self.assertNotIn(deleted_question.id, [q.id for q in updated_quiz.questions])
+
+        # Unchanged rows keep their IDs
+        for question, updated_question in zip(
+            created_quiz.questions, updated_quiz.questions
+        ):
+            self.assertEqual(question.id, updated_question.id)
+            for answer, updated_answer in zip(question.answers, updated_question.answers):
+                if answer.id is not None:
+                    self.assertEqual(answer.id, updated_answer.id)
+
+        self.assertEqual(
+            queries.conn.execute(
+                "SELECT COUNT(*) FROM quiz_question_answer WHERE question_id = ?",
+                (deleted_question.id,),
+            ).fetchone()[0],
+            0,
+        )
+        self.assertEqual(check_quiz_counters(), 0)
+
+    def test_question_and_answer_changes(self):
+        """Test changing single questions and answers renumbers their siblings."""
+
+        quiz_id = create_update_quiz(
+            1,
+            None,
+            QuizIn(
+                name="Granular Quiz",
+                status=QuizStatus.QUIZ_STATUS_DRAFT,
+                questions=[
+                    QuestionIn(
+                        name=f"Question {order}",
+                        order=order,
+                        answers=[
+                            QuizQuestionAnswerIn(name="Yes", order=1, is_correct=True),
+                            QuizQuestionAnswerIn(name="No", order=2, is_correct=False),
+                        ],
+                    )
+                    for order in range(1, 4)
+                ],
+            ),
+        )
+        quiz = get_quiz(quiz_id, include_answers=True)
+
+        # Test case 1: Insert a question at position 2, expect the later questions to move down
+        question = insert_question(
+            1,
+            quiz_id,
+            QuestionIn(
+                name="Inserted",
+                order=2,
+                answers=[QuizQuestionAnswerIn(name="Yes", order=1, is_correct=True)],
+            ),
+        )
+        self.assertEqual(question.order, 2)
+        self.assertEqual(len(question.answers), 1)
+
+        updated_quiz = get_quiz(quiz_id, include_answers=True)
+        self.assertEqual(
+            [q.name for q in updated_quiz.questions],
+            ["Question 1", "Inserted", "Question 2", "Question 3"],
+        )
+        self.assertEqual([q.order for q in updated_quiz.questions], [1, 2, 3, 4])
+
+        # Test case 2: Delete the first question, expect the later questions to move up
+        self.assertTrue(delete_question(1, quiz_id, quiz.questions[0].id))
+        self.assertFalse(delete_question(1, quiz_id, quiz.questions[0].id))
+
+        updated_quiz = get_quiz(quiz_id, include_answers=True)
+        self.assertEqual([q.order for q in updated_quiz.questions], [1, 2, 3])
+        self.assertEqual(updated_quiz.questions[0].name, "Inserted")
+
+        # Test case 3: Edit a question and an answer
+        question = update_question(
+            1, quiz_id, quiz.questions[1].id, QuestionUpdate(name="Edited")
+        )
+        self.assertEqual(question.name, "Edited")
+
+        answer = update_answer(
+            1,
+            quiz_id,
+            quiz.questions[1].id,
+            quiz.questions[1].answers[1].id,
+            QuizQuestionAnswerUpdate(name="Maybe"),
+        )
+        self.assertEqual(answer.name, "Maybe")
+        self.assertFalse(answer.is_correct)
+
+        # Test case 4: Insert and delete answers, expect them to be re-indexed
+        answer = insert_answer(
+            1,
+            quiz_id,
+            quiz.questions[1].id,
+            QuizQuestionAnswerIn(name="First", order=1, is_correct=False),
+        )
+        self.assertTrue(delete_answer(1, quiz_id, quiz.questions[1].id, answer.id))
+
+        updated_quiz = get_quiz(quiz_id, include_answers=True)
+        answers = updated_quiz.questions[1].answers
+        self.assertEqual([a.name for a in answers], ["Yes", "Maybe"])
+        self.assertEqual([a.order for a in answers], [1, 2])
+
+        # Test case 5: Orders before the first or after the last question or answer are clamped to them
+        question = insert_question(
+            1,
+            quiz_id,
+            QuestionIn(
+                name="Before",
+                order=-3,
+                answers=[QuizQuestionAnswerIn(name="Yes", order=1, is_correct=True)],
+            ),
+        )
+        self.assertEqual(question.order, 1)
+
+        question = insert_question(
+            1,
+            quiz_id,
+            QuestionIn(
+                name="After",
+                order=100,
+                answers=[QuizQuestionAnswerIn(name="Yes", order=1, is_correct=True)],
+            ),
+        )
+        self.assertEqual(question.order, 5)
+
+        updated_quiz = get_quiz(quiz_id, include_answers=True)
+        self.assertEqual([q.order for q in updated_quiz.questions], [1, 2, 3, 4, 5])
+        self.assertEqual(updated_quiz.questions[0].name, "Before")
+        self.assertEqual(updated_quiz.questions[-1].name, "After")
+
+        first = insert_answer(
+            1, quiz_id, question.id, QuizQuestionAnswerIn(name="First", order=0, is_correct=False)
+        )
+        last = insert_answer(
+            1, quiz_id, question.id, QuizQuestionAnswerIn(name="Last", order=9, is_correct=False)
+        )
+        self.assertEqual((first.order, last.order), (1, 3))
+
+        inserted_answers = get_quiz(quiz_id, include_answers=True).questions[-1].answers
+        self.assertEqual(
+            [(a.name, a.order) for a in inserted_answers], [("First", 1), ("Yes", 2), ("Last", 3)]
+        )
+
+        # Test case 6: Changes which would leave a question without a correct answer are rejected
+        with self.assertRaises(ValueError):
+            delete_answer(1, quiz_id, quiz.questions[1].id, answers[0].id)
+
+        with self.assertRaises(ValueError):
+            update_answer(
+                1,
+                quiz_id,
+                quiz.questions[1].id,
+                answers[0].id,
+                QuizQuestionAnswerUpdate(is_correct=False),
+            )
+
+        self.assertTrue(get_quiz(quiz_id, include_answers=True).questions[1].answers[0].is_correct)
+
+        # Changes to a question of another quiz are not found
+        self.assertIsNone(
+            update_question(1, 1, quiz.questions[1].id, QuestionUpdate(name="Other"))
+        )
+        self.assertEqual(check_quiz_counters(), 0)
+
+    def test_set_quiz_status(self):
+        """Test the set_quiz_status function only changes the status of existing quizzes, in chunks."""
+
+        quiz = QuizIn(
+            name="Status Quiz",
+            status=QuizStatus.QUIZ_STATUS_DRAFT,
+            questions=[
+                QuestionIn(
+                    name="Question 1",
+                    order=1,
+                    answers=[QuizQuestionAnswerIn(name="Yes", order=1, is_correct=True)],
+                )
+            ],
+        )
+        quiz_ids = [create_update_quiz(1, None, quiz) for _ in range(3)]
+        questions = [get_quiz(quiz_id, True).questions for quiz_id in quiz_ids]
+
+        # Bind fewer IDs per statement than are changed, so the update runs in several chunks.
+        with mock.patch.object(queries, "STATUS_CHUNK_SIZE", 2):
+            updated = set_quiz_status(
+                2, quiz_ids + [999999, quiz_ids[0]], QuizStatus.QUIZ_STATUS_PUBLISHED
+            )
+        self.assertEqual(updated, 3)
+
+        for quiz_id, quiz_questions in zip(quiz_ids, questions):
+            updated_quiz = get_quiz(quiz_id, True)
+            self.assertEqual(updated_quiz.status, QuizStatus.QUIZ_STATUS_PUBLISHED)
+            self.assertEqual(updated_quiz.updated_by.id, 2)
+            self.assertEqual(updated_quiz.questions, quiz_questions)
+
+        set_quiz_status(1, quiz_ids, QuizStatus.QUIZ_STATUS_ARCHIVED)
+        self.assertEqual(check_quiz_counters(), 0)
+
+    def test_check_quiz_counters(self):
+        """Test the check_quiz_counters function detects and rebuilds inconsistent counters."""
+
+        self.assertEqual(check_quiz_counters(), 0)
+
+        queries.conn.execute(
+            "UPDATE quiz SET question_count = question_count + 1 WHERE id = 1"
+        )
+        queries.conn.execute("UPDATE quiz_status_count SET count = count + 1")
+        queries.conn.commit()
+
+        self.assertGreaterEqual(check_quiz_counters(), 2)
+        self.assertGreaterEqual(check_quiz_counters(rebuild=True), 2)
+        self.assertEqual(check_quiz_counters(), 0)
+
+        quiz = get_quiz(1, include_answers=False)
+        quizzes, _ = get_quizzes(quiz.name, [quiz.status.value], 1, 0)
+        self.assertEqual(quizzes[0].question_count, len(quiz.questions))
+
+
+class TestQueriesMemory(TestQueries):
+    """Run the unit tests of the queries module with quizzes read from the in-memory store."""
+
+    @classmethod
+    def setUpClass(cls):
+        queries.store = queries.load_store()
+
+    @classmethod
+    def tearDownClass(cls):
+        queries.store = None
+
+    def test_store_matches_database(self):
+        """Test that quizzes written through to the database are read back the same from the store."""
+
+        quiz_id = create_update_quiz(
+            1,
+            None,
+            QuizIn(
+                name="Stored Café Quiz",
+                status=QuizStatus.QUIZ_STATUS_DRAFT,
+                questions=[
+                    QuestionIn(
+                        name="Question 1",
+                        order=1,
+                        answers=[QuizQuestionAnswerIn(name="Yes", order=1, is_correct=True)],
+                    )
+                ],
+            ),
+        )
+
+        for include_answers in [True, False]:
+            self.assertEqual(
+                get_quiz(quiz_id, include_answers),
+                queries.load_quizzes_by_ids([quiz_id], include_answers)[0],
+            )
+
+        # Names are searched without case or diacritics
+        quizzes, count = get_quizzes("cafe stor", [QuizStatus.QUIZ_STATUS_DRAFT.value], 10, 0)
+        self.assertEqual(count, 1)
+        self.assertEqual(quizzes[0].id, quiz_id)
+        self.assertEqual(quizzes[0].question_count, 1)
+
+        # A failed write leaves the store unchanged
+        with self.assertRaises(ValueError):
+            with queries.transaction(queries.conn):
+                insert_question(
+                    1, quiz_id, QuestionIn(name="Question 2", order=2, answers=[])
+                )
+                raise ValueError("Rolled back")
+        self.assertEqual(len(get_quiz(quiz_id, True).questions), 1)
+
+        # Archived quizzes leave the store, but are still read from the database
+        set_quiz_status(1, [quiz_id], QuizStatus.QUIZ_STATUS_ARCHIVED)
+        self.assertIsNone(queries.store.get(quiz_id, True))
+        self.assertEqual(get_quiz(quiz_id, True).status, QuizStatus.QUIZ_STATUS_ARCHIVED)
+
+        quizzes, count = get_quizzes("cafe stor", [QuizStatus.QUIZ_STATUS_DRAFT.value], 10, 0)
+        self.assertEqual(count, 0)
+
+    def test_load_store(self):
+        """Test that the store is loaded in chunks, and its snapshot built once from every chunk."""
+
+        with mock.patch.object(queries, "STORE_LOAD_CHUNK_SIZE", 2), mock.patch.object(
+            quiz_store.QuizStore, "replace", autospec=True, side_effect=quiz_store.QuizStore.replace
+        ) as replace:
+            store = queries.load_store()
+
+        replace.assert_called_once()
+        self.assertEqual(len(store), len(queries.store))
+        self.assertEqual(store.get(1, True), queries.load_quizzes_by_ids([1], True)[0])
+
+    def test_store_copies_quizzes(self):
+        """Test that changing a quiz read from the store does not change the quiz read next."""
+
+        quiz = get_quiz(1, True)
+        quiz.questions[0].name = "Changed Question"
+        quiz.questions[0].answers.pop()
+        quiz.questions.pop()
+
+        self.assertEqual(get_quiz(1, True), queries.load_quizzes_by_ids([1], True)[0])
+        self.assertEqual(get_quiz(1, False), queries.load_quizzes_by_ids([1], False)[0])
+
+    def test_store_updated_by_role(self):
+        """Test that changing the role of a user changes the user of the quizzes they last updated."""
+
+        user_id = create_user(str(uuid.uuid4())[:8], "password", "Store User", "editor")
+        quiz_id = create_update_quiz(
+            user_id, None, QuizIn(name="Role Quiz", status=QuizStatus.QUIZ_STATUS_DRAFT, questions=[])
+        )
+
+        update_user_role(user_id, UserRole.USER_ROLE_VIEWER)
+
+        self.assertEqual(get_quiz(quiz_id, True).updated_by.role, UserRole.USER_ROLE_VIEWER)
+        self.assertEqual(get_quiz(quiz_id, True), queries.load_quizzes_by_ids([quiz_id], True)[0])
+
 
 if __name__ == "__main__":
     unittest.main()
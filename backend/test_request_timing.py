@@ -0,0 +1,90 @@
+""" Unit tests for the request_timing module. """
+
+import time
+import unittest
+from unittest import mock
+
+import request_timing
+from quart import Quart
+from request_timing import RequestTimings, format_server_timing, measure
+
+
+class TestRequestTiming(unittest.TestCase):
+    """Unit tests for the request_timing module."""
+
+    def test_measure_outside_request(self):
+        """Test that nothing is recorded outside a sampled request."""
+
+        with measure("db"):
+            pass
+
+        self.assertIsNone(request_timing._timings.get())
+
+    def test_measure_nested_phases(self):
+        """Test that time spent in a nested phase is not also counted in the enclosing phase."""
+
+        timings = RequestTimings()
+        token = request_timing._timings.set(timings)
+
+        try:
+            with measure("db"):
+                time.sleep(0.01)
+                with measure("assembly"):
+                    time.sleep(0.02)
+        finally:
+            request_timing._timings.reset(token)
+
+        self.assertGreaterEqual(timings.phases["assembly"], 0.02)
+        self.assertGreaterEqual(timings.phases["db"], 0.01)
+        self.assertLess(timings.phases["db"], 0.02)
+        self.assertIsNone(timings.current)
+
+        header = format_server_timing(timings, 0.05)
+        self.assertRegex(header, r"^db;dur=[\d.]+, assembly;dur=[\d.]+, total;dur=50\.000$")
+
+    def test_format_metrics(self):
+        """Test that latencies are formatted as cumulative Prometheus histograms."""
+
+        request_timing.reset()
+        request_timing.observe("GET", "/api/quizzes", 200, 0.003)
+        request_timing.observe("GET", "/api/quizzes", 200, 0.3)
+
+        lines = request_timing.format_metrics()
+        labels = 'method="GET",route="/api/quizzes",status="200"'
+
+        self.assertIn(f"http_request_duration_seconds_bucket{{{labels},le=\"0.001\"}} 0", lines)
+        self.assertIn(f"http_request_duration_seconds_bucket{{{labels},le=\"0.005\"}} 1", lines)
+        self.assertIn(f"http_request_duration_seconds_bucket{{{labels},le=\"+Inf\"}} 2", lines)
+        self.assertIn(f"http_request_duration_seconds_count{{{labels}}} 2", lines)
+
+
+class TestRequestTimingHooks(unittest.IsolatedAsyncioTestCase):
+    """Unit tests of the hooks installed on an app."""
+
+    async def test_server_timing_disabled_by_default(self):
+        """Test that latencies are recorded, but no Server-Timing header is sent unless sampling is enabled."""
+
+        app = Quart(__name__)
+        request_timing.install(app)
+
+        @app.get("/timed")
+        async def timed():
+            return "timed"
+
+        request_timing.reset()
+        response = await app.test_client().get("/timed")
+
+        self.assertNotIn("Server-Timing", response.headers)
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",route="/timed",status="200"} 1',
+            request_timing.format_metrics(),
+        )
+
+        with mock.patch.object(request_timing, "REQUEST_TIMING_SAMPLE_RATE", 1):
+            response = await app.test_client().get("/timed")
+
+        self.assertRegex(response.headers["Server-Timing"], r"total;dur=[\d.]+$")
+
+
+if __name__ == "__main__":
+    unittest.main()
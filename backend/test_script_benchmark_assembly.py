@@ -0,0 +1,40 @@
+""" Unit tests for the quiz assembly benchmark script. """
+
+import contextlib
+import io
+import sys
+import unittest
+from unittest import mock
+
+import queries
+import script_benchmark_assembly
+
+
+class TestScriptBenchmarkAssembly(unittest.TestCase):
+    """Unit tests for the quiz assembly benchmark script."""
+
+    def test_joined_quiz(self):
+        """Test that the joined query assembles the same quiz as get_quiz, so the benchmark compares like with like."""
+
+        connection = script_benchmark_assembly.create_database(3, 2)
+
+        for include_answers in (True, False):
+            self.assertEqual(
+                script_benchmark_assembly.get_quiz_joined(1, include_answers, connection),
+                queries.get_quiz(1, include_answers, connection=connection),
+            )
+
+    def test_main(self):
+        """Test that the benchmark runs to completion with small sizes."""
+
+        output = io.StringIO()
+        argv = ["script_benchmark_assembly.py", "--questions", "3", "--answers", "2"]
+
+        with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(output):
+            script_benchmark_assembly.main()
+
+        self.assertIn("Quiz with 3 questions of 2 answers", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+""" Unit tests for the serialization module. """
+
+import json
+import unittest
+from datetime import datetime
+
+import serialization
+from _types.app import Question, QuizQuestionAnswer, Quiz, QuizStatus, Timestamp, User, UserRole
+from quart import Quart, Response
+from quart_schema import QuartSchema
+from werkzeug.datastructures import Headers
+
+# The JSON of the quiz built by build_quiz. The quiz_id of questions and question_id of answers are not
+# fields of the models declared by Quiz, so they are left out.
+EXPECTED_QUIZ = {
+    "created_at": "2024-01-02T03:04:05.000006",
+    "id": 2,
+    "name": "Capitals ✓",
+    "questions": [
+        {
+            "answers": [
+                {"id": 4, "is_correct": True, "name": "Paris", "order": 1}
+            ],
+            "id": 3,
+            "name": "Capital of France?",
+            "order": 1,
+        }
+    ],
+    "status": "published",
+    "updated_at": "2024-01-02T03:04:05",
+    "updated_by": {
+        "created_at": "2024-01-01T00:00:00",
+        "id": 1,
+        "name": "Editor",
+        "role": "editor",
+        "username": "editor",
+    },
+}
+
+
+def build_quiz() -> Quiz:
+    """Build a quiz with a question and an answer."""
+
+    user = User(
+        id=1,
+        name="Editor",
+        username="editor",
+        created_at=Timestamp.from_datetime(datetime(2024, 1, 1)),
+        role=UserRole.USER_ROLE_EDITOR,
+    )
+
+    return Quiz(
+        id=2,
+        name="Capitals ✓",
+        status=QuizStatus.QUIZ_STATUS_PUBLISHED,
+        updated_by=user,
+        created_at=Timestamp.from_datetime(datetime(2024, 1, 2, 3, 4, 5, 6)),
+        updated_at=Timestamp.from_datetime(datetime(2024, 1, 2, 3, 4, 5)),
+        questions=[
+            Question(
+                id=3,
+                quiz_id=2,
+                name="Capital of France?",
+                order=1,
+                answers=[
+                    QuizQuestionAnswer(id=4, question_id=3, name="Paris", order=1, is_correct=True)
+                ],
+            )
+        ],
+    )
+
+
+class TestSerialization(unittest.TestCase):
+    """Unit tests for the serialization module."""
+
+    def setUp(self):
+        self.quiz = build_quiz()
+
+    def test_dump_json(self):
+        """Test that quizzes are serialized as quart_schema serializes them, with only the declared fields."""
+
+        body = serialization.dump_json(self.quiz, Quiz)
+
+        self.assertEqual(json.loads(body), EXPECTED_QUIZ)
+
+        # Keys are sorted, as they are by Quart's JSON provider.
+        self.assertTrue(body.startswith(b'{"created_at":'))
+
+    def test_stdlib_fallback(self):
+        """Test that the json module produces the same JSON as orjson."""
+
+        orjson = serialization.orjson
+        try:
+            serialization.orjson = None
+            body = serialization.dump_json(self.quiz, Quiz)
+        finally:
+            serialization.orjson = orjson
+
+        self.assertEqual(json.loads(body), json.loads(serialization.dump_json(self.quiz, Quiz)))
+
+    def test_get_adapter(self):
+        """Test that each model's adapter is only built once."""
+
+        self.assertIs(serialization.get_adapter(Quiz), serialization.get_adapter(Quiz))
+
+
+class TestJsonResponse(unittest.IsolatedAsyncioTestCase):
+    """Unit tests of json_response outside testing and debug mode, where responses are not validated."""
+
+    def setUp(self):
+        app = Quart(__name__)
+        QuartSchema(app)
+        app.testing = False
+        app.debug = False
+
+        quiz = build_quiz()
+
+        @app.get("/quiz")
+        @serialization.json_response(Quiz)
+        async def get_quiz():
+            return quiz, 200, Headers({"ETag": '"quiz"', "Cache-Control": "no-cache"})
+
+        @app.get("/headers")
+        @serialization.json_response(Quiz)
+        async def get_quiz_with_headers():
+            return quiz, Headers({"ETag": '"quiz"'})
+
+        @app.get("/not-modified")
+        @serialization.json_response(Quiz)
+        async def get_not_modified():
+            return "", 304, Headers({"ETag": '"quiz"'})
+
+        @app.get("/missing")
+        @serialization.json_response(Quiz)
+        async def get_missing():
+            return {"error": "Quiz not found"}, 404
+
+        @app.get("/response")
+        @serialization.json_response(Quiz)
+        async def get_response():
+            return Response("plain", 200, content_type="text/plain")
+
+        self.client = app.test_client()
+
+    async def test_model(self):
+        """Test that models are serialized, keeping the status and headers returned with them."""
+
+        for path in ["/quiz", "/headers"]:
+            response = await self.client.get(path)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content_type, "application/json")
+            self.assertEqual(await response.get_json(), EXPECTED_QUIZ)
+            self.assertEqual(response.headers["ETag"], '"quiz"')
+
+        response = await self.client.get("/quiz")
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+
+    async def test_pass_through(self):
+        """Test that other status codes and Response objects are returned unchanged."""
+
+        response = await self.client.get("/not-modified")
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], '"quiz"')
+        self.assertEqual(await response.get_data(), b"")
+
+        response = await self.client.get("/missing")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(await response.get_json(), {"error": "Quiz not found"})
+
+        response = await self.client.get("/response")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, "text/plain")
+        self.assertEqual(await response.get_data(), b"plain")
+
+
+if __name__ == "__main__":
+    unittest.main()
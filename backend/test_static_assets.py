@@ -0,0 +1,84 @@
+""" Unit tests for the static_assets module. """
+
+import gzip
+import os
+import tempfile
+import unittest
+from http import HTTPStatus
+
+from quart import Quart
+
+import static_assets
+
+
+class TestStaticAssets(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for the static_assets module."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, "assets"))
+
+        self.script = b"console.log('quiz');\n" * 200
+        self.files = {
+            "index.html": b"<!doctype html><title>Quiz</title>",
+            "assets/index-4f3a9b2c.js": self.script,
+            "favicon.ico": b"\x00" * 10,
+        }
+        for path, body in self.files.items():
+            with open(os.path.join(self.directory.name, path), "wb") as file:
+                file.write(body)
+
+        self.assets = static_assets.StaticAssets(self.directory.name)
+        self.assets.load()
+
+        self.app = Quart(__name__)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def request(self, path: str, headers: dict[str, str]):
+        async with self.app.test_request_context("/" + path, headers=headers):
+            return await self.assets.response(path)
+
+    async def test_manifest(self):
+        """Test that every file is held in memory, with hashed bundles marked immutable."""
+
+        self.assertTrue(self.assets.get("assets/index-4f3a9b2c.js").immutable)
+        self.assertFalse(self.assets.get("index.html").immutable)
+        self.assertIn("gzip", self.assets.get("assets/index-4f3a9b2c.js").bodies)
+
+        # Small files are not compressed.
+        self.assertEqual(list(self.assets.get("index.html").bodies), ["identity"])
+        self.assertIsNone(self.assets.get("missing.js"))
+
+    async def test_response(self):
+        """Test that the smallest accepted encoding is served, and the client's current copy is not resent."""
+
+        response = await self.request("assets/index-4f3a9b2c.js", {"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertEqual(gzip.decompress(await response.get_data()), self.script)
+
+        response = await self.request("assets/index-4f3a9b2c.js", {})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(await response.get_data(), self.script)
+
+        response = await self.request("index.html", {})
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        self.assertEqual(response.mimetype, "text/html")
+
+        response = await self.request("index.html", {"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    async def test_files_not_read_again(self):
+        """Test that files are served from memory once the manifest is loaded."""
+
+        os.remove(os.path.join(self.directory.name, "index.html"))
+
+        response = await self.request("index.html", {})
+        self.assertEqual(await response.get_data(), self.files["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+""" Unit tests for the utilities module. """
+
+import unittest
+
+from utilities import (
+    compare_passwords,
+    decode_cursor,
+    encode_cursor,
+    generate_salt,
+    hash_legacy_password,
+    hash_password,
+    password_needs_rehash,
+)
+
+
+class TestUtilities(unittest.TestCase):
+    """Unit tests for the utilities module."""
+
+    def test_hash_password(self):
+        """Test that scrypt hashes store their cost and are compared with it."""
+
+        salt = generate_salt()
+        hashed_password = hash_password("password", salt, n=1024, r=8, p=1)
+
+        self.assertTrue(hashed_password.startswith("scrypt$1024$8$1$"))
+        self.assertTrue(compare_passwords("password", hashed_password, salt))
+        self.assertFalse(compare_passwords("Password", hashed_password, salt))
+        self.assertFalse(compare_passwords("password", hashed_password, generate_salt()))
+
+        # Hashes made with a different cost than is configured are rehashed.
+        self.assertTrue(password_needs_rehash(hashed_password))
+        self.assertFalse(password_needs_rehash(hash_password("password", salt)))
+
+    def test_legacy_password(self):
+        """Test that legacy SHA-256 hashes are still accepted, and are rehashed."""
+
+        salt = generate_salt()
+        hashed_password = hash_legacy_password("password", salt)
+
+        self.assertTrue(compare_passwords("password", hashed_password, salt))
+        self.assertFalse(compare_passwords("wrong", hashed_password, salt))
+        self.assertTrue(password_needs_rehash(hashed_password))
+
+    def test_malformed_hash(self):
+        """Test that a malformed scrypt hash never matches."""
+
+        self.assertFalse(compare_passwords("password", "scrypt$x$8$1$00", generate_salt()))
+
+    def test_decode_cursor(self):
+        """Test that only cursors of a sort order, a scalar sort key and a quiz ID are decoded."""
+
+        for values in [["updated_at", "2024-02-05T19:58:52", 1], ["id", 1, 1], ["relevance", -1.5, 1]]:
+            self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+        for values in [
+            ["updated_at", {"a": 1}, 2],
+            ["updated_at", [1], 2],
+            ["updated_at", None, 2],
+            ["id", True, 2],
+            ["id", 1, "2"],
+            [1, 1, 2],
+            ["id", 1],
+            ["id", 1, 2, 3],
+        ]:
+            with self.assertRaises(ValueError):
+                decode_cursor(encode_cursor(values))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,51 @@
 """ This module contains utility functions for the backend. """
 
+import json
+import os
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
 from datetime import datetime
-from hashlib import sha256
+from hashlib import blake2b, scrypt, sha256
 from hmac import compare_digest
 from secrets import token_hex
+from typing import Optional
 
+from _types.app import QuestionIn, QuizIn, QuizStatus
 
-def hash_password(password: str, salt: str) -> str:
-    """Hash the provided password using the provided salt."""
+
+# Cost of new password hashes. Each hash stores its own parameters, so they can be raised at any time and
+# existing passwords are rehashed when their users next log in.
+PASSWORD_SCRYPT_N = int(os.environ.get("PASSWORD_SCRYPT_N", 2**14))
+PASSWORD_SCRYPT_R = int(os.environ.get("PASSWORD_SCRYPT_R", 8))
+PASSWORD_SCRYPT_P = int(os.environ.get("PASSWORD_SCRYPT_P", 1))
+
+
+def hash_password(
+    password: str,
+    salt: str,
+    n: Optional[int] = None,
+    r: Optional[int] = None,
+    p: Optional[int] = None,
+) -> str:
+    """Hash the provided password using the provided salt with scrypt, as scrypt$n$r$p$hash.
+
+    The cost defaults to the configured PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R and PASSWORD_SCRYPT_P.
+    """
+
+    n = n or PASSWORD_SCRYPT_N
+    r = r or PASSWORD_SCRYPT_R
+    p = p or PASSWORD_SCRYPT_P
+
+    hashed_password = scrypt(
+        password.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32
+    ).hex()
+
+    return f"scrypt${n}${r}${p}${hashed_password}"
+
+
+def hash_legacy_password(password: str, salt: str) -> str:
+    """Hash the provided password using the provided salt with a single pass of SHA-256, as older hashes were."""
 
     combined = password + salt
 
@@ -20,13 +58,28 @@ def hash_password(password: str, salt: str) -> str:
 def compare_passwords(password: str, hashed_password: str, salt: str) -> bool:
     """Compare the provided password with the hashed password using the provided salt."""
 
-    # Hash the provided password with the same salt
-    new_hashed_password = hash_password(password, salt)
+    # Hash the provided password with the same salt and cost
+    if hashed_password.startswith("scrypt$"):
+        try:
+            _, n, r, p, _ = hashed_password.split("$")
+            new_hashed_password = hash_password(password, salt, int(n), int(r), int(p))
+        except ValueError:
+            return False
+    else:
+        new_hashed_password = hash_legacy_password(password, salt)
 
     # Use a constant-time comparison function to compare the two hashed passwords
     return compare_digest(hashed_password, new_hashed_password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check if a hash is a legacy hash or was made with a different cost than is configured."""
+
+    return not hashed_password.startswith(
+        f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}$"
+    )
+
+
 def generate_salt() -> str:
     """Generate a random 16-byte salt using secrets module."""
 
@@ -47,3 +100,104 @@ def convert_from_iso(iso_date) -> datetime | None:
 def build_list(length) -> str:
     """Build a string of question marks for use in SQL queries."""
     return "(" + ", ".join(["?" for _ in range(length)]) + ")"
+
+
+def build_search_query(query: str) -> str:
+    """Build a full text search query matching every word in the provided query as a prefix."""
+
+    # Underscores separate words in the full text index, as they do here.
+    words = re.findall(r"[^\W_]+", query)
+
+    return " ".join(['"' + word + '"*' for word in words])
+
+
+def encode_cursor(values: list) -> str:
+    """Encode the provided values as an opaque pagination cursor."""
+
+    return urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a pagination cursor created by encode_cursor, as its sort order, the sort key of the last quiz
+    and its ID. Raises ValueError if the cursor is invalid."""
+
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (BinasciiError, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != 3:
+        raise ValueError("Invalid cursor")
+
+    sort, key, quiz_id = values
+    if (
+        not isinstance(sort, str)
+        or not isinstance(key, (str, int, float))
+        or isinstance(key, bool)
+        or not isinstance(quiz_id, int)
+        or isinstance(quiz_id, bool)
+    ):
+        raise ValueError("Invalid cursor")
+
+    return values
+
+
+def make_etag(*parts) -> str:
+    """Make an entity tag which changes whenever any of the provided parts change."""
+
+    return blake2b(":".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+
+
+def validate_quiz(quiz: QuizIn):
+    """Validate a quiz."""
+
+    if not quiz.name:
+        return False, "quiz.name: Missing quiz name"
+
+    if not quiz.status or quiz.status not in [
+        QuizStatus.QUIZ_STATUS_DRAFT,
+        QuizStatus.QUIZ_STATUS_PUBLISHED,
+        QuizStatus.QUIZ_STATUS_ARCHIVED,
+    ]:
+        return False, "quiz.status: Invalid quiz status '" + quiz.status + "'"
+
+    if not quiz.questions or len(quiz.questions) < 1:
+        return False, "quiz.questions: Missing questions"
+
+    for question_index, question in enumerate(quiz.questions):
+        is_valid, validation_message = validate_question(
+            question, f"quiz.questions.{question_index}"
+        )
+        if not is_valid:
+            return False, validation_message
+
+    return True, None
+
+
+def validate_question(question: QuestionIn, path: str = "question"):
+    """Validate a question. The path prefixes any validation message."""
+
+    if not question.name:
+        return False, f"{path}.name: Missing question name"
+
+    if not question.answers or len(question.answers) < 1:
+        return False, f"{path}.name: Missing answers"
+
+    has_correct_answer = False
+    for answer_index, answer in enumerate(question.answers):
+        if not answer.name:
+            return (
+                False,
+                f"{path}.answers.{answer_index}.name: Missing answer name",
+            )
+
+        if answer.is_correct:
+            has_correct_answer = True
+
+    if not has_correct_answer:
+        return (
+            False,
+            f"{path}.answers: No correct answer set",
+        )
+
+    return True, None
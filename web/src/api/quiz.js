@@ -8,7 +8,7 @@ export default {
         response
           .json()
           .then((res) => {
-            callback({ quizzes: res.quizzes, count: res.count })
+            callback({ quizzes: res.quizzes, count: res.count, nextCursor: res.next_cursor })
           })
           .catch((error) => {
             errorCallback(error)
@@ -51,6 +51,31 @@ export default {
     )
   },
 
+  getQuizzesByIds: (ids, callback, errorCallback) => {
+    getRequest(
+      `/api/quizzes/batch?ids=${ids.map((id) => encodeURIComponent(id)).join(',')}`,
+      (response) => {
+        response
+          .json()
+          .then((res) => {
+            callback({ quizzes: res.quizzes, missing: res.missing })
+          })
+          .catch((error) => {
+            errorCallback(error)
+          })
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
+  },
+
   createQuiz: (quizData, callback, errorCallback) => {
     doRequest(
       'POST',
@@ -126,5 +151,187 @@ export default {
         }
       }
     )
+  },
+
+  setQuizzesStatus: (ids, status, callback, errorCallback) => {
+    doRequest(
+      'POST',
+      '/api/quizzes/status',
+      { ids, status },
+      null,
+      (response) => {
+        response
+          .json()
+          .then((res) => {
+            callback(res)
+          })
+          .catch((error) => {
+            errorCallback(error)
+          })
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
+  },
+
+  updateQuestion: (quizId, questionId, questionData, callback, errorCallback) => {
+    doRequest(
+      'PATCH',
+      `/api/quizzes/${encodeURIComponent(quizId)}/questions/${encodeURIComponent(questionId)}`,
+      questionData,
+      null,
+      (response) => {
+        response
+          .json()
+          .then((res) => {
+            callback(res)
+          })
+          .catch((error) => {
+            errorCallback(error)
+          })
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
+  },
+
+  createQuestion: (quizId, questionData, callback, errorCallback) => {
+    doRequest(
+      'POST',
+      `/api/quizzes/${encodeURIComponent(quizId)}/questions`,
+      questionData,
+      null,
+      (response) => {
+        response
+          .json()
+          .then((res) => {
+            callback(res)
+          })
+          .catch((error) => {
+            errorCallback(error)
+          })
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
+  },
+
+  deleteQuestion: (quizId, questionId, callback, errorCallback) => {
+    doRequest(
+      'DELETE',
+      `/api/quizzes/${encodeURIComponent(quizId)}/questions/${encodeURIComponent(questionId)}`,
+      null,
+      null,
+      () => {
+        callback()
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
+  },
+
+  updateAnswer: (quizId, questionId, answerId, answerData, callback, errorCallback) => {
+    doRequest(
+      'PATCH',
+      `/api/quizzes/${encodeURIComponent(quizId)}/questions/${encodeURIComponent(questionId)}/answers/${encodeURIComponent(answerId)}`,
+      answerData,
+      null,
+      (response) => {
+        response
+          .json()
+          .then((res) => {
+            callback(res)
+          })
+          .catch((error) => {
+            errorCallback(error)
+          })
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
+  },
+
+  createAnswer: (quizId, questionId, answerData, callback, errorCallback) => {
+    doRequest(
+      'POST',
+      `/api/quizzes/${encodeURIComponent(quizId)}/questions/${encodeURIComponent(questionId)}/answers`,
+      answerData,
+      null,
+      (response) => {
+        response
+          .json()
+          .then((res) => {
+            callback(res)
+          })
+          .catch((error) => {
+            errorCallback(error)
+          })
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
+  },
+
+  deleteAnswer: (quizId, questionId, answerId, callback, errorCallback) => {
+    doRequest(
+      'DELETE',
+      `/api/quizzes/${encodeURIComponent(quizId)}/questions/${encodeURIComponent(questionId)}/answers/${encodeURIComponent(answerId)}`,
+      null,
+      null,
+      () => {
+        callback()
+      },
+      (error) => {
+        if (error.status == 401) {
+          return doLogin()
+        } else if (error.status >= 400) {
+          return errorCallback(error.statusText)
+        } else {
+          return errorCallback(error)
+        }
+      }
+    )
   }
 }
@@ -1,5 +1,44 @@
+// Bodies of GET responses which had an ETag, keyed by URL, so they can be revalidated instead of downloaded again.
+const validatedResponses = new Map()
+
 export function getRequest(url, callback, errorCallback) {
-  doRequest('GET', url, null, null, callback, errorCallback)
+  const cached = validatedResponses.get(url)
+  const headers = cached ? { 'If-None-Match': cached.etag } : {}
+
+  fetch(url, {
+    method: 'GET',
+    headers: headers,
+    // Validators are handled here, so the browser must not revalidate or answer from its own cache.
+    cache: 'no-store'
+  })
+    .then((response) => {
+      if (response.status == 304 && cached) {
+        callback(new Response(cached.body, { status: 200, headers: cached.headers }))
+        return
+      }
+
+      if (response.status >= 400) {
+        errorCallback(response)
+        return
+      }
+
+      const etag = response.headers.get('ETag')
+      if (etag) {
+        response
+          .clone()
+          .text()
+          .then((body) => {
+            validatedResponses.set(url, { etag: etag, body: body, headers: response.headers })
+          })
+      } else {
+        validatedResponses.delete(url)
+      }
+
+      callback(response)
+    })
+    .catch((error) => {
+      errorCallback(error)
+    })
 }
 
 export function doRequest(method, url, data, files, callback, errorCallback) {